@@ -1,11 +1,29 @@
 from django.contrib import admin
-from .models import Author, FollowRequest, Post, Comment, PostLike, CommentLike, Node
+from .models import (
+    Author,
+    FollowRequest,
+    Post,
+    InboxItem,
+    Comment,
+    PostLike,
+    CommentLike,
+    Node,
+)
 
 # Register your models here.
 admin.site.register(Author)
 admin.site.register(FollowRequest)
 admin.site.register(Post)
+admin.site.register(InboxItem)
 admin.site.register(Comment)
 admin.site.register(PostLike)
 admin.site.register(CommentLike)
-admin.site.register(Node)
+
+
+@admin.register(Node)
+class NodeAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        # The password is typed in plain and stored hashed
+        if "password" in form.changed_data and obj.password:
+            obj.set_password(form.cleaned_data["password"])
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,52 @@
+import base64
+import binascii
+
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.permissions import BasePermission
+
+from .models import Node
+
+
+class NodeAuthentication(BaseAuthentication):
+    """
+    HTTP Basic authentication of a peer node by the username and password
+    it was registered with. The request stays anonymous, with the node as
+    `request.auth`.
+    """
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != b"basic":
+            return None
+        try:
+            username, _, password = (
+                base64.b64decode(auth[1], validate=True).decode().partition(":")
+            )
+        except (IndexError, binascii.Error, UnicodeDecodeError):
+            raise exceptions.AuthenticationFailed("Invalid basic header")
+
+        node = Node.objects.filter(username=username).exclude(username="").first()
+        if node is None or not node.check_password(password):
+            raise exceptions.AuthenticationFailed("Invalid node credentials")
+        return AnonymousUser(), node
+
+    def authenticate_header(self, request):
+        return 'Basic realm="nodes"'
+
+
+def sending_node(request):
+    """
+    The peer node that authenticated the request, or None
+    """
+    return request.auth if isinstance(request.auth, Node) else None
+
+
+class IsNode(BasePermission):
+    """
+    Only peer nodes, authenticated with NodeAuthentication
+    """
+
+    def has_permission(self, request, view):
+        return sending_node(request) is not None
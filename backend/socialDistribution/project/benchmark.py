@@ -0,0 +1,252 @@
+import itertools
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from .counters import count_of, refresh_counters
+from .models import Author, Comment, FollowRequest, InboxItem, Post, PostLike
+from .versions import AUTHORS, COUNTERS, bump
+
+# Rows per INSERT when seeding
+SEED_BATCH_SIZE = 5000
+
+# Tail exponent of the seeded follower counts; measured follow graphs fall
+# between 2 and 3
+FOLLOWER_ALPHA = 2.1
+
+# How far back seeded posts are spread, from a fixed end rather than the
+# time of seeding so a seed always gives the same rows
+SEED_POST_AGE = timedelta(days=30)
+SEED_END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+SYLLABLES = [
+    "al", "an", "ar", "be", "bo", "ca", "da", "de", "el", "en", "fa", "ga",
+    "ha", "is", "jo", "ka", "la", "le", "li", "ma", "mi", "na", "ni", "no",
+    "ol", "pa", "ra", "ri", "ro", "sa", "se", "ta", "th", "to", "va", "ze",
+]  # fmt: skip
+
+
+def fake_id(rng):
+    """
+    A UUID drawn from `rng`, so seeded rows get the same ids every time
+    """
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def fake_name(rng):
+    syllables = rng.choices(SYLLABLES, k=rng.randint(2, 4))
+    return "".join(syllables).capitalize() + str(rng.randint(0, 999))
+
+
+def fake_text(rng, words):
+    return " ".join(
+        "".join(rng.choices(SYLLABLES, k=rng.randint(1, 3))) for _ in range(words)
+    ).capitalize()
+
+
+def seed_authors(count, rng, prefix="seed", active=False):
+    """
+    Bulk create `count` users and their authors with random display names.
+    The users are inactive unless `active`, and can't log in with a password
+    either way. Returns the new authors.
+    """
+    start = User.objects.filter(username__startswith=prefix).count()
+    authors = []
+    for offset in range(0, count, SEED_BATCH_SIZE):
+        batch = range(start + offset, start + min(offset + SEED_BATCH_SIZE, count))
+        users = User.objects.bulk_create(
+            User(username=f"{prefix}{i}", password="!", is_active=active) for i in batch
+        )
+        authors += Author.objects.bulk_create(
+            Author(id=fake_id(rng), user=user, displayName=fake_name(rng))
+            for user in users
+        )
+    return authors
+
+
+def bulk_insert(model, rows):
+    """
+    Insert an iterable of unsaved rows, SEED_BATCH_SIZE per INSERT. Returns
+    the number inserted.
+    """
+    rows = iter(rows)
+    inserted = 0
+    while batch := list(itertools.islice(rows, SEED_BATCH_SIZE)):
+        model.objects.bulk_create(batch)
+        inserted += len(batch)
+    return inserted
+
+
+def follower_degrees(count, rng, mean):
+    """
+    A Pareto-distributed follower count for each of `count` authors, about
+    `mean` on average, so a few authors are followed by a large share of
+    everyone
+    """
+    scale = mean * (FOLLOWER_ALPHA - 1) / FOLLOWER_ALPHA
+    return [
+        min(count - 1, int(scale * rng.paretovariate(FOLLOWER_ALPHA)))
+        for _ in range(count)
+    ]
+
+
+def seed_social_graph(
+    count,
+    rng,
+    mean_followers=20,
+    posts_per_author=5,
+    comments_per_post=2,
+    likes_per_post=5,
+    requests_per_author=1,
+):
+    """
+    Bulk create `count` active authors with a power-law follow graph, posts
+    pushed to their followers' inboxes as fan-out would, comments and likes
+    from the posts' followers, and pending follow requests. The per-item
+    arguments are averages. Signals are skipped, so the counters are
+    recomputed at the end. Returns the number of rows created of each kind.
+    """
+    authors = seed_authors(count, rng, active=True)
+    ids = [author.pk for author in authors]
+    followers = [
+        [i for i in rng.sample(range(count), min(count, degree + 1)) if i != index][
+            :degree
+        ]
+        for index, degree in enumerate(follower_degrees(count, rng, mean_followers))
+    ]
+    Follow = Author.following.through
+    created = {"authors": count}
+    created["follows"] = bulk_insert(
+        Follow,
+        (
+            Follow(from_author_id=ids[follower], to_author_id=ids[index])
+            for index, indices in enumerate(followers)
+            for follower in indices
+        ),
+    )
+
+    now = SEED_END
+    visibilities = Post.VisibilityChoice.values
+    posts = []
+
+    def new_posts():
+        for index, author in enumerate(authors):
+            for _ in range(rng.randint(0, 2 * posts_per_author)):
+                post = Post(
+                    id=fake_id(rng),
+                    author=author,
+                    title=fake_text(rng, 3)[:50],
+                    description=fake_text(rng, 5)[:50],
+                    content=fake_text(rng, rng.randint(5, 60))[:600],
+                    contentType="text/plain",
+                    source="http://127.0.0.1:8000/",
+                    origin="http://127.0.0.1:8000/",
+                    # Mostly public, like the posts people actually write
+                    visibility=rng.choices(visibilities, weights=[8, 1, 1])[0],
+                    unlisted=rng.random() < 0.05,
+                    published=now - SEED_POST_AGE * rng.random(),
+                )
+                posts.append((post.pk, index, post.published))
+                yield post
+
+    created["posts"] = bulk_insert(Post, new_posts())
+
+    # Posts by authors under the fan-out limit are in their followers' inboxes
+    fanout_max = settings.STREAM_FANOUT_MAX_FOLLOWERS
+    created["inbox_items"] = bulk_insert(
+        InboxItem,
+        (
+            InboxItem(author_id=ids[follower], post_id=post_id, received_at=published)
+            for post_id, index, published in posts
+            if len(followers[index]) <= fanout_max
+            for follower in followers[index]
+        ),
+    )
+
+    def reaction_time(published):
+        return published + (now - published) * rng.random()
+
+    def new_comments():
+        for post_id, index, published in posts:
+            for _ in range(rng.randint(0, 2 * comments_per_post)):
+                commenter = rng.choice(followers[index] or [index])
+                yield Comment(
+                    id=fake_id(rng),
+                    author_id=ids[commenter],
+                    post_id=post_id,
+                    comment=fake_text(rng, rng.randint(2, 20)),
+                    contentType="text/plain",
+                    published=reaction_time(published),
+                )
+
+    created["comments"] = bulk_insert(Comment, new_comments())
+
+    def new_likes():
+        for post_id, index, published in posts:
+            liked = rng.randint(0, 2 * likes_per_post)
+            for liker in rng.sample(
+                followers[index], min(liked, len(followers[index]))
+            ):
+                yield PostLike(
+                    id=fake_id(rng),
+                    author_id=ids[liker],
+                    post_id=post_id,
+                    summary=f"{authors[liker].displayName} likes this"[:50],
+                    context="http://127.0.0.1:8000/",
+                    published=reaction_time(published),
+                )
+
+    created["likes"] = bulk_insert(PostLike, new_likes())
+
+    def new_requests():
+        for index, author in enumerate(authors):
+            asked = set(followers[index])
+            asked.add(index)
+            for _ in range(rng.randint(0, 2 * requests_per_author)):
+                follower = rng.randrange(count)
+                if follower not in asked:
+                    asked.add(follower)
+                    yield FollowRequest(
+                        id=fake_id(rng),
+                        follower_id=ids[follower],
+                        following=author,
+                        summary=(
+                            f"{authors[follower].displayName} wants to follow "
+                            f"{author.displayName}"
+                        ),
+                    )
+
+    created["follow_requests"] = bulk_insert(FollowRequest, new_requests())
+
+    Author.objects.update(follower_count=count_of(Follow, "to_author"))
+    refresh_counters()
+    bump([AUTHORS, COUNTERS])
+    return created
+
+
+def timed(fn, *args, **kwargs):
+    """
+    Run `fn` and return its wall time in milliseconds
+    """
+    started = time.perf_counter()
+    fn(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000
+
+
+def percentiles(samples):
+    """
+    p50/p95/p99 of a list of millisecond timings
+    """
+    if len(samples) < 2:
+        value = round(samples[0], 3) if samples else None
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+    }
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .serializers import AuthorSerializer, PostSerializer
+from .versions import COUNTERS, author_stamp, get_stamps, post_stamp
+
+
+class PayloadCache:
+    """
+    Read-through cache of serialized objects, keyed by primary key and the
+    version stamps of what the payload is built from. A change bumps a
+    stamp, which retires the old payload in every process without having to
+    delete it. The cache key version is the payload version, so bumping it
+    when a serializer's output changes retires every old payload at once.
+    """
+
+    def __init__(self, kind, serializer_class, stamp_names, version=1):
+        self.kind = kind
+        self.serializer_class = serializer_class
+        self.stamp_names = stamp_names
+        self.version = version
+
+    def key(self, instance, stamps):
+        changed = ".".join(str(stamps[name]) for name in self.stamp_names(instance))
+        return f"project:{self.kind}:{instance.pk}:{changed}"
+
+    def get_many(self, instances):
+        """
+        The payloads of `instances` in order, serializing and storing only
+        the ones missing from the cache
+        """
+        instances = list(instances)
+        stamps = get_stamps(
+            name for instance in instances for name in self.stamp_names(instance)
+        )
+        keys = [self.key(instance, stamps) for instance in instances]
+        payloads = cache.get_many(keys, version=self.version)
+
+        missing = {
+            key: instance
+            for instance, key in zip(instances, keys)
+            if key not in payloads
+        }
+        metrics.incr(
+            "serialization_cache_hits_total",
+            len(instances) - len(missing),
+            kind=self.kind,
+        )
+        metrics.incr("serialization_cache_misses_total", len(missing), kind=self.kind)
+        if missing:
+            data = self.serializer_class(list(missing.values()), many=True).data
+            fresh = {key: dict(payload) for key, payload in zip(missing, data)}
+            cache.set_many(
+                fresh, settings.SERIALIZATION_CACHE_TIMEOUT, version=self.version
+            )
+            payloads.update(fresh)
+
+        return [payloads[key] for key in keys]
+
+    def get(self, instance):
+        return self.get_many([instance])[0]
+
+
+author_payloads = PayloadCache(
+    "author", AuthorSerializer, lambda author: [author_stamp(author.pk)]
+)
+# The payload carries the comment count
+post_payloads = PayloadCache(
+    "post", PostSerializer, lambda post: [post_stamp(post.pk), COUNTERS]
+)
@@ -0,0 +1,82 @@
+import re
+
+from django.db.models import F
+
+from .models import Category, Post, PostCategory
+from .pagination import KeysetPaginator
+
+category_feed_paginator = KeysetPaginator(keys=("-published", "-post_id"))
+
+
+def parse_categories(text):
+    """
+    Split free-form categories text into unique, lower-case category names
+    """
+    max_length = Category._meta.get_field("name").max_length
+    names = []
+    for name in re.findall(r"[\w-]+", (text or "").lower()):
+        name = name[:max_length]
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def is_indexed(post):
+    """
+    Only public, listed posts appear in category feeds
+    """
+    return post.visibility == Post.VisibilityChoice.PUBLIC and not post.unlisted
+
+
+def sync_post_categories(post):
+    """
+    Make the post's rows in the category index match its categories text,
+    adjusting the post count of every category it joins or leaves
+    """
+    wanted = set(parse_categories(post.categories)) if is_indexed(post) else set()
+    current = dict(
+        PostCategory.objects.filter(post=post).values_list(
+            "category__name", "category_id"
+        )
+    )
+
+    removed = [current[name] for name in current.keys() - wanted]
+    if removed:
+        PostCategory.objects.filter(post=post, category_id__in=removed).delete()
+        Category.objects.filter(pk__in=removed).update(post_count=F("post_count") - 1)
+
+    if current.keys() & wanted:
+        PostCategory.objects.filter(post=post).exclude(published=post.published).update(
+            published=post.published
+        )
+
+    added = wanted - current.keys()
+    if added:
+        Category.objects.bulk_create(
+            [Category(name=name) for name in added], ignore_conflicts=True
+        )
+        categories = Category.objects.filter(name__in=added)
+        PostCategory.objects.bulk_create(
+            PostCategory(post=post, category=category, published=post.published)
+            for category in categories
+        )
+        categories.update(post_count=F("post_count") + 1)
+
+
+def remove_post_categories(post):
+    """
+    Take a post that is about to be deleted out of its categories' counts
+    """
+    Category.objects.filter(post_categories__post=post).update(
+        post_count=F("post_count") - 1
+    )
+
+
+def get_category_feed_page(category, cursor=None, size=None):
+    """
+    One page of a category's posts, newest first
+    """
+    rows = category.post_categories.select_related("post")
+    page = category_feed_paginator.paginate(rows, cursor, size)
+    page.items = [row.post for row in page.items]
+    return page
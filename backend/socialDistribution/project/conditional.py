@@ -0,0 +1,56 @@
+import hashlib
+import math
+from datetime import datetime, timezone
+
+from django.views.decorators.http import condition
+
+from .versions import get_stamps
+
+
+def conditional_get(state_func, last_modified=True):
+    """
+    ETag and Last-Modified support for a GET view whose body is determined
+    by version stamps. `state_func(request, *args, **kwargs)` returns the
+    stamp names the response depends on, plus any other value that goes
+    into the ETag. The query string and the requesting user are always
+    part of the ETag. The body is never serialized to compute either
+    header, so an unchanged poll costs only the stamp lookups.
+
+    Last-Modified is the newest of the stamps. Pass `last_modified=False`
+    when the stamp names themselves depend on the state, since the newest
+    stamp can then go backwards, e.g. when the newest post on a page is
+    deleted; only the ETag is sent then.
+
+    Apply it below @api_view (or to an APIView method) so `request.user`
+    is the API user.
+    """
+
+    def state(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if not hasattr(request, "_conditional_state"):
+            names, extra = state_func(request, *args, **kwargs)
+            request._conditional_state = (get_stamps(names), extra)
+        return request._conditional_state
+
+    def etag(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None:
+            return None
+        stamps, extra = current
+        viewer = request.user.pk if request.user.is_authenticated else ""
+        parts = (sorted(stamps.items()), extra, request.get_full_path(), viewer)
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def modified(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None or not any(current[0].values()):
+            return None
+        # HTTP dates have whole seconds, so round up rather than claim a
+        # change happened before it did
+        seconds = math.ceil(max(current[0].values()) / 1e9)
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+    return condition(
+        etag_func=etag, last_modified_func=modified if last_modified else None
+    )
@@ -0,0 +1,36 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Category, Comment, CommentLike, Post, PostCategory, PostLike
+
+
+def count_of(model, field):
+    """
+    Correlated subquery counting the rows of `model` pointing at the outer
+    row through `field`
+    """
+    counts = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def refresh_counters():
+    """
+    Recompute every denormalized counter from the source tables, one UPDATE
+    per counter
+    """
+    return {
+        "post comments": Post.objects.update(comment_count=count_of(Comment, "post")),
+        "post likes": Post.objects.update(like_count=count_of(PostLike, "post")),
+        "comment likes": Comment.objects.update(
+            like_count=count_of(CommentLike, "comment")
+        ),
+        "category posts": Category.objects.update(
+            post_count=count_of(PostCategory, "category")
+        ),
+    }
@@ -0,0 +1,367 @@
+import asyncio
+import base64
+import json
+import logging
+import ssl
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urlsplit
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth another attempt; anything else is the peer's final answer
+RETRY_STATUSES = {502, 503, 504}
+# Methods that can be sent again without repeating their effect. Others are
+# sent once, as a timeout or 502-504 doesn't tell whether the peer acted.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class FederationError(Exception):
+    """
+    A request to a peer node failed for good
+    """
+
+
+class ProtocolError(FederationError):
+    """
+    A peer answered with something that isn't an HTTP/1.1 response, or with
+    a body over FEDERATION_MAX_BODY_BYTES
+    """
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError as e:
+            # JSONDecodeError and UnicodeDecodeError both
+            raise FederationError(f"bad JSON body: {e}") from None
+
+
+class Connection:
+    """
+    One HTTP/1.1 connection that can carry several requests in turn
+    """
+
+    def __init__(self, reader, writer, max_body):
+        self.reader = reader
+        self.writer = writer
+        self.max_body = max_body
+        self.reused = False
+
+    async def request(self, method, target, host, body=None, headers=None):
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {host}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+            f"Content-Length: {len(body or b'')}",
+        ]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if body:
+            self.writer.write(body)
+        await self.writer.drain()
+        return await self.read_response(method)
+
+    async def read_response(self, method):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by peer")
+        version, _, rest = status_line.partition(b" ")
+        status = rest[:3]
+        if not version.startswith(b"HTTP/") or not status.isdigit():
+            raise ProtocolError(f"bad status line {status_line[:100]!r}")
+        status = int(status)
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self.read_chunked()
+        elif "content-length" in headers:
+            length = headers["content-length"]
+            if not length.isdigit():
+                raise ProtocolError(f"bad Content-Length {length[:100]!r}")
+            self.check_size(int(length))
+            body = await self.reader.readexactly(int(length))
+        else:
+            # Delimited by the peer closing the connection
+            body = await self.read_to_close()
+            headers["connection"] = "close"
+        return Response(status, headers, body)
+
+    def check_size(self, size):
+        if size > self.max_body:
+            raise ProtocolError(f"body over {self.max_body} bytes")
+
+    async def read_to_close(self):
+        chunks = []
+        size = 0
+        while chunk := await self.reader.read(64 * 1024):
+            size += len(chunk)
+            self.check_size(size)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def read_chunked(self):
+        chunks = []
+        total = 0
+        while True:
+            line = await self.reader.readline()
+            try:
+                size = int(line.split(b";")[0], 16)
+            except ValueError:
+                raise ProtocolError(f"bad chunk size {line[:100]!r}") from None
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            total += size
+            self.check_size(total)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Keep-alive connections to one node, with at most `max_connections`
+    requests in flight at once
+    """
+
+    def __init__(self, base_url, max_connections, timeout, max_body):
+        # Paths are joined under the API URL, so it must end in a slash
+        if not base_url.endswith("/"):
+            base_url += "/"
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.scheme = parts.scheme
+        self.hostname = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.max_body = max_body
+        self.limit = asyncio.Semaphore(max_connections)
+        self.idle = []
+        self.opened = 0
+
+    async def connect(self):
+        ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+        reader, writer = await asyncio.open_connection(
+            self.hostname, self.port, ssl=ssl_context
+        )
+        self.opened += 1
+        return Connection(reader, writer, self.max_body)
+
+    async def request(self, method, url, body=None, headers=None):
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        async with self.limit:
+            while True:
+                connection = self.idle.pop() if self.idle else None
+                if connection is None:
+                    connection = await asyncio.wait_for(self.connect(), self.timeout)
+                try:
+                    response = await asyncio.wait_for(
+                        connection.request(
+                            method, target, self.host_header, body, headers
+                        ),
+                        self.timeout,
+                    )
+                except (OSError, asyncio.IncompleteReadError):
+                    connection.close()
+                    if connection.reused:
+                        # The peer dropped an idle connection; that's not a
+                        # failed attempt, so go again on a fresh one
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+
+                if response.headers.get("connection", "").lower() == "close":
+                    connection.close()
+                else:
+                    connection.reused = True
+                    self.idle.append(connection)
+                return response
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+class FederationClient:
+    """
+    Talks to the registered peer nodes over asyncio, keeping a pool of
+    keep-alive connections per node. Use it as an async context manager so
+    the pools are closed afterwards.
+    """
+
+    def __init__(
+        self,
+        max_connections=None,
+        timeout=None,
+        retries=None,
+        backoff=0.2,
+        max_body=None,
+    ):
+        self.max_connections = (
+            max_connections or settings.FEDERATION_MAX_CONNECTIONS_PER_NODE
+        )
+        self.timeout = timeout or settings.FEDERATION_TIMEOUT
+        self.max_body = max_body or settings.FEDERATION_MAX_BODY_BYTES
+        self.retries = settings.FEDERATION_RETRIES if retries is None else retries
+        self.backoff = backoff
+        self.pools = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+        self.pools = {}
+
+    def pool(self, node):
+        if node.pk not in self.pools:
+            self.pools[node.pk] = ConnectionPool(
+                node.apiURL, self.max_connections, self.timeout, self.max_body
+            )
+        return self.pools[node.pk]
+
+    async def request(self, node, method, path, body=None, headers=None):
+        """
+        Send a request to `path` under the node's API URL, or to a full URL
+        on the node, with the node's outbound credentials. Idempotent
+        methods are retried on connection errors, timeouts and 502-504
+        answers, with exponential backoff.
+        """
+        pool = self.pool(node)
+        url = urljoin(pool.base_url, path.lstrip("/"))
+        if node.outbound_username:
+            credentials = f"{node.outbound_username}:{node.outbound_password}"
+            headers = {
+                "Authorization": "Basic "
+                + base64.b64encode(credentials.encode()).decode(),
+                **(headers or {}),
+            }
+        retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            try:
+                response = await pool.request(method, url, body, headers)
+            except ProtocolError as e:
+                # A broken peer stays broken; don't retry it
+                metrics.incr("federation_errors_total", node=node.nodeName)
+                raise FederationError(f"{method} {url} failed") from e
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                error = e
+                metrics.incr("federation_errors_total", node=node.nodeName)
+            else:
+                metrics.incr(
+                    "federation_requests_total",
+                    node=node.nodeName,
+                    status=response.status,
+                )
+                if response.status not in RETRY_STATUSES:
+                    return response
+                error = FederationError(f"{method} {url} returned {response.status}")
+
+            if attempt < retries:
+                logger.info("retrying %s %s after %r", method, url, error)
+                await asyncio.sleep(self.backoff * 2**attempt)
+
+        raise FederationError(f"{method} {url} failed") from error
+
+    async def get_json(self, node, path):
+        response = await self.request(node, "GET", path)
+        if response.status != 200:
+            raise FederationError(f"GET {path} on {node.nodeName}: {response.status}")
+        return response.json()
+
+    async def get_object(self, node, path):
+        data = await self.get_json(node, path)
+        if not isinstance(data, dict):
+            raise FederationError(f"GET {path} on {node.nodeName}: not an object")
+        return data
+
+    async def get_items(self, node, path):
+        items = (await self.get_object(node, path)).get("items")
+        if not isinstance(items, list):
+            raise FederationError(f"GET {path} on {node.nodeName}: no items list")
+        return items
+
+    async def get_authors(self, node):
+        return await self.get_items(node, "authors/")
+
+    async def get_posts(self, node, author_id):
+        return await self.get_json(node, f"authors/{author_id}/posts/")
+
+    async def get_followers(self, node, author_id):
+        return await self.get_items(node, f"authors/{author_id}/followers/")
+
+    async def gather(self, nodes, fetch, *args):
+        """
+        Run `fetch(node, *args)` against every node concurrently. Returns a
+        dict from node to its result, or to the exception it failed with, so
+        one unreachable peer doesn't hide the others' answers.
+        """
+        nodes = list(nodes)
+        results = await asyncio.gather(
+            *(fetch(node, *args) for node in nodes), return_exceptions=True
+        )
+        return dict(zip(nodes, results))
+
+
+def fetch_remote_authors(nodes):
+    """
+    The author lists of `nodes`, fetched concurrently, for synchronous
+    callers
+    """
+
+    async def run():
+        async with FederationClient() as client:
+            return await client.gather(nodes, client.get_authors)
+
+    return run_sync(run())
+
+
+def run_sync(coroutine):
+    """
+    Run `coroutine` to completion for synchronous callers. A thread already
+    running an event loop, as under ASGI, can't start another one, so the
+    coroutine gets a thread of its own there.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
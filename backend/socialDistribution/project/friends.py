@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Author
+
+
+def friends_cache_key(author_id):
+    return f"project:friends:{author_id}"
+
+
+def friend_ids_query(author_id):
+    """
+    Ids of the authors that `author_id` follows and is followed back by, as
+    a queryset over the follow table
+    """
+    Follow = Author.following.through
+    followers = Follow.objects.filter(to_author_id=author_id).values("from_author_id")
+    return Follow.objects.filter(
+        from_author_id=author_id, to_author_id__in=followers
+    ).values_list("to_author_id", flat=True)
+
+
+def caches_friends():
+    """
+    Friend sets gate FRIENDS_ONLY posts, so they are only cached in a cache
+    that every process shares
+    """
+    return settings.SHARED_CACHE and settings.FRIENDS_CACHE_TIMEOUT > 0
+
+
+def get_friend_ids(author_id):
+    """
+    An author's friend ids, cached until the follow graph around them changes
+    """
+    if not caches_friends():
+        return frozenset(friend_ids_query(author_id))
+    key = friends_cache_key(author_id)
+    friend_ids = cache.get(key)
+    if friend_ids is None:
+        friend_ids = frozenset(friend_ids_query(author_id))
+        cache.set(key, friend_ids, settings.FRIENDS_CACHE_TIMEOUT)
+    return friend_ids
+
+
+def cached_friend_ids(author_id):
+    """
+    An author's friend ids if they are cached, or else the query for them so
+    that callers can embed it as a subquery instead of making a round trip
+    """
+    if not caches_friends():
+        return friend_ids_query(author_id)
+    friend_ids = cache.get(friends_cache_key(author_id))
+    if friend_ids is None:
+        return friend_ids_query(author_id)
+    return friend_ids
+
+
+def are_friends(author_id, other_id):
+    return other_id in get_friend_ids(author_id)
+
+
+def invalidate_friends(author_ids):
+    """
+    Drop the cached friend sets of `author_ids`, now and again once the
+    change commits, as a concurrent reader may cache the old set in between
+    """
+    keys = [friends_cache_key(author_id) for author_id in author_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,255 @@
+import uuid
+from urllib.parse import urlsplit
+
+from django.db import transaction
+
+from .counters import count_of
+from .models import Comment, FollowRequest, InboxItem, Post, PostLike
+from .remote_authors import get_remote_authors
+from .serializers import (
+    InboxCommentSerializer,
+    InboxFollowSerializer,
+    InboxLikeSerializer,
+    InboxPostSerializer,
+)
+from .signals import deliver, touch_posts
+from .versions import author_posts_stamp, bump, follow_requests_stamp, post_stamp
+
+# Most items taken in one batch
+MAX_INBOX_BATCH = 500
+
+ITEM_SERIALIZERS = {
+    "post": InboxPostSerializer,
+    "like": InboxLikeSerializer,
+    "comment": InboxCommentSerializer,
+    "follow": InboxFollowSerializer,
+}
+
+
+def id_in_url(url, collection):
+    """
+    The UUID following `collection` in a URL path like .../posts/<id>, or
+    None
+    """
+    parts = urlsplit(url).path.rstrip("/").split("/")
+    try:
+        return uuid.UUID(parts[parts.index(collection) + 1])
+    except (ValueError, IndexError):
+        return None
+
+
+def accepted(kind):
+    return {"type": kind, "result": "accepted"}
+
+
+def rejected(kind, errors):
+    return {"type": kind, "result": "rejected", "errors": errors}
+
+
+def ingest_items(recipient, items, sender):
+    """
+    Validate and store a batch of items delivered to `recipient`'s inbox by
+    the peer node `sender`, in one transaction. Only items by authors that
+    `sender` hosts are taken. Every remote author is stored once, and each
+    kind of row is written with one bulk insert. Returns a result per item,
+    in order. Items already stored are accepted again without being
+    duplicated.
+    """
+    results = [None] * len(items)
+    valid = {kind: [] for kind in ITEM_SERIALIZERS}
+    for index, item in enumerate(items):
+        kind = str(item.get("type", "")).lower() if isinstance(item, dict) else ""
+        if kind not in ITEM_SERIALIZERS:
+            results[index] = rejected(kind, {"type": ["Unknown item type"]})
+            continue
+        serializer = ITEM_SERIALIZERS[kind](data=item)
+        if serializer.is_valid():
+            valid[kind].append((index, serializer.validated_data))
+        else:
+            results[index] = rejected(kind, serializer.errors)
+
+    with transaction.atomic():
+        actors = {}
+        for kind, entries in valid.items():
+            for _, data in entries:
+                actor = data["actor" if kind == "follow" else "author"]
+                actors.setdefault(actor["url"], actor)
+        authors = get_remote_authors(actors, sender)
+
+        entries = {kind: [] for kind in ITEM_SERIALIZERS}
+        for kind, kind_entries in valid.items():
+            for index, data in kind_entries:
+                author = authors[data["actor" if kind == "follow" else "author"]["url"]]
+                if author is None or author.node_id != sender.pk:
+                    results[index] = rejected(
+                        kind, {"author": ["Not hosted by the sending node"]}
+                    )
+                else:
+                    entries[kind].append((index, data, author))
+
+        # Posts whose likes or comments changed, with their authors
+        reacted = {}
+        # Likes and comments are shown on the post rather than in the stream
+        rows = ingest_posts(recipient, entries["post"], results)
+        ingest_likes(recipient, entries["like"], results, reacted)
+        ingest_comments(recipient, entries["comment"], results, reacted)
+        ingest_follows(recipient, entries["follow"], results)
+
+        if rows:
+            deliver(rows)
+        if reacted:
+            Post.objects.filter(pk__in=reacted).update(
+                like_count=count_of(PostLike, "post"),
+                comment_count=count_of(Comment, "post"),
+            )
+            touch_posts(reacted)
+    return results
+
+
+def ingest_posts(recipient, entries, results):
+    """
+    Store the remote posts not seen before. Returns the inbox rows for all
+    of them.
+    """
+    owners = dict(
+        Post.objects.filter(pk__in={data["id"] for _, data, _ in entries}).values_list(
+            "pk", "author_id"
+        )
+    )
+    new_posts = []
+    rows = []
+    for index, data, author in entries:
+        post_id = data["id"]
+        if post_id not in owners:
+            fields = {
+                name: value
+                for name, value in data.items()
+                if name not in ("id", "author")
+            }
+            new_posts.append(Post(id=post_id, author=author, **fields))
+            owners[post_id] = author.pk
+        elif owners[post_id] != author.pk:
+            results[index] = rejected("post", {"id": ["Belongs to another author"]})
+            continue
+        rows.append(InboxItem(author=recipient, post_id=post_id))
+        results[index] = accepted("post")
+
+    if not new_posts:
+        return rows
+    Post.objects.bulk_create(new_posts)
+    bump(
+        [post_stamp(post.pk) for post in new_posts]
+        + [author_posts_stamp(post.author_id) for post in new_posts]
+    )
+    return rows
+
+
+def ingest_likes(recipient, entries, results, reacted):
+    liked_ids = {id_in_url(data["object"], "posts") for _, data, _ in entries}
+    posts = {post.pk: post for post in Post.objects.filter(pk__in=liked_ids - {None})}
+    liked = set(
+        PostLike.objects.filter(
+            post_id__in=posts, author_id__in={author.pk for _, _, author in entries}
+        ).values_list("author_id", "post_id")
+    )
+    new_likes = []
+    for index, data, author in entries:
+        post = posts.get(id_in_url(data["object"], "posts"))
+        if post is None or id_in_url(data["object"], "comments") is not None:
+            results[index] = rejected("like", {"object": ["Not a post on this node"]})
+            continue
+        if post.author_id != recipient.pk:
+            results[index] = rejected(
+                "like", {"object": ["Not a post by the recipient"]}
+            )
+            continue
+        if (author.pk, post.pk) not in liked:
+            liked.add((author.pk, post.pk))
+            new_likes.append(
+                PostLike(
+                    author=author,
+                    post=post,
+                    summary=data["summary"] or f"{author.displayName} likes this",
+                    context=post.source,
+                )
+            )
+            reacted[post.pk] = post.author_id
+        results[index] = accepted("like")
+
+    # Likes stored concurrently since `liked` was read are skipped
+    PostLike.objects.bulk_create(new_likes, ignore_conflicts=True)
+
+
+def ingest_comments(recipient, entries, results, reacted):
+    ids = [
+        (id_in_url(data["id"], "posts"), id_in_url(data["id"], "comments"))
+        for _, data, _ in entries
+    ]
+    posts = dict(
+        Post.objects.filter(
+            pk__in={post_id for post_id, _ in ids} - {None}
+        ).values_list("pk", "author_id")
+    )
+    seen = set(
+        Comment.objects.filter(
+            pk__in={comment_id for _, comment_id in ids} - {None}
+        ).values_list("pk", flat=True)
+    )
+    new_comments = []
+    for (index, data, author), (post_id, comment_id) in zip(entries, ids):
+        if post_id not in posts or comment_id is None:
+            results[index] = rejected("comment", {"id": ["Not a post on this node"]})
+            continue
+        if posts[post_id] != recipient.pk:
+            results[index] = rejected(
+                "comment", {"id": ["Not a post by the recipient"]}
+            )
+            continue
+        if comment_id not in seen:
+            seen.add(comment_id)
+            fields = {
+                name: data[name]
+                for name in ("comment", "contentType", "published")
+                if name in data
+            }
+            new_comments.append(
+                Comment(id=comment_id, author=author, post_id=post_id, **fields)
+            )
+            reacted[post_id] = posts[post_id]
+        results[index] = accepted("comment")
+
+    # Comments stored concurrently since `seen` was read are skipped
+    Comment.objects.bulk_create(new_comments, ignore_conflicts=True)
+
+
+def ingest_follows(recipient, entries, results):
+    """
+    Store a follow request from each actor not already following or asking
+    to follow `recipient`
+    """
+    actor_ids = {author.pk for _, _, author in entries}
+    skip = set(
+        FollowRequest.objects.filter(
+            following=recipient, follower_id__in=actor_ids
+        ).values_list("follower_id", flat=True)
+    )
+    skip.update(
+        recipient.followers.filter(pk__in=actor_ids).values_list("pk", flat=True)
+    )
+    new_requests = []
+    for index, data, author in entries:
+        if author.pk not in skip:
+            skip.add(author.pk)
+            summary = (
+                data["summary"]
+                or f"{author.displayName} wants to follow {recipient.displayName}"
+            )
+            new_requests.append(
+                FollowRequest(follower=author, following=recipient, summary=summary)
+            )
+        results[index] = accepted("follow")
+
+    if new_requests:
+        FollowRequest.objects.bulk_create(new_requests)
+        # Pending requests are listed on the stream page
+        bump([follow_requests_stamp(recipient.pk)])
@@ -0,0 +1,89 @@
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.constants import OnConflict
+from django.db.models.sql import InsertQuery
+from django.utils import timezone
+
+from .models import CommentLike, PostLike
+from .signals import touch_post
+
+
+def insert_ignoring_conflicts(obj):
+    """
+    INSERT `obj` unless it would break a unique constraint, in one
+    statement, and return whether it was inserted. This is the query
+    bulk_create(ignore_conflicts=True) builds, run here so its row count
+    can be read.
+    """
+    model = type(obj)
+    using = router.db_for_write(model)
+    query = InsertQuery(model, on_conflict=OnConflict.IGNORE)
+    query.insert_values(model._meta.concrete_fields, [obj])
+    with connections[using].cursor() as cursor:
+        for sql, params in query.get_compiler(using).as_sql():
+            cursor.execute(sql, params)
+        return cursor.rowcount == 1
+
+
+def write_like(model, target_field, author, target, liked, **fields):
+    """
+    Like (`liked` True), unlike (False) or toggle (None) `target` for
+    `author`, one statement each way. An unlike or a toggle first deletes
+    the like; a like, or a toggle that deleted nothing, inserts it with ON
+    CONFLICT DO NOTHING, so the (author, target) unique constraint keeps
+    concurrent requests from storing it twice. No signals are sent.
+    Returns (liked afterwards, whether anything changed).
+    """
+    key = {"author": author, target_field: target}
+    if liked is not True:
+        deleted = model.objects.filter(**key)._raw_delete(router.db_for_write(model))
+        if deleted or liked is False:
+            return False, deleted > 0
+    return True, insert_ignoring_conflicts(model(**key, **fields))
+
+
+def set_post_like(author, post, liked=None):
+    """
+    Set or toggle `author`'s like of `post`, keeping its like count and the
+    views showing it current. Returns whether the author likes it now.
+    """
+    with transaction.atomic():
+        liked, changed = write_like(
+            PostLike,
+            "post",
+            author,
+            post,
+            liked,
+            summary=f"{author.displayName} likes this"[:50],
+            context=post.source,
+            published=timezone.now(),
+        )
+        if changed:
+            type(post).objects.filter(pk=post.pk).update(
+                like_count=F("like_count") + (1 if liked else -1)
+            )
+            # The like rows are written without signals
+            touch_post(post.pk, post.author_id)
+    return liked
+
+
+def set_comment_like(author, comment, liked=None):
+    """
+    Set or toggle `author`'s like of `comment`. Returns whether the author
+    likes it now.
+    """
+    with transaction.atomic():
+        liked, changed = write_like(
+            CommentLike,
+            "comment",
+            author,
+            comment,
+            liked,
+            summary=f"{author.displayName} likes this"[:50],
+            context=comment.post.source,
+        )
+        if changed:
+            type(comment).objects.filter(pk=comment.pk).update(
+                like_count=F("like_count") + (1 if liked else -1)
+            )
+    return liked
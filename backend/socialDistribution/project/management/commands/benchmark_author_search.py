@@ -0,0 +1,67 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.benchmark import percentiles, seed_authors, timed
+from project.models import Author
+from project.search import author_search_paginator, search_authors
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic authors and time author search at each size. "
+        "The seeded rows are rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+        )
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            results = self.run(rng, sorted(options["sizes"]), options["queries"])
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run(self, rng, sizes, query_count):
+        results = []
+        names = list(Author.objects.values_list("displayName", flat=True)[:10_000])
+        for size in sizes:
+            missing = size - Author.objects.count()
+            if missing > 0:
+                names += [a.displayName for a in seed_authors(missing, rng)]
+
+            # Prefixes of real names, as typed into the search box
+            queries = [
+                name[: rng.randint(1, 5)] for name in rng.choices(names, k=query_count)
+            ]
+
+            def search(query):
+                list(author_search_paginator.paginate(search_authors(query)).items)
+
+            def scan(query):
+                # What SearchAuthors used to run
+                list(
+                    Author.objects.filter(displayName__icontains=query).order_by(
+                        "displayName"
+                    )
+                )
+
+            results.append(
+                {
+                    "authors": size,
+                    "search": percentiles([timed(search, q) for q in queries]),
+                    "icontains_scan": percentiles([timed(scan, q) for q in queries]),
+                }
+            )
+            self.stderr.write(f"Benchmarked {size} authors")
+        return results
@@ -0,0 +1,131 @@
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from project.benchmark import percentiles
+from project.models import Author, Post
+
+BENCHMARK_POST_TITLE = "Benchmark post"
+
+
+def stream_view(client, viewer, rng):
+    return client.get(reverse("project:home"))
+
+
+def update_inbox(client, viewer, rng):
+    return client.get(reverse("project:inbox_api", args=[viewer.pk]))
+
+
+def author_list(client, viewer, rng):
+    return client.get(reverse("project:get_authors"))
+
+
+def followers(client, viewer, rng, authors):
+    return client.get(reverse("project:get_followers", args=[rng.choice(authors)]))
+
+
+def search_authors(client, viewer, rng):
+    query = viewer.displayName[: rng.randint(1, 5)]
+    return client.get(reverse("project:search"), {"username": query})
+
+
+def create_post(client, viewer, rng):
+    return client.post(
+        reverse("project:create-post"),
+        {
+            "title": BENCHMARK_POST_TITLE,
+            "description": "Written by benchmark_views",
+            "content": "Benchmark post",
+            "categories": "benchmark",
+            "visibility": Post.VisibilityChoice.PUBLIC,
+        },
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the main pages and API views through the test client as random "
+        "seeded authors, reporting latency percentiles and query counts. Seed "
+        "the database with seed_social_graph first. The posts created are "
+        "deleted afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        author_ids = sorted(
+            Author.objects.filter(node__isnull=True, user__is_active=True).values_list(
+                "pk", flat=True
+            )
+        )
+        if not author_ids:
+            raise CommandError("No authors to log in as; run seed_social_graph first")
+        sampled = rng.sample(author_ids, min(options["requests"], len(author_ids)))
+        viewers = Author.objects.select_related("user").in_bulk(sampled)
+        viewers = [viewers[pk] for pk in sampled]
+
+        views = {
+            "stream_view": stream_view,
+            "update_inbox": update_inbox,
+            "AuthorAPIView": author_list,
+            "FollowersAPIView": partial(followers, authors=author_ids),
+            "SearchAuthors": search_authors,
+            "create_post": create_post,
+        }
+        results = {
+            "authors": len(author_ids),
+            "requests": options["requests"],
+            "views": {},
+        }
+        started = timezone.now()
+        try:
+            for name, view in views.items():
+                results["views"][name] = self.run(
+                    view, viewers, rng, options["requests"]
+                )
+                self.stderr.write(f"Benchmarked {name}")
+        finally:
+            if not options["keep"]:
+                Post.objects.filter(
+                    author__in=viewers,
+                    title=BENCHMARK_POST_TITLE,
+                    published__gte=started,
+                ).delete()
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run(self, view, viewers, rng, count):
+        client = APIClient(SERVER_NAME="localhost")
+        timings = []
+        queries = []
+        statuses = Counter()
+        for i in range(count):
+            viewer = viewers[i % len(viewers)]
+            client.force_login(viewer.user)
+            client.force_authenticate(viewer.user)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = view(client, viewer, rng)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses[str(response.status_code)] += 1
+        return dict(
+            percentiles(timings),
+            queries_mean=round(statistics.mean(queries), 1),
+            queries_max=max(queries),
+            statuses=dict(statuses),
+        )
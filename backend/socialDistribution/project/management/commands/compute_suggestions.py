@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.suggestions import rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = "Rebuild the friend-of-friend author suggestions from the follow graph"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_suggestions()
+        self.stdout.write(f"Stored {rows} suggestions")
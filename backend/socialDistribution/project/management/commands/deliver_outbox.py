@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project import metrics
+from project.outbox import OUTBOX_BATCH_SIZE, deliver_due, record_queue_gauges
+
+
+class Command(BaseCommand):
+    help = "Deliver queued items to remote inboxes, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Deliver one batch and exit"
+        )
+        parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when nothing is due",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            outcome = deliver_due(options["batch_size"])
+            # Reported by the web process's /metrics/
+            record_queue_gauges()
+            metrics.flush()
+            if options["once"]:
+                break
+            if not any(outcome.values()):
+                time.sleep(options["interval"])
+        self.stdout.write(
+            "Delivered {delivered}, retrying {retried}, failed {failed}".format(
+                **outcome
+            )
+        )
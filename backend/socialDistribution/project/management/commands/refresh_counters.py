@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.counters import refresh_counters
+from project.versions import COUNTERS, bump
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized like, comment and category counters"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = refresh_counters()
+        # The counts are written with UPDATE, which sends no signals
+        bump([COUNTERS])
+        for counter, rows in updated.items():
+            self.stdout.write(f"Refreshed {counter} on {rows} rows")
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from project import metrics
+from project.remote_authors import REFRESH_BATCH_SIZE, refresh_due
+
+
+class Command(BaseCommand):
+    help = "Fetch the profiles of remote authors whose cached copy went stale"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Refresh one batch and exit"
+        )
+        parser.add_argument("--batch-size", type=int, default=REFRESH_BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when nothing is requested",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            outcome = refresh_due(options["batch_size"])
+            # Reported by the web process's /metrics/
+            metrics.flush()
+            if options["once"]:
+                break
+            if not any(outcome.values()):
+                time.sleep(options["interval"])
+        self.stdout.write("Refreshed {refreshed}, failed {failed}".format(**outcome))
@@ -0,0 +1,40 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project.benchmark import seed_social_graph
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic social graph for benchmarking: authors with power-law "
+        "follower counts, their posts, comments, likes and follow requests. "
+        "The same --seed gives the same rows, ids and timestamps included, "
+        "on a database without seeded authors. Run compute_suggestions "
+        "afterwards to suggest authors from it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--authors", type=int, default=10_000)
+        parser.add_argument("--mean-followers", type=int, default=20)
+        parser.add_argument("--posts-per-author", type=int, default=5)
+        parser.add_argument("--comments-per-post", type=int, default=2)
+        parser.add_argument("--likes-per-post", type=int, default=5)
+        parser.add_argument("--requests-per-author", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            created = seed_social_graph(
+                options["authors"],
+                rng,
+                mean_followers=options["mean_followers"],
+                posts_per_author=options["posts_per_author"],
+                comments_per_post=options["comments_per_post"],
+                likes_per_post=options["likes_per_post"],
+                requests_per_author=options["requests_per_author"],
+            )
+        self.stdout.write(json.dumps(created, indent=2))
@@ -0,0 +1,134 @@
+import threading
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import MetricTotal
+
+# Counters live in the process that counts them and reset when it restarts,
+# as Prometheus counters are expected to. Worker processes flush theirs to
+# the database, where the web process reads them.
+_counts = Counter()
+_gauges = {}
+_lock = threading.Lock()
+
+
+def series(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def incr(name, amount=1, **labels):
+    """
+    Add `amount` to the counter `name` with the given labels
+    """
+    if amount:
+        with _lock:
+            _counts[series(name, labels)] += amount
+
+
+def observe(name, value, **labels):
+    """
+    Record one measurement, e.g. a duration in seconds, as the `name_sum`
+    and `name_count` counters
+    """
+    incr(f"{name}_sum", value, **labels)
+    incr(f"{name}_count", 1, **labels)
+
+
+def set_gauge(name, value, **labels):
+    """
+    Report `value` as the gauge `name` until it is set again
+    """
+    with _lock:
+        _gauges[series(name, labels)] = value
+
+
+def get(name, **labels):
+    return _counts[series(name, labels)]
+
+
+def reset():
+    with _lock:
+        _counts.clear()
+        _gauges.clear()
+
+
+def label_text(labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+
+def value_text(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def flush():
+    """
+    Move this process's counters and gauges into the database, adding the
+    counters to the totals there. Worker processes call this after each
+    batch so their metrics show up on the web process's /metrics/.
+    """
+    with _lock:
+        counts = dict(_counts)
+        gauges = dict(_gauges)
+        _counts.clear()
+        _gauges.clear()
+
+    with transaction.atomic():
+        for (name, labels), amount in sorted(counts.items()):
+            labels = label_text(labels)
+            try:
+                with transaction.atomic():
+                    MetricTotal.objects.get_or_create(name=name, labels=labels)
+            except IntegrityError:
+                # Created by another worker in the meantime
+                pass
+            MetricTotal.objects.filter(name=name, labels=labels).update(
+                value=F("value") + amount
+            )
+        if gauges:
+            MetricTotal.objects.bulk_create(
+                [
+                    MetricTotal(
+                        name=name, labels=label_text(labels), gauge=True, value=value
+                    )
+                    for (name, labels), value in sorted(gauges.items())
+                ],
+                update_conflicts=True,
+                unique_fields=["name", "labels"],
+                update_fields=["gauge", "value"],
+            )
+
+
+def render():
+    """
+    Every counter and gauge, of this process and flushed by workers, in the
+    Prometheus text exposition format
+    """
+    with _lock:
+        counts = Counter(
+            {(name, label_text(labels)): n for (name, labels), n in _counts.items()}
+        )
+        gauges = {
+            (name, label_text(labels)): value
+            for (name, labels), value in _gauges.items()
+        }
+    for name, labels, gauge, value in MetricTotal.objects.values_list(
+        "name", "labels", "gauge", "value"
+    ):
+        if gauge:
+            gauges[name, labels] = value
+        else:
+            counts[name, labels] += value
+
+    lines = []
+    for kind, values in [("counter", counts), ("gauge", gauges)]:
+        previous = None
+        for (name, labels), value in sorted(values.items()):
+            if name != previous:
+                lines.append(f"# TYPE {name} {kind}")
+                previous = name
+            series_name = f"{name}{{{labels}}}" if labels else name
+            lines.append(f"{series_name} {value_text(value)}")
+    return "\n".join(lines) + "\n"
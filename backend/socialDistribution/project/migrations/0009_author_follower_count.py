@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_followers(apps, schema_editor):
+    Author = apps.get_model("project", "Author")
+    Follow = Author.following.through
+    counts = (
+        Follow.objects.filter(to_author=OuterRef("pk"))
+        .order_by()
+        .values("to_author")
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    Author.objects.update(follower_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0008_auto_20231101_1531"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="follower_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_followers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,124 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def copy_stream_posts(apps, schema_editor):
+    Author = apps.get_model("project", "Author")
+    InboxItem = apps.get_model("project", "InboxItem")
+    rows = Author.streamPosts.through.objects.values_list(
+        "author_id", "post_id", "post__published"
+    )
+
+    batch = []
+    for author_id, post_id, published in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(
+            InboxItem(
+                author_id=author_id,
+                post_id=post_id,
+                received_at=published,
+                item_type="post",
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            InboxItem.objects.bulk_create(batch)
+            batch = []
+    InboxItem.objects.bulk_create(batch)
+
+
+def copy_inbox_items(apps, schema_editor):
+    Author = apps.get_model("project", "Author")
+    InboxItem = apps.get_model("project", "InboxItem")
+    StreamPost = Author.streamPosts.through
+    rows = InboxItem.objects.filter(item_type="post").values_list(
+        "author_id", "post_id"
+    )
+
+    batch = []
+    for author_id, post_id in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(StreamPost(author_id=author_id, post_id=post_id))
+        if len(batch) >= BATCH_SIZE:
+            StreamPost.objects.bulk_create(batch)
+            batch = []
+    StreamPost.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0009_author_follower_count"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="published",
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name="InboxItem",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "received_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "item_type",
+                    models.CharField(
+                        choices=[("post", "post")], default="post", max_length=20
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inbox_items",
+                        to="project.author",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="inbox_items",
+                        to="project.post",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["author", "-received_at"],
+                        name="inbox_author_received_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="inboxitem",
+            constraint=models.UniqueConstraint(
+                fields=("author", "post", "item_type"), name="unique_inbox_item"
+            ),
+        ),
+        # Django can't add a through model to an existing M2M in place, so
+        # copy the rows over and recreate the field on top of InboxItem
+        migrations.RunPython(copy_stream_posts, copy_inbox_items),
+        migrations.RemoveField(
+            model_name="author",
+            name="streamPosts",
+        ),
+        migrations.AddField(
+            model_name="author",
+            name="streamPosts",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="inboxes",
+                through="project.InboxItem",
+                to="project.post",
+            ),
+        ),
+    ]
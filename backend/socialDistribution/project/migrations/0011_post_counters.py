@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model("project", "Post")
+    Comment = apps.get_model("project", "Comment")
+    PostLike = apps.get_model("project", "PostLike")
+    CommentLike = apps.get_model("project", "CommentLike")
+
+    Post.objects.update(
+        comment_count=count_of(Comment, "post"),
+        like_count=count_of(PostLike, "post"),
+    )
+    Comment.objects.update(like_count=count_of(CommentLike, "comment"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0010_inboxitem"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="post",
+            old_name="count",
+            new_name="comment_count",
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="like_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="like_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0011_post_counters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="comment",
+            name="published",
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "published", "id"], name="comment_post_published_idx"
+            ),
+        ),
+    ]
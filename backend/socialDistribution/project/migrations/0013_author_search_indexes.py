@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:28
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+POSTGRES_INDEXES = [
+    (
+        "author_displayname_trgm_idx",
+        "CREATE INDEX author_displayname_trgm_idx ON project_author "
+        'USING gin (LOWER("displayName") gin_trgm_ops)',
+    ),
+    (
+        "author_displayname_prefix_idx",
+        "CREATE INDEX author_displayname_prefix_idx ON project_author "
+        '(LOWER("displayName") varchar_pattern_ops)',
+    ),
+]
+
+
+def create_postgres_indexes(apps, schema_editor):
+    # Trigram and LIKE-prefix indexes only exist on Postgres; other
+    # databases fall back to the plain lower(displayName) index
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for _, sql in POSTGRES_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0012_comment_published_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="author",
+            index=models.Index(
+                django.db.models.functions.text.Lower("displayName"),
+                name="author_displayname_lower_idx",
+            ),
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
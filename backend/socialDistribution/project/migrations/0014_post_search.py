@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:10
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRES_SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}.categories, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}.description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}.content, '')), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            """
+            CREATE FUNCTION project_post_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """.format(POSTGRES_SEARCH_VECTOR.format(row="NEW"))
+        )
+        schema_editor.execute(
+            """
+            CREATE TRIGGER project_post_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, description, content, categories
+            ON project_post FOR EACH ROW
+            EXECUTE FUNCTION project_post_search_vector_update()
+            """
+        )
+        schema_editor.execute(
+            "UPDATE project_post SET search_vector = {}".format(
+                POSTGRES_SEARCH_VECTOR.format(row="project_post")
+            )
+        )
+        schema_editor.execute(
+            "CREATE INDEX post_search_vector_idx ON project_post "
+            "USING gin (search_vector)"
+        )
+    elif vendor == "sqlite":
+        # Filled and kept in sync by search.install_post_search_triggers,
+        # which runs after every migrate
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE project_post_fts USING fts5("
+            "title, description, content, categories, "
+            "tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS post_search_vector_idx")
+        schema_editor.execute(
+            "DROP TRIGGER IF EXISTS project_post_search_vector_trigger ON project_post"
+        )
+        schema_editor.execute(
+            "DROP FUNCTION IF EXISTS project_post_search_vector_update()"
+        )
+    elif vendor == "sqlite":
+        for action in ("insert", "update", "delete"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS project_post_fts_{action}")
+        schema_editor.execute("DROP TABLE IF EXISTS project_post_fts")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0013_author_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:36
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def split_categories(apps, schema_editor):
+    Post = apps.get_model("project", "Post")
+    Category = apps.get_model("project", "Category")
+    PostCategory = apps.get_model("project", "PostCategory")
+
+    names_by_post = {}
+    for post_id, published, text in (
+        Post.objects.filter(visibility="PUBLIC", unlisted=False)
+        .values_list("id", "published", "categories")
+        .iterator()
+    ):
+        names = dict.fromkeys(name[:50] for name in re.findall(r"[\w-]+", text.lower()))
+        if names:
+            names_by_post[post_id] = (published, names)
+
+    counts = {}
+    for _, names in names_by_post.values():
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+    Category.objects.bulk_create(
+        [Category(name=name, post_count=count) for name, count in counts.items()],
+        batch_size=1000,
+    )
+
+    category_ids = dict(Category.objects.values_list("name", "id"))
+    PostCategory.objects.bulk_create(
+        [
+            PostCategory(
+                post_id=post_id, category_id=category_ids[name], published=published
+            )
+            for post_id, (published, names) in names_by_post.items()
+            for name in names
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0014_post_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("post_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PostCategory",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("published", models.DateTimeField()),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_categories",
+                        to="project.category",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="post_categories",
+                        to="project.post",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="posts",
+                through="project.PostCategory",
+                to="project.category",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="postcategory",
+            index=models.Index(
+                fields=["category", "-published", "-post"], name="category_feed_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="postcategory",
+            constraint=models.UniqueConstraint(
+                fields=("post", "category"), name="unique_post_category"
+            ),
+        ),
+        migrations.RunPython(split_categories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0015_post_categories"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorSuggestion",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("score", models.IntegerField(default=0)),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="suggestions",
+                        to="project.author",
+                    ),
+                ),
+                (
+                    "suggested",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="project.author",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["author", "-score", "suggested"],
+                        name="suggestion_author_score_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="authorsuggestion",
+            constraint=models.UniqueConstraint(
+                fields=("author", "suggested"), name="unique_author_suggestion"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0016_author_suggestions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-published", "-id"], name="post_author_published_idx"
+            ),
+        ),
+    ]
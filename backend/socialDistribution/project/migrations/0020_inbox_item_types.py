@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0019_remote_authors"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="inboxitem",
+            name="item_type",
+            field=models.CharField(
+                choices=[("post", "post"), ("like", "like"), ("comment", "comment")],
+                default="post",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def drop_duplicates(like_model, target_model, target_field):
+    """
+    Keep one like per author and target, and recount the targets that had
+    more
+    """
+    duplicated = (
+        like_model.objects.values("author", target_field)
+        .annotate(n=Count("*"))
+        .filter(n__gt=1)
+    )
+    targets = set()
+    for pair in duplicated:
+        key = {"author": pair["author"], target_field: pair[target_field]}
+        extra = like_model.objects.filter(**key).values_list("pk", flat=True)[1:]
+        like_model.objects.filter(pk__in=list(extra)).delete()
+        targets.add(pair[target_field])
+    target_model.objects.filter(pk__in=targets).update(
+        like_count=count_of(like_model, target_field)
+    )
+
+
+def dedupe_likes(apps, schema_editor):
+    drop_duplicates(
+        apps.get_model("project", "PostLike"), apps.get_model("project", "Post"), "post"
+    )
+    drop_duplicates(
+        apps.get_model("project", "CommentLike"),
+        apps.get_model("project", "Comment"),
+        "comment",
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0020_inbox_item_types"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="commentlike",
+            constraint=models.UniqueConstraint(
+                fields=("author", "comment"), name="unique_comment_like"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="postlike",
+            constraint=models.UniqueConstraint(
+                fields=("author", "post"), name="unique_post_like"
+            ),
+        ),
+    ]
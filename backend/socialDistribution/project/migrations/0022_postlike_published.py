@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0021_unique_likes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postlike",
+            name="published",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="postlike",
+            index=models.Index(
+                fields=["post", "published", "id"], name="postlike_post_published_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+FTS_COLUMNS = "title, description, content, categories"
+
+
+def rebuild_fts_table(schema_editor, columns):
+    """
+    Recreate the SQLite FTS5 table with `columns`, empty and without its
+    triggers; search.install_post_search_triggers refills it after migrate
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for action in ("insert", "update", "delete"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS project_post_fts_{action}")
+    schema_editor.execute("DROP TABLE IF EXISTS project_post_fts")
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE project_post_fts USING fts5({columns}, "
+        "tokenize='porter unicode61')"
+    )
+
+
+def key_by_post_id(apps, schema_editor):
+    # The post's rowid is renumbered by VACUUM, since Post has no integer
+    # primary key, so the post id is stored instead
+    rebuild_fts_table(schema_editor, f"post_id UNINDEXED, {FTS_COLUMNS}")
+
+
+def key_by_rowid(apps, schema_editor):
+    rebuild_fts_table(schema_editor, FTS_COLUMNS)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0022_postlike_published"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostSearchEntry",
+            fields=[
+                ("rowid", models.IntegerField(primary_key=True, serialize=False)),
+            ],
+            options={
+                "db_table": "project_post_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(key_by_post_id, key_by_rowid),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0023_post_search_by_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Stamp",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("changed", models.BigIntegerField()),
+            ],
+        ),
+    ]
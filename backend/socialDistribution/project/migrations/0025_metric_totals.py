@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0024_stamps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricTotal",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100)),
+                ("labels", models.CharField(blank=True, max_length=200)),
+                ("gauge", models.BooleanField(default=False)),
+                ("value", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="metrictotal",
+            constraint=models.UniqueConstraint(
+                fields=("name", "labels"), name="unique_metric_series"
+            ),
+        ),
+    ]
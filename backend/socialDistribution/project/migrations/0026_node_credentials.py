@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0025_metric_totals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="password",
+            field=models.CharField(blank=True, max_length=128),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="username",
+            field=models.CharField(blank=True, max_length=150),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0026_node_credentials"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="refresh_requested_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="author",
+            name="refreshed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="author",
+            index=models.Index(
+                condition=models.Q(("refresh_requested_at__isnull", False)),
+                fields=["refresh_requested_at"],
+                name="author_refresh_requested_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0027_author_refresh"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="node",
+            name="outbound_password",
+            field=models.CharField(blank=True, max_length=128),
+        ),
+        migrations.AddField(
+            model_name="node",
+            name="outbound_username",
+            field=models.CharField(blank=True, max_length=150),
+        ),
+    ]
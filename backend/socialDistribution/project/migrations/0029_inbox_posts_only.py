@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+def drop_reaction_rows(apps, schema_editor):
+    """
+    Likes and comments delivered by peers are stored on the post, and their
+    inbox rows were never read
+    """
+    InboxItem = apps.get_model("project", "InboxItem")
+    InboxItem.objects.exclude(item_type="post").delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0028_node_outbound_credentials"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_reaction_rows, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="inboxitem",
+            name="item_type",
+            field=models.CharField(
+                choices=[("post", "post")], default="post", max_length=20
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("project", "0029_inbox_posts_only"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="suggestion_floor",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
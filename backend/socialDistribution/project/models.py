@@ -1,14 +1,19 @@
 from django.db import models
+from django.db.models.functions import Lower
 import uuid
-from datetime import datetime
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.contrib.postgres.search import SearchVectorField
 from django.urls import reverse
+from django.utils import timezone
 
 # Create your models here.
 
 
 class Author(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # Unset for the shadow rows of remote authors, see remote_authors.py
+    user = models.OneToOneField(User, null=True, blank=True, on_delete=models.CASCADE)
     id = models.UUIDField(
         primary_key=True, default=uuid.uuid4, editable=False, unique=True
     )
@@ -24,10 +29,49 @@ class Author(models.Model):
 
     bio = models.CharField(max_length=1000, blank=True)
 
-    streamPosts = models.ManyToManyField("Post", related_name="inboxes", blank=True)
+    streamPosts = models.ManyToManyField(
+        "Post", through="InboxItem", related_name="inboxes", blank=True
+    )
     following = models.ManyToManyField(
         "Author", related_name="followers", symmetrical=False, blank=True
     )
+    # Kept in sync with `followers` by signals.on_follow_change
+    follower_count = models.PositiveIntegerField(default=0)
+    # Set for authors hosted on a peer node, whose inbox lives there
+    node = models.ForeignKey(
+        "Node",
+        related_name="authors",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+    )
+    # For remote authors: when a stale cached profile asked for a refresh,
+    # and when the refresh_remote_authors worker last fetched it
+    refresh_requested_at = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    # The highest score of any suggestion left out of the author's
+    # AuthorSuggestion rows, see suggestions.py
+    suggestion_floor = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Case-insensitive name search and ordering, see search.py
+            models.Index(Lower("displayName"), name="author_displayname_lower_idx"),
+            # The worker claims requested refreshes, oldest first
+            models.Index(
+                fields=["refresh_requested_at"],
+                condition=models.Q(refresh_requested_at__isnull=False),
+                name="author_refresh_requested_idx",
+            ),
+        ]
+        constraints = [
+            # Remote authors are looked up by URL
+            models.UniqueConstraint(
+                fields=["url"],
+                condition=models.Q(node__isnull=False),
+                name="author_remote_url_unique",
+            )
+        ]
 
 
 class FollowRequest(models.Model):
@@ -55,26 +99,164 @@ class Post(models.Model):
     contentType = models.CharField(max_length=200)
     content = models.TextField(max_length=600)
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
-    categories = models.CharField(max_length=200, default="")  # TODO Change to list
-    count = models.IntegerField(default=0)
-    published = models.DateTimeField(default=datetime.now, blank=True)
+    # Free-form text as entered by the author. Public posts are also indexed
+    # by the individual categories in `tags`, see categories.py
+    categories = models.CharField(max_length=200, default="")
+    tags = models.ManyToManyField(
+        "Category", through="PostCategory", related_name="posts", blank=True
+    )
+    # Maintained with F() updates as likes and comments are added, and
+    # recomputed by `manage.py refresh_counters`
+    comment_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0)
+    published = models.DateTimeField(default=timezone.now, blank=True)
     visibility = models.CharField(
         max_length=50, choices=VisibilityChoice.choices, default=VisibilityChoice.PUBLIC
     )
     unlisted = models.BooleanField()
+    # Filled in by a database trigger on Postgres, see search.search_posts
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Profiles, the author posts API and pulled stream posts read one
+            # author's posts newest first
+            models.Index(
+                fields=["author", "-published", "-id"],
+                name="post_author_published_idx",
+            )
+        ]
 
     def get_absolute_url(self):
         return reverse("project:post", kwargs={"pk": self.pk})
 
 
+class PostSearchEntry(models.Model):
+    """
+    A post's row in the SQLite FTS5 table, so searches can join it to its
+    post. The table is created by migration and kept in sync by triggers,
+    see search.install_post_search_triggers; it doesn't exist on Postgres.
+    """
+
+    rowid = models.IntegerField(primary_key=True)
+    post = models.OneToOneField(
+        Post,
+        related_name="search_entry",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+
+    class Meta:
+        managed = False
+        db_table = "project_post_fts"
+
+
+class Category(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=50, unique=True)
+    # Number of public, listed posts in the category
+    post_count = models.PositiveIntegerField(default=0)
+
+
+class PostCategory(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    post = models.ForeignKey(
+        Post, related_name="post_categories", on_delete=models.CASCADE
+    )
+    category = models.ForeignKey(
+        Category, related_name="post_categories", on_delete=models.CASCADE
+    )
+    # Copied from the post so category feeds are read from this table alone
+    published = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "category"], name="unique_post_category"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["category", "-published", "-post"],
+                name="category_feed_idx",
+            )
+        ]
+
+
+class InboxItem(models.Model):
+    class ItemType(models.TextChoices):
+        POST = "post", "post"
+
+    id = models.BigAutoField(primary_key=True)
+    author = models.ForeignKey(
+        Author, related_name="inbox_items", on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(Post, related_name="inbox_items", on_delete=models.CASCADE)
+    received_at = models.DateTimeField(default=timezone.now)
+    item_type = models.CharField(
+        max_length=20, choices=ItemType.choices, default=ItemType.POST
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "post", "item_type"], name="unique_inbox_item"
+            )
+        ]
+        indexes = [
+            # Streams are read newest first, one author at a time
+            models.Index(
+                fields=["author", "-received_at"], name="inbox_author_received_idx"
+            )
+        ]
+
+
+class AuthorSuggestion(models.Model):
+    """
+    How many of the authors `author` follows in turn follow `suggested`,
+    for the local authors `author` doesn't follow yet with the highest
+    scores. Rebuilt by the compute_suggestions command and kept current as
+    follows change.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    author = models.ForeignKey(
+        Author, related_name="suggestions", on_delete=models.CASCADE
+    )
+    suggested = models.ForeignKey(Author, related_name="+", on_delete=models.CASCADE)
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "suggested"], name="unique_author_suggestion"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["author", "-score", "suggested"],
+                name="suggestion_author_score_idx",
+            )
+        ]
+
+
 class Comment(models.Model):
     # TODO needs a foreign key for Post
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
     comment = models.TextField(max_length=600)
     contentType = models.CharField(max_length=200)
-    published = models.DateTimeField(default=datetime.now, blank=True)
+    published = models.DateTimeField(default=timezone.now, blank=True)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    like_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Comments are paged oldest first per post
+            models.Index(
+                fields=["post", "published", "id"], name="comment_post_published_idx"
+            )
+        ]
 
 
 class PostLike(models.Model):
@@ -83,6 +265,19 @@ class PostLike(models.Model):
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    published = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # Likes are toggled with INSERT ... ON CONFLICT, see likes.py
+            models.UniqueConstraint(fields=["author", "post"], name="unique_post_like")
+        ]
+        indexes = [
+            # Likes are paged oldest first per post
+            models.Index(
+                fields=["post", "published", "id"], name="postlike_post_published_idx"
+            )
+        ]
 
 
 class CommentLike(models.Model):
@@ -92,9 +287,100 @@ class CommentLike(models.Model):
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "comment"], name="unique_comment_like"
+            )
+        ]
+
 
 class Node(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     nodeName = models.CharField(max_length=50)
     apiURL = models.URLField(max_length=200)
     host = models.GenericIPAddressField(default="127.0.0.1:8000")
+    # What the node sends over HTTP Basic to authenticate as itself, see
+    # authentication.py. The password is hashed like a user's.
+    username = models.CharField(max_length=150, blank=True)
+    password = models.CharField(max_length=128, blank=True)
+    # What we send the node over HTTP Basic, as it registered us. Kept in
+    # plain, since it has to be sent.
+    outbound_username = models.CharField(max_length=150, blank=True)
+    outbound_password = models.CharField(max_length=128, blank=True)
+
+    def set_password(self, raw_password):
+        self.password = make_password(raw_password)
+
+    def check_password(self, raw_password):
+        return bool(self.password) and check_password(raw_password, self.password)
+
+
+class OutboxItem(models.Model):
+    """
+    An item waiting to be POSTed to a remote author's inbox, delivered by
+    the deliver_outbox command
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "pending"
+        DELIVERED = "delivered", "delivered"
+        FAILED = "failed", "failed"
+
+    id = models.BigAutoField(primary_key=True)
+    node = models.ForeignKey(
+        Node, related_name="outbox_items", on_delete=models.CASCADE
+    )
+    recipient = models.ForeignKey(
+        Author, related_name="outbox_items", on_delete=models.CASCADE
+    )
+    # Enqueueing the same delivery twice is a no-op, and peers get it as an
+    # Idempotency-Key header to drop repeats of a retried delivery
+    idempotency_key = models.CharField(max_length=200, unique=True)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker claims due pending items, oldest first
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx")
+        ]
+
+
+class Stamp(models.Model):
+    """
+    When the data versioned under `name` last changed, in nanoseconds since
+    the epoch; see versions.py. Kept in the database so every process sees
+    the same stamps.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    changed = models.BigIntegerField()
+
+
+class MetricTotal(models.Model):
+    """
+    A counter or gauge flushed to the database by a worker process, such as
+    deliver_outbox, so the web process can report it; see metrics.py
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=100)
+    # Rendered in the Prometheus text format, e.g. node="beta",status="failed"
+    labels = models.CharField(max_length=200, blank=True)
+    gauge = models.BooleanField(default=False)
+    value = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "labels"], name="unique_metric_series"
+            )
+        ]
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import metrics
+from .cache import author_payloads, post_payloads
+from .federation import FederationClient, FederationError, run_sync
+from .friends import friend_ids_query
+from .models import OutboxItem, Post
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 100
+
+
+def author_url(author):
+    """
+    The URL of a local author, as peers know them
+    """
+    return f"{settings.NODE_API_URL.rstrip('/')}/authors/{author.pk}"
+
+
+def inbox_payload(post):
+    """
+    A post as a peer's inbox/batch endpoint takes it, with its author
+    embedded; see serializers.InboxPostSerializer
+    """
+    author = dict(author_payloads.get(post.author), url=author_url(post.author))
+    return dict(post_payloads.get(post), type="post", author=author)
+
+
+def enqueue_post(post_id):
+    """
+    Queue a post for every remote follower allowed to see it. Items already
+    queued for the same post and recipient are left alone.
+    """
+    post = Post.objects.select_related("author").filter(pk=post_id).first()
+    if post is None or post.unlisted:
+        return 0
+
+    recipients = post.author.followers.filter(node__isnull=False)
+    if post.visibility == Post.VisibilityChoice.FRIENDS_ONLY:
+        recipients = recipients.filter(pk__in=friend_ids_query(post.author_id))
+    elif post.visibility != Post.VisibilityChoice.PUBLIC:
+        return 0
+
+    payload = inbox_payload(post)
+    items = [
+        OutboxItem(
+            node_id=node_id,
+            recipient_id=recipient_id,
+            idempotency_key=f"post:{post.pk}:{recipient_id}",
+            payload=payload,
+        )
+        for recipient_id, node_id in recipients.values_list("id", "node_id")
+    ]
+    OutboxItem.objects.bulk_create(items, ignore_conflicts=True, batch_size=1000)
+    return len(items)
+
+
+def claim_due(size):
+    """
+    Take up to `size` due items, oldest first. They are leased to this worker
+    by pushing their next attempt past the time a delivery can take, so
+    other workers skip them meanwhile.
+    """
+    # Requests to one node wait their turn for a pooled connection, and each
+    # can spend the timeout connecting and again answering
+    rounds = -(-size // settings.FEDERATION_MAX_CONNECTIONS_PER_NODE)
+    lease = timedelta(seconds=rounds * 2 * settings.FEDERATION_TIMEOUT + 60)
+    with transaction.atomic():
+        now = timezone.now()
+        items = list(
+            OutboxItem.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(status=OutboxItem.Status.PENDING, next_attempt_at__lte=now)
+            .select_related("node", "recipient")
+            .order_by("next_attempt_at", "id")[:size]
+        )
+        OutboxItem.objects.filter(pk__in=[item.pk for item in items]).update(
+            next_attempt_at=now + lease
+        )
+    return items
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff after the given number of failed attempts
+    """
+    delay = settings.OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OUTBOX_BACKOFF_MAX_SECONDS))
+
+
+def rejection(response):
+    """
+    The errors of an item a peer's inbox/batch endpoint answered as
+    rejected, or None
+    """
+    try:
+        result = response.json()["items"][0]
+    except (FederationError, TypeError, KeyError, IndexError):
+        return None
+    if not isinstance(result, dict) or result.get("result") != "rejected":
+        return None
+    return result.get("errors") or "rejected"
+
+
+async def send_items(items):
+    """
+    POST every item to its recipient's inbox on the peer, at the URL the
+    peer gave the recipient, all nodes at once over one pool of keep-alive
+    connections per node. Returns a `(error, permanent)` pair per item, with
+    a None error for a delivered item.
+    """
+
+    async def send(client, item):
+        headers = {
+            "Content-Type": "application/json",
+            "Idempotency-Key": item.idempotency_key,
+        }
+        try:
+            response = await client.request(
+                item.node,
+                "POST",
+                f"{item.recipient.url.rstrip('/')}/inbox/batch",
+                json.dumps([item.payload]).encode(),
+                headers,
+            )
+        except (FederationError, asyncio.TimeoutError) as e:
+            # The client's error wraps the cause of its last attempt
+            return repr(e.__cause__ or e), False
+        if 200 <= response.status < 300:
+            errors = rejection(response)
+            if errors is not None:
+                # The peer took the batch but refused the item in it
+                return f"Rejected: {errors}", True
+            return None, False
+        # The peer refused the item itself; sending it again won't help
+        permanent = 400 <= response.status < 500 and response.status not in (408, 429)
+        return f"HTTP {response.status}", permanent
+
+    # Retries are spaced out by the queue rather than inside the client
+    async with FederationClient(retries=0) as client:
+        return await asyncio.gather(*(send(client, item) for item in items))
+
+
+def deliver_due(size=OUTBOX_BATCH_SIZE):
+    """
+    Deliver one batch of due items and record the outcome of each. Returns
+    the number delivered, retried and failed.
+    """
+    items = claim_due(size)
+    outcome = {"delivered": 0, "retried": 0, "failed": 0}
+    if not items:
+        return outcome
+
+    results = run_sync(send_items(items))
+    now = timezone.now()
+    for item, (error, permanent) in zip(items, results):
+        item.attempts += 1
+        item.last_error = error or ""
+        if error is None:
+            item.status = OutboxItem.Status.DELIVERED
+            item.delivered_at = now
+            metrics.observe(
+                "outbox_delivery_latency_seconds",
+                (now - item.created_at).total_seconds(),
+            )
+            outcome["delivered"] += 1
+        elif permanent or item.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            item.status = OutboxItem.Status.FAILED
+            outcome["failed"] += 1
+        else:
+            item.next_attempt_at = now + retry_delay(item.attempts)
+            outcome["retried"] += 1
+        metrics.incr(
+            "outbox_deliveries_total", node=item.node.nodeName, status=item.status
+        )
+
+    OutboxItem.objects.bulk_update(
+        items,
+        ["status", "attempts", "last_error", "next_attempt_at", "delivered_at"],
+    )
+    logger.info("outbox batch of %d: %s", len(items), outcome)
+    return outcome
+
+
+def record_queue_gauges():
+    """
+    Set the outbox_queue_depth and outbox_oldest_pending_seconds gauges. The
+    deliver_outbox worker sets them once per batch and flushes them with its
+    counters, so scraping /metrics/ doesn't count the queue.
+    """
+    pending = OutboxItem.objects.filter(status=OutboxItem.Status.PENDING)
+    oldest = pending.order_by("created_at").values_list("created_at", flat=True)
+    oldest = oldest.first()
+    metrics.set_gauge("outbox_queue_depth", pending.count())
+    metrics.set_gauge(
+        "outbox_oldest_pending_seconds",
+        (timezone.now() - oldest).total_seconds() if oldest else 0,
+    )
+    # Lets an alert tell a stalled worker from an empty queue
+    metrics.set_gauge("outbox_gauges_updated_timestamp_seconds", time.time())
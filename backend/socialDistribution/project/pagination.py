@@ -0,0 +1,152 @@
+import base64
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last item on a page into an opaque token
+    """
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, length):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def keyset_filter(keys, values):
+    """
+    Build the filter selecting rows that sort strictly after `values` when
+    ordered by `keys`, e.g. ("-published", "-id") gives
+    published < p OR (published = p AND id < i)
+    """
+    condition = Q()
+    equal = {}
+    for key, value in zip(keys, values):
+        field = key.lstrip("-")
+        lookup = "lt" if key.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{field}__{lookup}": value})
+        equal[field] = value
+    return condition
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class Paginator(ABC):
+    page_size = 20
+    max_page_size = 100
+
+    def __init__(self, page_size=None, max_page_size=None):
+        self.page_size = page_size or self.page_size
+        self.max_page_size = max_page_size or self.max_page_size
+
+    def get_page_size(self, size=None):
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @abstractmethod
+    def paginate(self, queryset, cursor=None, size=None):
+        """
+        The page of `queryset` starting after `cursor`, of at most `size`
+        items. Raises InvalidCursor for a cursor this paginator didn't issue.
+        """
+
+    def paginate_request(self, request, queryset):
+        """
+        Paginate using the `cursor` and `size` query parameters
+        """
+        return self.paginate(
+            queryset, request.GET.get("cursor"), request.GET.get("size")
+        )
+
+
+class KeysetPaginator(Paginator):
+    """
+    Cursor pagination over a queryset ordered by a unique key, by default
+    (published, id) newest first. Every page is a range read starting at the
+    cursor, so deep pages cost the same as the first one.
+    """
+
+    keys = ("-published", "-id")
+
+    def __init__(self, keys=None, page_size=None, max_page_size=None):
+        super().__init__(page_size, max_page_size)
+        self.keys = tuple(keys or self.keys)
+
+    def paginate(self, queryset, cursor=None, size=None):
+        size = self.get_page_size(size)
+        queryset = queryset.order_by(*self.keys)
+        if cursor:
+            values = decode_cursor(cursor, len(self.keys))
+            try:
+                queryset = queryset.filter(keyset_filter(self.keys, values))
+            except ValidationError as e:
+                raise InvalidCursor(cursor) from e
+
+        # Fetch one extra row to find out whether there is a next page
+        items = list(queryset[: size + 1])
+        if len(items) <= size:
+            return Page(items)
+
+        items = items[:size]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, key.lstrip("-")) for key in self.keys)
+        return Page(items, next_cursor)
+
+
+class OffsetPaginator(Paginator):
+    """
+    Pagination for ranked results, which have no stable key to seek on. The
+    cursor wraps an offset, and pages stop at `max_offset` so a client can't
+    ask the database to rank and skip an unbounded number of rows.
+    """
+
+    max_offset = 1000
+
+    def __init__(self, page_size=None, max_page_size=None, max_offset=None):
+        super().__init__(page_size, max_page_size)
+        self.max_offset = max_offset or self.max_offset
+
+    def paginate(self, queryset, cursor=None, size=None):
+        size = self.get_page_size(size)
+        offset = 0
+        if cursor:
+            (offset,) = decode_cursor(cursor, 1)
+            try:
+                offset = int(offset)
+            except ValueError as e:
+                raise InvalidCursor(cursor) from e
+            if not 0 <= offset <= self.max_offset:
+                raise InvalidCursor(cursor)
+
+        items = list(queryset[offset : offset + size + 1])
+        if len(items) <= size or offset + size > self.max_offset:
+            return Page(items[:size])
+        return Page(items[:size], encode_cursor([offset + size]))
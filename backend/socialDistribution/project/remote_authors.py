@@ -0,0 +1,318 @@
+import hashlib
+import logging
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import metrics
+from .federation import FederationClient, FederationError, run_sync
+from .models import Author, Node
+from .versions import AUTHORS, bump
+
+logger = logging.getLogger(__name__)
+
+# Remote authors refreshed per refresh_remote_authors batch
+REFRESH_BATCH_SIZE = 100
+
+# Profile fields copied from a remote author's payload to its shadow row
+PROFILE_FIELDS = ("displayName", "github", "profileImage")
+
+
+def cache_key(url):
+    return "project:remote_author:" + hashlib.sha1(url.encode()).hexdigest()
+
+
+NODES_CACHE_KEY = "project:nodes"
+
+
+def nodes_by_netloc():
+    """
+    The registered nodes by the network location of their API URL, cached
+    for NODES_CACHE_TIMEOUT and dropped whenever a node is saved or deleted
+    """
+    nodes = cache.get(NODES_CACHE_KEY)
+    if nodes is None:
+        nodes = {urlsplit(node.apiURL).netloc: node for node in Node.objects.all()}
+        cache.set(NODES_CACHE_KEY, nodes, settings.NODES_CACHE_TIMEOUT)
+    return nodes
+
+
+def forget_nodes():
+    cache.delete(NODES_CACHE_KEY)
+
+
+def node_for_url(url):
+    """
+    The registered node hosting `url`, if any
+    """
+    return nodes_by_netloc().get(urlsplit(url).netloc)
+
+
+def shadow_id(url, data):
+    """
+    The remote author's own id when it is a UUID, so the shadow row keeps
+    it, or else one derived from the URL
+    """
+    for candidate in (data.get("id"), url.rstrip("/").rsplit("/", 1)[-1]):
+        try:
+            return uuid.UUID(str(candidate))
+        except ValueError:
+            pass
+    return uuid.uuid5(uuid.NAMESPACE_URL, url)
+
+
+def profile_fields(data):
+    fields = {}
+    for name in PROFILE_FIELDS:
+        if data.get(name):
+            max_length = Author._meta.get_field(name).max_length
+            fields[name] = str(data[name])[:max_length]
+    return fields
+
+
+def update_shadow(author, node, data):
+    """
+    Save the profile fields of `data` that differ from the shadow row
+    """
+    fields = dict(profile_fields(data), node_id=node.pk)
+    changed = [name for name, value in fields.items() if getattr(author, name) != value]
+    if changed:
+        for name in changed:
+            setattr(author, name, fields[name])
+        author.save(update_fields=changed)
+    return author
+
+
+def store(url, node, data):
+    """
+    Create or update the shadow row of a remote author from its payload
+    """
+    author = Author.objects.filter(node__isnull=False, url=url).first()
+    if author is not None:
+        return update_shadow(author, node, data)
+
+    author = Author(id=shadow_id(url, data), url=url, node=node, **profile_fields(data))
+    try:
+        with transaction.atomic():
+            author.save(force_insert=True)
+    except IntegrityError:
+        # Stored by a concurrent request
+        author = Author.objects.get(node__isnull=False, url=url)
+    return author
+
+
+def remember(url, author, fetched=None):
+    cache.set(
+        cache_key(url),
+        {"author": author, "fetched": fetched or time.time()},
+        settings.REMOTE_AUTHOR_CACHE_TIMEOUT + settings.REMOTE_AUTHOR_STALE_TIMEOUT,
+    )
+    return author
+
+
+def forget(url):
+    cache.delete(cache_key(url))
+
+
+def fetch_profile(node, url):
+    """
+    GET the remote author's profile from its node
+    """
+
+    async def run():
+        async with FederationClient() as client:
+            return await client.get_object(node, url)
+
+    return run_sync(run())
+
+
+def refresh(author):
+    """
+    Fetch the profile of a remote author whose refresh was requested again,
+    for the refresh_remote_authors worker
+    """
+    try:
+        data = fetch_profile(author.node, author.url)
+    except FederationError as e:
+        # Stale entries keep being served until they expire, and ask again
+        logger.warning("couldn't refresh remote author %s: %r", author.url, e)
+        metrics.incr("remote_author_refreshes_total", result="failed")
+        data = None
+    else:
+        update_shadow(author, author.node, data)
+        author.refreshed_at = timezone.now()
+        metrics.incr("remote_author_refreshes_total", result="refreshed")
+    author.refresh_requested_at = None
+    author.save(update_fields=["refreshed_at", "refresh_requested_at"])
+    if data is not None:
+        remember(author.url, author)
+    return data is not None
+
+
+def refresh_due(size=REFRESH_BATCH_SIZE):
+    """
+    Refresh up to `size` of the remote authors waiting for it, oldest request
+    first, and return how many were refreshed and how many failed
+    """
+    authors = (
+        Author.objects.filter(refresh_requested_at__isnull=False)
+        .select_related("node")
+        .order_by("refresh_requested_at")[:size]
+    )
+    outcome = {"refreshed": 0, "failed": 0}
+    for author in authors:
+        outcome["refreshed" if refresh(author) else "failed"] += 1
+    return outcome
+
+
+def schedule_refresh(url, entry):
+    """
+    Ask the refresh_remote_authors worker to fetch the author behind a stale
+    cache entry again, and return the entry to serve meanwhile
+    """
+    # Check the row at most once per lock_timeout for each author, across
+    # every process sharing the cache
+    lock_timeout = settings.FEDERATION_TIMEOUT * (settings.FEDERATION_RETRIES + 1) * 2
+    if not cache.add(cache_key(url) + ":refreshing", True, lock_timeout):
+        return entry
+    author = Author.objects.filter(pk=entry["author"].pk).first()
+    if author is None:
+        return entry
+    if author.refreshed_at and author.refreshed_at.timestamp() > entry["fetched"]:
+        # The worker refreshed it since this process cached it
+        entry = {"author": author, "fetched": author.refreshed_at.timestamp()}
+        remember(url, author, entry["fetched"])
+        if time.time() - entry["fetched"] < settings.REMOTE_AUTHOR_CACHE_TIMEOUT:
+            return entry
+    Author.objects.filter(pk=author.pk, refresh_requested_at__isnull=True).update(
+        refresh_requested_at=timezone.now()
+    )
+    return entry
+
+
+def get_remote_author(url, data=None, sender=None):
+    """
+    The shadow Author of the remote author at `url`, or None when no
+    registered node hosts it.
+
+    Fresh cache entries are used as they are. Past REMOTE_AUTHOR_CACHE_TIMEOUT
+    an entry is still served, for up to REMOTE_AUTHOR_STALE_TIMEOUT more,
+    while the refresh_remote_authors worker fetches it again. A profile
+    embedded in the payload being handled can be passed as `data` and is
+    stored instead of fetching the author, but only when the authenticated
+    `sender` node is the one hosting the author.
+    """
+    node = node_for_url(url)
+    if node is None:
+        return None
+    if sender is None or sender.pk != node.pk:
+        # Only the author's own node may tell us their profile
+        data = None
+
+    entry = cache.get(cache_key(url))
+    if entry is not None:
+        fresh = time.time() - entry["fetched"] < settings.REMOTE_AUTHOR_CACHE_TIMEOUT
+        if fresh or data is None:
+            metrics.incr(
+                "remote_author_cache_hits_total", state="fresh" if fresh else "stale"
+            )
+            if not fresh:
+                entry = schedule_refresh(url, entry)
+            return entry["author"]
+
+    metrics.incr("remote_author_cache_misses_total")
+    if data is None:
+        data = fetch_profile(node, url)
+    return remember(url, store(url, node, data))
+
+
+def resolve_author(data, sender=None):
+    """
+    The Author an embedded author object refers to: the shadow row of a
+    remote author, or else the local author matching every field. `sender`
+    is the authenticated node the object came from, if any.
+    """
+    url = data.get("url")
+    author = get_remote_author(url, data, sender) if url else None
+    if author is None:
+        author = Author.objects.get(node__isnull=True, **data)
+    return author
+
+
+def get_remote_authors(profiles, sender=None):
+    """
+    get_remote_author for many authors at once, given a dict from URL to
+    embedded profile. The authors missing from the cache are looked up with
+    one query, and the new ones stored with one bulk insert.
+
+    Only the profiles of authors hosted by the authenticated `sender` node
+    are stored. Other authors are only found if they were stored before, and
+    are otherwise None.
+    """
+    keys = {url: cache_key(url) for url in profiles}
+    entries = cache.get_many(keys.values())
+    now = time.time()
+    authors = {}
+    for url, key in keys.items():
+        entry = entries.get(key)
+        if entry and now - entry["fetched"] < settings.REMOTE_AUTHOR_CACHE_TIMEOUT:
+            authors[url] = entry["author"]
+    metrics.incr("remote_author_cache_hits_total", len(authors), state="fresh")
+
+    hosted = {}
+    for url in profiles.keys() - authors.keys():
+        hosted[url] = node_for_url(url)
+        authors[url] = None
+    hosted = {url: node for url, node in hosted.items() if node is not None}
+    if not hosted:
+        return authors
+    metrics.incr("remote_author_cache_misses_total", len(hosted))
+    # Only the author's own node may tell us their profile
+    trusted = {
+        url
+        for url, node in hosted.items()
+        if sender is not None and node.pk == sender.pk
+    }
+
+    stored = Author.objects.filter(node__isnull=False, url__in=hosted)
+    for author in stored:
+        if author.url in trusted:
+            update_shadow(author, hosted[author.url], profiles[author.url])
+        authors[author.url] = author
+    new_authors = [
+        Author(
+            id=shadow_id(url, profiles[url]),
+            url=url,
+            node=node,
+            **profile_fields(profiles[url]),
+        )
+        for url, node in hosted.items()
+        if authors[url] is None and url in trusted
+    ]
+    if new_authors:
+        Author.objects.bulk_create(new_authors, ignore_conflicts=True)
+        # Re-read, since rows stored concurrently keep their own ids; rows
+        # that couldn't be stored are left out as None
+        for author in Author.objects.filter(
+            node__isnull=False, url__in=[author.url for author in new_authors]
+        ):
+            authors[author.url] = author
+        bump([AUTHORS])
+
+    timeout = (
+        settings.REMOTE_AUTHOR_CACHE_TIMEOUT + settings.REMOTE_AUTHOR_STALE_TIMEOUT
+    )
+    cache.set_many(
+        {
+            keys[url]: {"author": authors[url], "fetched": now}
+            for url in trusted
+            if authors[url] is not None
+        },
+        timeout,
+    )
+    return authors
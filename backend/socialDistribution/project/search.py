@@ -0,0 +1,176 @@
+import re
+
+from django.db import connection
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    FloatField,
+    IntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+
+from .models import Author, Post
+from .pagination import OffsetPaginator
+
+# Shared by the search page and the search API
+author_search_paginator = OffsetPaginator(page_size=25)
+post_search_paginator = OffsetPaginator(page_size=20)
+
+# SQLite keeps post text in this FTS5 table, next to the post id, see
+# install_post_search_triggers and models.PostSearchEntry
+POST_FTS_TABLE = "project_post_fts"
+POST_FTS_COLUMNS = ["title", "description", "content", "categories"]
+# bm25 weight of each column in POST_FTS_COLUMNS
+POST_FTS_WEIGHTS = [10.0, 5.0, 1.0, 5.0]
+
+
+def search_authors(query):
+    """
+    Local authors whose display name matches `query`, best match first.
+
+    Names starting with the query come first. On Postgres, names that are
+    merely similar (pg_trgm) follow, ranked by similarity. Other databases
+    only match prefixes. Both paths are served by the indexes created in
+    migration 0013.
+    """
+    query = (query or "").strip().lower()
+    authors = Author.objects.filter(node__isnull=True).annotate(
+        name_lower=Lower("displayName")
+    )
+    if not query:
+        return authors.order_by("name_lower", "id")
+
+    if connection.vendor == "postgresql":
+        return _search_authors_postgres(authors, query)
+
+    # Prefix match as a range over the lower(displayName) index
+    return authors.filter(
+        name_lower__gte=query, name_lower__lt=query + "\U0010ffff"
+    ).order_by("name_lower", "id")
+
+
+def _search_authors_postgres(authors, query):
+    from django.contrib.postgres.lookups import TrigramSimilar
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    return (
+        authors.annotate(
+            is_prefix=Case(
+                When(name_lower__startswith=query, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            similarity=TrigramSimilarity(Lower("displayName"), query),
+        )
+        .filter(
+            Q(name_lower__startswith=query)
+            | Q(TrigramSimilar(Lower("displayName"), query))
+        )
+        .order_by("-is_prefix", "-similarity", "name_lower", "id")
+    )
+
+
+def search_posts(query):
+    """
+    Public, listed posts matching the words in `query`, best match first.
+
+    Postgres matches against the weighted Post.search_vector through its GIN
+    index. SQLite matches against the FTS5 table and ranks by bm25. Both
+    indexes are kept up to date by triggers as posts are written.
+    """
+    posts = Post.objects.filter(visibility=Post.VisibilityChoice.PUBLIC, unlisted=False)
+    if connection.vendor == "postgresql":
+        return _search_posts_postgres(posts, query or "")
+
+    words = re.findall(r"\w+", query or "")
+    if not words or connection.vendor != "sqlite":
+        return posts.none()
+
+    # Quote every word so user input is never parsed as FTS5 syntax
+    match = " ".join('"{}"'.format(word) for word in words)
+    weights = ", ".join(str(weight) for weight in POST_FTS_WEIGHTS)
+    # The join to the FTS table is aliased by its own name, which MATCH and
+    # bm25() take as their table argument
+    return (
+        posts.filter(search_entry__isnull=False)
+        .filter(
+            RawSQL(f"{POST_FTS_TABLE} MATCH %s", [match], output_field=BooleanField())
+        )
+        .annotate(
+            rank=RawSQL(
+                f"bm25({POST_FTS_TABLE}, {weights})", [], output_field=FloatField()
+            )
+        )
+        .order_by("rank", "-published")
+    )
+
+
+def _search_posts_postgres(posts, query):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    search_query = SearchQuery(query, config="english", search_type="websearch")
+    return (
+        posts.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-published")
+    )
+
+
+def install_post_search_triggers(connection):
+    """
+    Create the SQLite triggers that mirror posts into the FTS5 table, keyed
+    by the post id.
+
+    SQLite drops a table's triggers whenever a migration rebuilds it, so the
+    FTS table may have missed writes, and is refilled, whenever the triggers
+    have to be recreated.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    columns = ", ".join(POST_FTS_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in POST_FTS_COLUMNS)
+    triggers = {
+        "project_post_fts_insert": f"""
+            AFTER INSERT ON project_post BEGIN
+                INSERT INTO {POST_FTS_TABLE} (post_id, {columns})
+                VALUES (new.id, {new_values});
+            END""",
+        "project_post_fts_update": f"""
+            AFTER UPDATE OF id, {columns} ON project_post BEGIN
+                DELETE FROM {POST_FTS_TABLE} WHERE post_id = old.id;
+                INSERT INTO {POST_FTS_TABLE} (post_id, {columns})
+                VALUES (new.id, {new_values});
+            END""",
+        "project_post_fts_delete": f"""
+            AFTER DELETE ON project_post BEGIN
+                DELETE FROM {POST_FTS_TABLE} WHERE post_id = old.id;
+            END""",
+    }
+
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if POST_FTS_TABLE not in tables:
+            return
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)"
+            % ", ".join("%s" for _ in triggers),
+            list(triggers),
+        )
+        if {name for (name,) in cursor.fetchall()} == set(triggers):
+            return
+
+        for name in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DELETE FROM {POST_FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {POST_FTS_TABLE} (post_id, {columns}) "
+            f"SELECT id, {columns} FROM project_post"
+        )
+        for name, body in triggers.items():
+            cursor.execute(f"CREATE TRIGGER {name} {body}")
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 
 # Add your serializers here.
-from .models import Author, FollowRequest, Post, Node
+from .federation import FederationError
+from .models import Author, Comment, FollowRequest, Node, Post, PostLike
+from .remote_authors import resolve_author
 
 
 class AuthorSerializer(serializers.ModelSerializer):
@@ -11,6 +13,8 @@ class AuthorSerializer(serializers.ModelSerializer):
 
 
 class PostSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(source="comment_count", read_only=True)
+
     class Meta:
         model = Post
         fields = [
@@ -30,6 +34,32 @@ class PostSerializer(serializers.ModelSerializer):
         ]
 
 
+class CommentSerializer(serializers.ModelSerializer):
+    author = AuthorSerializer(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ["id", "author", "comment", "contentType", "published"]
+
+    def to_representation(self, instance):
+        results = super().to_representation(instance)
+        results["type"] = "comment"
+        return results
+
+
+class LikeSerializer(serializers.ModelSerializer):
+    author = AuthorSerializer(read_only=True)
+
+    class Meta:
+        model = PostLike
+        fields = ["summary", "author", "published"]
+
+    def to_representation(self, instance):
+        results = super().to_representation(instance)
+        results["type"] = "Like"
+        return results
+
+
 class NodeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Node
@@ -60,8 +90,13 @@ class FollowRequestSerializer(serializers.ModelSerializer):
         fields = ["summary", "follower", "following"]
 
     def create(self, validated_data):
-        follower = Author.objects.get(**validated_data["follower"])
-        following = Author.objects.get(**validated_data["following"])
+        try:
+            # The node that sent the request, if it authenticated
+            sender = self.context.get("sender")
+            follower = resolve_author(validated_data["follower"], sender)
+            following = resolve_author(validated_data["following"], sender)
+        except (Author.DoesNotExist, FederationError):
+            raise serializers.ValidationError("Unknown author")
         summary = validated_data["summary"]
         return FollowRequest.objects.create(
             follower=follower, following=following, summary=summary
@@ -78,3 +113,71 @@ class FollowRequestSerializer(serializers.ModelSerializer):
         data["follower"] = data.pop("actor", {})
         data["following"] = data.pop("object", {})
         return super().to_internal_value(data)
+
+
+class FollowRequestBatchSerializer(serializers.Serializer):
+    """
+    Ids of an author's incoming follow requests to accept and to decline
+    """
+
+    accept = serializers.ListField(
+        child=serializers.UUIDField(), default=list, max_length=1000
+    )
+    decline = serializers.ListField(
+        child=serializers.UUIDField(), default=list, max_length=1000
+    )
+
+    def validate(self, data):
+        both = set(data["accept"]) & set(data["decline"])
+        if both:
+            raise serializers.ValidationError(
+                f"Both accepted and declined: {', '.join(map(str, sorted(both)))}"
+            )
+        return data
+
+
+class RemoteAuthorSerializer(serializers.Serializer):
+    """
+    An author embedded in an item from a peer node. Peers send their own
+    host names, so unlike AuthorSerializer the host isn't checked.
+    """
+
+    id = serializers.CharField(required=False)
+    url = serializers.URLField()
+    displayName = serializers.CharField(required=False, allow_blank=True)
+    github = serializers.CharField(required=False, allow_blank=True)
+    profileImage = serializers.CharField(required=False, allow_blank=True)
+
+
+class InboxPostSerializer(PostSerializer):
+    # Declared so validating an item doesn't look the id or author up
+    id = serializers.UUIDField()
+    author = RemoteAuthorSerializer()
+
+    class Meta(PostSerializer.Meta):
+        # Posts are stored as their node sent them, optional fields included
+        extra_kwargs = {
+            name: {"allow_blank": True}
+            for name in ("source", "origin", "description", "content", "categories")
+        }
+
+
+class InboxLikeSerializer(serializers.Serializer):
+    summary = serializers.CharField(max_length=50, required=False, default="")
+    author = RemoteAuthorSerializer()
+    # URL of the liked post
+    object = serializers.URLField()
+
+
+class InboxCommentSerializer(serializers.Serializer):
+    # URL of the comment, as .../posts/<post id>/comments/<comment id>
+    id = serializers.URLField()
+    author = RemoteAuthorSerializer()
+    comment = serializers.CharField(max_length=600)
+    contentType = serializers.CharField(max_length=200)
+    published = serializers.DateTimeField(required=False)
+
+
+class InboxFollowSerializer(serializers.Serializer):
+    summary = serializers.CharField(max_length=200, required=False, default="")
+    actor = RemoteAuthorSerializer()
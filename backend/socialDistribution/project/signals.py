@@ -1,20 +1,273 @@
-from django.db.models.signals import post_save
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
 from django.dispatch import receiver
+from django.utils import timezone
+
+from .categories import remove_post_categories, sync_post_categories
+from .counters import count_of
+from .friends import invalidate_friends
+from .models import Author, Comment, FollowRequest, InboxItem, Node, Post, PostLike
+from .outbox import enqueue_post
+from .remote_authors import forget as forget_remote_author, forget_nodes
+from .search import install_post_search_triggers
+from .suggestions import follow_edges_changed
+from .versions import (
+    AUTHORS,
+    author_posts_stamp,
+    author_stamp,
+    bump,
+    follow_requests_stamp,
+    follows_stamp,
+    post_stamp,
+)
+from .stream import fans_out_on_write, pull_window_start
+
+logger = logging.getLogger(__name__)
+
+# Number of stream inbox rows written per INSERT when fanning out a post
+FANOUT_BATCH_SIZE = 1000
+
+
+def deliver(items):
+    """
+    Write a batch of inbox rows
+    """
+    InboxItem.objects.bulk_create(items, ignore_conflicts=True)
+
+
+def deliver_in_batches(items):
+    """
+    Write inbox rows from an iterable in FANOUT_BATCH_SIZE bulk inserts, in
+    one transaction. Returns the number written.
+    """
+    rows = 0
+    batch = []
+    with transaction.atomic():
+        for item in items:
+            batch.append(item)
+            if len(batch) >= FANOUT_BATCH_SIZE:
+                deliver(batch)
+                rows += len(batch)
+                batch = []
+        if batch:
+            deliver(batch)
+            rows += len(batch)
+    return rows
+
+
+def follower_ids_of(author_id):
+    Follow = Author.following.through
+    return (
+        Follow.objects.filter(to_author_id=author_id)
+        .values_list("from_author_id", flat=True)
+        .iterator(chunk_size=FANOUT_BATCH_SIZE)
+    )
+
 
-from .models import Post
+def fan_out_post(post_id, author_id):
+    """
+    Add a post to the stream of every follower of its author, writing the
+    inbox rows in chunked bulk inserts
+    """
+    started = time.monotonic()
+    received_at = timezone.now()
+    rows = deliver_in_batches(
+        InboxItem(author_id=follower_id, post_id=post_id, received_at=received_at)
+        for follower_id in follower_ids_of(author_id)
+    )
+
+    elapsed = (time.monotonic() - started) * 1000
+    logger.info("post %s sent to %d stream inboxes in %.1fms", post_id, rows, elapsed)
+    return rows
+
+
+def backfill_inboxes(author_id):
+    """
+    Push an author's posts from the pull window into every follower's inbox.
+    Run once the author falls back under the fan-out threshold: streams stop
+    pulling their posts, and the ones written meanwhile were never pushed.
+    The rows are dated by publication, where the pulled posts sat.
+    """
+    posts = list(
+        Post.objects.filter(
+            author_id=author_id, published__gte=pull_window_start()
+        ).values_list("pk", "published")
+    )
+    if not posts:
+        return 0
+    rows = deliver_in_batches(
+        InboxItem(author_id=follower_id, post_id=post_id, received_at=published)
+        for follower_id in follower_ids_of(author_id)
+        for post_id, published in posts
+    )
+    logger.info("backfilled %d stream inbox rows for author %s", rows, author_id)
+    return rows
 
 
 # stream update after post creation
 @receiver(post_save, sender=Post)
 def on_post_create(sender, instance, created, **kwargs):
-    if created:
-        post = instance
-        author = instance.author
+    if not created:
+        return
+    # Fan out once the post is committed so the request creating it doesn't
+    # wait on the inbox writes, and a rollback sends nothing
+    post_id, author_id = instance.pk, instance.author_id
+    if fans_out_on_write(instance.author):
+        transaction.on_commit(lambda: fan_out_post(post_id, author_id))
+    # Remote followers are sent the post by the deliver_outbox worker
+    transaction.on_commit(lambda: enqueue_post(post_id))
+
+
+@receiver(post_save, sender=Post)
+def on_post_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_post_categories(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def on_post_delete(sender, instance, **kwargs):
+    remove_post_categories(instance)
+
+
+def touch_post(post_id, author_id):
+    touch_posts({post_id: author_id})
+
+
+def touch_posts(post_authors):
+    """
+    Mark the posts, given as a dict from post id to author id, as changed,
+    along with their authors' post lists. Streams key their pages on the
+    stamps of the posts shown, so readers need no stamps of their own.
+    """
+    bump(
+        [post_stamp(post_id) for post_id in post_authors]
+        + [author_posts_stamp(author_id) for author_id in set(post_authors.values())]
+    )
+
+
+@receiver([post_save, post_delete], sender=Author)
+def on_author_change(sender, instance, **kwargs):
+    bump([AUTHORS, author_stamp(instance.pk)])
+
+
+@receiver(post_delete, sender=Author)
+def on_remote_author_delete(sender, instance, **kwargs):
+    if instance.node_id:
+        forget_remote_author(instance.url)
+
+
+@receiver([post_save, post_delete], sender=Node)
+def on_node_change(sender, instance, **kwargs):
+    # Again once committed, in case a read in between cached the old nodes
+    forget_nodes()
+    transaction.on_commit(forget_nodes)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def on_post_change(sender, instance, **kwargs):
+    touch_post(instance.pk, instance.author_id)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=PostLike)
+def on_post_reaction(sender, instance, **kwargs):
+    # Posts are shown with their like and comment counts, and the API
+    # payload carries the comment count
+    author_id = (
+        Post.objects.filter(pk=instance.post_id)
+        .values_list("author_id", flat=True)
+        .first()
+    )
+    if author_id is not None:
+        touch_post(instance.post_id, author_id)
+
+
+@receiver([post_save, post_delete], sender=FollowRequest)
+def on_follow_request_change(sender, instance, **kwargs):
+    # Pending requests are listed on the stream page
+    bump([follow_requests_stamp(instance.following_id)])
+
+
+def refresh_follower_counts(author_ids):
+    """
+    Recount `Author.follower_count` for the given authors in one UPDATE.
+    Authors falling back under the fan-out threshold get their recent posts
+    backfilled into their followers' inboxes once the change commits.
+    """
+    threshold = settings.STREAM_FANOUT_MAX_FOLLOWERS
+    authors = Author.objects.filter(pk__in=author_ids)
+    pulled = list(
+        authors.filter(follower_count__gt=threshold).values_list("pk", flat=True)
+    )
+    authors.update(follower_count=count_of(Author.following.through, "to_author"))
+    if pulled:
+        crossed = Author.objects.filter(
+            pk__in=pulled, follower_count__lte=threshold
+        ).values_list("pk", flat=True)
+        for author_id in crossed:
+            transaction.on_commit(
+                lambda author_id=author_id: backfill_inboxes(author_id)
+            )
+
+
+def follows_changed(follower_ids, followee_ids):
+    """
+    Called whenever the follow edges from each of `follower_ids` to each of
+    `followee_ids` have been added or removed
+    """
+    refresh_follower_counts(followee_ids)
+    # Friendship is mutual, so either end of an edge may gain or lose a friend
+    invalidate_friends(set(follower_ids) | set(followee_ids))
+    # Post lists filter posts by friendship
+    bump([follows_stamp(pk) for pk in set(follower_ids) | set(followee_ids)])
+    follow_edges_changed(follower_ids, followee_ids)
+
+
+@receiver(m2m_changed, sender=Author.following.through)
+def on_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    Follow = Author.following.through
+    if reverse:
+        follows = Follow.objects.filter(to_author=instance)
+        other_end = "from_author_id"
+    else:
+        follows = Follow.objects.filter(from_author=instance)
+        other_end = "to_author_id"
+
+    if action in ("pre_clear", "pre_remove"):
+        # Remember the edges that actually exist, since they are gone by the
+        # post_ signal and remove() reports ids whether they existed or not
+        if action == "pre_remove":
+            follows = follows.filter(**{f"{other_end}__in": pk_set})
+        instance._removed_follows = set(follows.values_list(other_end, flat=True))
+        return
+
+    if action in ("post_clear", "post_remove"):
+        pk_set = instance.__dict__.pop("_removed_follows", set())
+    elif action != "post_add":
+        return
+
+    if not pk_set:
+        return
 
-        followers = author.followers.all()
+    # author.followers.add(...) is the reverse side of author.following
+    if reverse:
+        follows_changed(pk_set, {instance.pk})
+    else:
+        follows_changed({instance.pk}, pk_set)
 
-        # TODO there's probably a more efficient way to do this.
-        for follower in followers:
-            follower.streamPosts.add(post)
 
-        print("post sent to stream inboxes:", post.title)
+@receiver(post_migrate)
+def on_migrate(sender, using, **kwargs):
+    if sender.name == "project":
+        install_post_search_triggers(connections[using])
@@ -0,0 +1,144 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .models import InboxItem, Post
+from .pagination import (
+    InvalidCursor,
+    KeysetPaginator,
+    Page,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+from .versions import COUNTERS, post_stamp
+from .visibility import visible_posts_q
+
+# Shared by the HTML stream and the inbox API
+stream_paginator = KeysetPaginator(keys=("-sort_at", "-post_id"))
+
+# The `viewer` of a stream read by its own author
+OWNER = object()
+
+
+def fans_out_on_write(author):
+    """
+    Whether new posts by `author` are pushed into their followers' inboxes.
+    Posts by authors with more followers than STREAM_FANOUT_MAX_FOLLOWERS are
+    left out of the inboxes and pulled into streams at read time instead.
+    """
+    return author.follower_count <= settings.STREAM_FANOUT_MAX_FOLLOWERS
+
+
+def pull_window_start():
+    """
+    The oldest publication time of the posts pulled into streams at read time
+    """
+    return timezone.now() - timedelta(seconds=settings.STREAM_PULL_MAX_AGE)
+
+
+def stream_page_stamps(rows):
+    """
+    The names of the stamps a page of stream rows is rendered from: its
+    posts' stamps, which edits, likes and comments bump, and COUNTERS
+    """
+    return [post_stamp(post_id) for post_id, _ in rows] + [COUNTERS]
+
+
+def get_stream_version(rows, next_cursor, stamps):
+    """
+    A string that changes whenever a page of stream rows from get_stream_rows
+    may render differently. The rows catch new, removed and newly hidden
+    posts, and `stamps`, read for stream_page_stamps(rows), catch changes to
+    the posts on the page.
+    """
+    changed = [stamps[name] for name in stream_page_stamps(rows)]
+    return hashlib.sha1(repr((rows, next_cursor, changed)).encode()).hexdigest()
+
+
+def stream_posts_q(author, viewer, prefix=""):
+    """
+    A filter for the posts in `author`'s stream that `viewer` (an Author,
+    None for anonymous visitors, or OWNER) may see: those the author may
+    see, and for anyone else also those the viewer may see
+    """
+    shown = visible_posts_q(author, prefix=prefix)
+    if viewer is OWNER or (viewer is not None and viewer.pk == author.pk):
+        return shown
+    return shown & visible_posts_q(viewer, prefix=prefix)
+
+
+def get_stream(author, cursor_values=None, viewer=OWNER):
+    """
+    An author's stream as (post_id, sort_at) rows, newest first: the posts
+    pushed into their inbox ordered by arrival, merged with the posts of
+    followed authors who are read on demand ordered by publication, back to
+    STREAM_PULL_MAX_AGE. Posts the author, or the `viewer` reading the
+    stream, may not see are filtered out in the same query.
+    """
+    inbox = InboxItem.objects.filter(author=author, item_type=InboxItem.ItemType.POST)
+    pushed = inbox.filter(stream_posts_q(author, viewer, prefix="post__"))
+    pulled = Post.objects.filter(
+        stream_posts_q(author, viewer),
+        author__in=author.following.filter(
+            follower_count__gt=settings.STREAM_FANOUT_MAX_FOLLOWERS
+        ),
+        published__gte=pull_window_start(),
+    ).exclude(
+        # Already pushed before the author went over the threshold
+        Exists(inbox.filter(post=OuterRef("pk")))
+    )
+
+    if cursor_values is not None:
+        pushed = pushed.filter(
+            keyset_filter(("-received_at", "-post_id"), cursor_values)
+        )
+        pulled = pulled.filter(keyset_filter(("-published", "-id"), cursor_values))
+
+    pushed = pushed.annotate(sort_at=F("received_at")).values_list("post_id", "sort_at")
+    pulled = pulled.annotate(sort_at=F("published")).values_list("id", "sort_at")
+    return pushed.union(pulled, all=True).order_by("-sort_at", "-post_id")
+
+
+def get_stream_rows(author, cursor=None, size=None, viewer=OWNER):
+    """
+    The (post_id, sort_at) rows of one page of an author's stream, as
+    `viewer` may see it, starting after `cursor`, and the cursor of the next
+    page. The page is picked by a single range read over the inbox index.
+    """
+    size = stream_paginator.get_page_size(size)
+    values = None
+    if cursor:
+        values = decode_cursor(cursor, len(stream_paginator.keys))
+
+    try:
+        rows = list(get_stream(author, values, viewer)[: size + 1])
+    except ValidationError as e:
+        raise InvalidCursor(cursor) from e
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor(rows[-1][::-1])
+    return rows, next_cursor
+
+
+def load_stream_page(rows, next_cursor):
+    """
+    The page of stream rows from get_stream_rows, with its posts loaded by
+    primary key
+    """
+    posts = Post.objects.in_bulk([post_id for post_id, _ in rows])
+    return Page([posts[post_id] for post_id, _ in rows], next_cursor)
+
+
+def get_stream_page(author, cursor=None, size=None, viewer=OWNER):
+    """
+    One page of an author's stream, as `viewer` may see it, starting after
+    `cursor`
+    """
+    return load_stream_page(*get_stream_rows(author, cursor, size, viewer))
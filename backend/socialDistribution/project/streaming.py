@@ -0,0 +1,71 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+# Rows fetched from the database and serialized per chunk
+STREAM_CHUNK_SIZE = 500
+
+
+def wants_stream(request):
+    """
+    Whether the client asked for the list as a streamed response
+    """
+    return request.query_params.get("stream", "").lower() in ("1", "true")
+
+
+def dumps(data):
+    """
+    Encode like rest_framework's JSONRenderer does, so streamed and rendered
+    responses are byte for byte the same
+    """
+    ret = json.dumps(
+        data,
+        cls=encoders.JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        allow_nan=not api_settings.STRICT_JSON,
+        separators=(",", ":") if api_settings.COMPACT_JSON else (", ", ": "),
+    )
+    return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+
+
+def iter_chunks(queryset, chunk_size):
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_list(queryset, serializer_class, envelope_type, chunk_size):
+    if envelope_type is None:
+        yield "["
+    else:
+        yield '{"type":' + dumps(envelope_type) + ',"items":['
+
+    first = True
+    for chunk in iter_chunks(queryset, chunk_size):
+        items = serializer_class(chunk, many=True).data
+        body = ",".join(dumps(item) for item in items)
+        yield body if first else "," + body
+        first = False
+
+    yield "]" if envelope_type is None else "]}"
+
+
+def stream_list(queryset, serializer_class, envelope_type=None, chunk_size=None):
+    """
+    Stream a serialized queryset as a JSON list, or as a
+    {"type": ..., "items": [...]} envelope when `envelope_type` is given,
+    holding only one chunk of rows in memory at a time
+    """
+    content = iter_list(
+        queryset, serializer_class, envelope_type, chunk_size or STREAM_CHUNK_SIZE
+    )
+    return StreamingHttpResponse(
+        (part.encode() for part in content), content_type="application/json"
+    )
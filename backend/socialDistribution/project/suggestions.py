@@ -0,0 +1,242 @@
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Greatest, RowNumber
+
+from .models import Author, AuthorSuggestion
+
+# Rows written per INSERT, and ids per IN (...) list, when updating scores
+SUGGESTION_BATCH_SIZE = 1000
+SUGGESTION_LIMIT = 20
+MAX_SUGGESTION_LIMIT = 100
+# Only the SUGGESTIONS_KEPT best suggestions of each author are stored, so
+# the table grows with the number of authors rather than with the sum of
+# their squared follow counts. The rows past MAX_SUGGESTION_LIMIT are slack
+# for unfollows to eat into before the kept rows stop being the top ones.
+#
+# Incremental updates keep the served rows right this way:
+# - A follow change rescores every pair it touches from the graph, so the
+#   stored scores are exact, and a left-out pair whose score changes is
+#   stored again
+# - Each author's `suggestion_floor` is at least the score of every pair
+#   left out, since those scores can't change without the pair being
+#   stored again
+# - Rows ranked past SUGGESTIONS_KEPT are dropped, raising the floor to
+#   their score
+# - Once an author's MAX_SUGGESTION_LIMIT-th row scores under the floor, a
+#   left-out pair may outrank it, and the author's rows are recomputed
+#
+# Left-out pairs tying with the last served row may be ordered differently
+# than a rebuild would, until the author's rows are next recomputed.
+SUGGESTIONS_KEPT = 2 * MAX_SUGGESTION_LIMIT
+
+
+def batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), SUGGESTION_BATCH_SIZE):
+        yield ids[start : start + SUGGESTION_BATCH_SIZE]
+
+
+def path_scores(author_ids=None, suggested_ids=None):
+    """
+    (author, suggested, score) for every local author reachable from
+    another through one of their follows, and not followed by them yet,
+    scoring one point per follow it is reachable through. Optionally
+    limited to the given ids on either side.
+    """
+    Follow = Author.following.through
+    # One filter() call, so the conditions apply to the same onward follow
+    lookups = {"to_author__following__node__isnull": True}
+    if author_ids is not None:
+        lookups["from_author_id__in"] = author_ids
+    if suggested_ids is not None:
+        lookups["to_author__following__in"] = suggested_ids
+    followed = Follow.objects.filter(
+        from_author_id=OuterRef("author"), to_author_id=OuterRef("suggested")
+    )
+    return (
+        Follow.objects.filter(**lookups)
+        .values(author=F("from_author_id"), suggested=F("to_author__following"))
+        .exclude(suggested=F("author"))
+        .exclude(Exists(followed))
+        .annotate(score=Count("*"))
+        .order_by()
+    )
+
+
+def ranked(rows, author="author", suggested="suggested"):
+    """
+    `rows` with each one's `rank` among its author's, best first
+    """
+    return rows.annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=F(author),
+            order_by=[F("score").desc(), F(suggested).asc()],
+        )
+    )
+
+
+def raise_floors(floors):
+    """
+    Raise the floor of each author in `floors` to the score given for it,
+    if it is lower. One UPDATE per distinct score.
+    """
+    by_score = {}
+    for author_id, score in floors.items():
+        by_score.setdefault(score, []).append(author_id)
+    for score, author_ids in by_score.items():
+        Author.objects.filter(pk__in=author_ids).update(
+            suggestion_floor=Greatest(F("suggestion_floor"), score)
+        )
+
+
+def store_top(author_ids=None):
+    """
+    Store the SUGGESTIONS_KEPT best suggestions of the given authors, or of
+    all of them, from the follow graph, and set their floors. The authors
+    must have no rows and a zero floor.
+    """
+    paths = ranked(path_scores(author_ids)).filter(rank__lte=SUGGESTIONS_KEPT + 1)
+    rows = 0
+    batch = []
+    floors = {}
+    for path in paths.iterator(chunk_size=SUGGESTION_BATCH_SIZE):
+        if path["rank"] > SUGGESTIONS_KEPT:
+            floors[path["author"]] = path["score"]
+            continue
+        batch.append(
+            AuthorSuggestion(
+                author_id=path["author"],
+                suggested_id=path["suggested"],
+                score=path["score"],
+            )
+        )
+        if len(batch) >= SUGGESTION_BATCH_SIZE:
+            AuthorSuggestion.objects.bulk_create(batch)
+            rows += len(batch)
+            batch = []
+    if batch:
+        AuthorSuggestion.objects.bulk_create(batch)
+        rows += len(batch)
+    raise_floors(floors)
+    return rows
+
+
+def rebuild_suggestions():
+    """
+    Replace the suggestion table with the best scores computed from the
+    whole follow graph
+    """
+    AuthorSuggestion.objects.all().delete()
+    Author.objects.filter(suggestion_floor__gt=0).update(suggestion_floor=0)
+    return store_top()
+
+
+def recompute(author_ids):
+    """
+    Replace the suggestions of `author_ids` with the best ones computed
+    from the follow graph
+    """
+    for authors in batches(author_ids):
+        AuthorSuggestion.objects.filter(author_id__in=authors).delete()
+        Author.objects.filter(pk__in=authors).update(suggestion_floor=0)
+        store_top(authors)
+
+
+def rescore(author_ids, suggested_ids):
+    """
+    Recompute the rows of every (author, suggested) pair among the given
+    ids from the follow graph, a few statements per batch of ids whatever
+    the number of pairs. Pairs left out before are stored again; trim()
+    then drops the rows past each author's SUGGESTIONS_KEPT.
+    """
+    for authors in batches(author_ids):
+        for suggested in batches(suggested_ids):
+            AuthorSuggestion.objects.filter(
+                author_id__in=authors, suggested_id__in=suggested
+            ).delete()
+            AuthorSuggestion.objects.bulk_create(
+                AuthorSuggestion(
+                    author_id=path["author"],
+                    suggested_id=path["suggested"],
+                    score=path["score"],
+                )
+                for path in path_scores(authors, suggested)
+            )
+
+
+def trim(author_ids):
+    """
+    Drop the rows of `author_ids` past SUGGESTIONS_KEPT, raising their
+    floors, and recompute the authors whose served rows a left-out pair may
+    now outrank
+    """
+    stale = []
+    for authors in batches(author_ids):
+        dropped = ranked(
+            AuthorSuggestion.objects.filter(author_id__in=authors),
+            author="author_id",
+            suggested="suggested_id",
+        ).filter(rank__gt=SUGGESTIONS_KEPT)
+        floors = {}
+        ids = []
+        for pk, author_id, score in dropped.values_list("pk", "author_id", "score"):
+            floors[author_id] = max(score, floors.get(author_id, 0))
+            ids.append(pk)
+        if ids:
+            AuthorSuggestion.objects.filter(pk__in=ids).delete()
+            raise_floors(floors)
+
+        last_served = (
+            AuthorSuggestion.objects.filter(author_id=OuterRef("pk"))
+            .order_by("-score", "suggested")
+            .values("score")[MAX_SUGGESTION_LIMIT - 1 : MAX_SUGGESTION_LIMIT]
+        )
+        stale += (
+            Author.objects.filter(pk__in=authors, suggestion_floor__gt=0)
+            .annotate(cutoff=Subquery(last_served))
+            .filter(Q(cutoff__isnull=True) | Q(cutoff__lt=F("suggestion_floor")))
+            .values_list("pk", flat=True)
+        )
+    recompute(stale)
+
+
+def follow_edges_changed(follower_ids, followee_ids):
+    """
+    Update the suggestions touched by the follow edges from each of
+    `follower_ids` to each of `followee_ids`, which were just added or
+    removed. Only the pairs those paths join are rescored, all followers
+    at once, so the cost depends on the follow counts at either end of the
+    edges rather than on the size of the graph or the number of edges.
+    """
+    Follow = Author.following.through
+    # followers -> followees -> anyone the followees follow, and the
+    # followees themselves, suggested to the followers until followed
+    onward = Follow.objects.filter(from_author_id__in=followee_ids).values_list(
+        "to_author_id", flat=True
+    )
+    rescore(follower_ids, set(onward) | set(followee_ids))
+    # anyone following the followers -> followers -> followees
+    backward = set(
+        Follow.objects.filter(to_author_id__in=follower_ids).values_list(
+            "from_author_id", flat=True
+        )
+    )
+    rescore(backward, followee_ids)
+    trim(set(follower_ids) | backward)
+
+
+def get_suggestions(author, limit=None):
+    """
+    The local authors `author` is most connected to but doesn't follow yet,
+    highest score first, as AuthorSuggestion rows with `suggested` loaded
+    """
+    limit = min(int(limit or SUGGESTION_LIMIT), MAX_SUGGESTION_LIMIT)
+    followed = Author.following.through.objects.filter(
+        from_author_id=author.pk, to_author_id=OuterRef("suggested_id")
+    )
+    return (
+        AuthorSuggestion.objects.filter(author=author, suggested__node__isnull=True)
+        .exclude(Exists(followed))
+        .select_related("suggested")
+        .order_by("-score", "suggested")[:limit]
+    )
@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+
+from ..models import Author, Post
+
+
+def create_author(name, node=None):
+    user = User.objects.create(username=name, password="testpassword1")
+    return Author.objects.create(user=user, displayName=name, node=node)
+
+
+def create_post(author, **kwargs):
+    """
+    A public, listed plain text post by `author`, with `kwargs` for any
+    other fields
+    """
+    fields = {
+        "author": author,
+        "title": "Hello",
+        "contentType": "text/plain",
+        "unlisted": False,
+    }
+    fields.update(kwargs)
+    return Post.objects.create(**fields)
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Most queries each endpoint may run with a cold cache, by URL name
+BUDGETS = json.loads((Path(__file__).parent / "query_budgets.json").read_text())
+
+
+class QueryBudgetMixin:
+    """
+    Test case mixin checking an endpoint's query count against its budget in
+    query_budgets.json.
+
+    The test case must define `grow(size)` to seed its data. It is called
+    with each of `budget_sizes` in turn, in increasing order, and adds
+    whatever is missing for that size, so the data at size 8 is the data at
+    size 2 with more of everything.
+    """
+
+    budget_sizes = (2, 8)
+
+    def assertQueryBudget(self, url_name, request):
+        """
+        Grow the data to each size and make the request with the cache
+        cleared. Fails when the number of queries changes with the size of
+        the data, as an N+1 would, or goes over the endpoint's budget.
+        """
+        self.assertIn(url_name, BUDGETS, f"No query budget for {url_name}")
+        self.assertTrue(
+            callable(getattr(self, "grow", None)),
+            f"{type(self).__name__} must define grow(size) to seed its data",
+        )
+        counts = []
+        for size in self.budget_sizes:
+            self.grow(size)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+            self.assertLess(response.status_code, 400, url_name)
+            counts.append(len(queries))
+
+        sql = "\n".join(query["sql"] for query in queries)
+        self.assertEqual(
+            len(set(counts)),
+            1,
+            f"{url_name} ran {counts} queries at sizes {self.budget_sizes}:\n{sql}",
+        )
+        self.assertLessEqual(
+            counts[-1],
+            BUDGETS[url_name],
+            f"{url_name} ran {counts[-1]} queries, over its budget of "
+            f"{BUDGETS[url_name]}:\n{sql}",
+        )
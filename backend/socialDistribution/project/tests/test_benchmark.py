@@ -0,0 +1,101 @@
+import json
+import random
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from ..benchmark import follower_degrees
+from ..models import Author, Comment, FollowRequest, InboxItem, Post, PostLike
+
+
+class SeedSocialGraphTest(TestCase):
+    def seed(self, *args):
+        out = StringIO()
+        call_command("seed_social_graph", "--authors", "60", *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_follower_degrees_are_skewed(self):
+        degrees = follower_degrees(10_000, random.Random(0), 20)
+        self.assertLessEqual(max(degrees), 9_999)
+        # Most authors have fewer followers than average, a few far more
+        self.assertGreater(sum(d < 20 for d in degrees), 5_000)
+        self.assertGreater(max(degrees), 200)
+
+    def test_seeds_consistent_graph(self):
+        created = self.seed()
+
+        self.assertEqual(Author.objects.count(), 60)
+        self.assertEqual(Post.objects.count(), created["posts"])
+        self.assertEqual(Comment.objects.count(), created["comments"])
+        self.assertEqual(PostLike.objects.count(), created["likes"])
+        self.assertEqual(FollowRequest.objects.count(), created["follow_requests"])
+        self.assertEqual(InboxItem.objects.count(), created["inbox_items"])
+        self.assertGreater(created["likes"], 0)
+
+        counted = Author.objects.annotate(n=Count("followers"))
+        for author in counted:
+            self.assertEqual(author.follower_count, author.n)
+        counted = Post.objects.annotate(
+            likes=Count("postlike", distinct=True),
+            comments=Count("comment", distinct=True),
+        )
+        for post in counted:
+            self.assertEqual(post.like_count, post.likes)
+            self.assertEqual(post.comment_count, post.comments)
+        # Only followers like a post, and each at most once
+        for like in PostLike.objects.select_related("post"):
+            self.assertTrue(
+                like.post.author.followers.filter(pk=like.author_id).exists()
+            )
+
+    def snapshot(self):
+        return {
+            "authors": set(Author.objects.values_list("pk", "user__username")),
+            "posts": set(Post.objects.values_list("pk", "author_id", "published")),
+            "comments": set(Comment.objects.values_list("pk", "post_id", "published")),
+            "likes": set(PostLike.objects.values_list("pk", "post_id", "published")),
+            "follow_requests": set(FollowRequest.objects.values_list("pk")),
+        }
+
+    def test_same_seed_same_graph(self):
+        first = self.seed("--seed", "3")
+        rows = self.snapshot()
+        User.objects.all().delete()
+
+        self.assertEqual(self.seed("--seed", "3"), first)
+        self.assertEqual(self.snapshot(), rows)
+
+
+class BenchmarkViewsTest(TestCase):
+    def test_reports_every_view(self):
+        call_command("seed_social_graph", "--authors", "30", stdout=StringIO())
+        posts = Post.objects.count()
+        out = StringIO()
+
+        call_command(
+            "benchmark_views", "--requests", "3", stdout=out, stderr=StringIO()
+        )
+
+        results = json.loads(out.getvalue())
+        self.assertEqual(
+            set(results["views"]),
+            {
+                "stream_view",
+                "update_inbox",
+                "AuthorAPIView",
+                "FollowersAPIView",
+                "SearchAuthors",
+                "create_post",
+            },
+        )
+        for name, result in results["views"].items():
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries_max"], 0)
+            self.assertEqual(sum(result["statuses"].values()), 3)
+            self.assertTrue(set(result["statuses"]) <= {"200", "201", "302"}, name)
+        self.assertEqual(results["views"]["create_post"]["statuses"], {"302": 3})
+        # The created posts are removed again
+        self.assertEqual(Post.objects.count(), posts)
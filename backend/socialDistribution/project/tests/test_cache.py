@@ -0,0 +1,137 @@
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from .. import metrics
+from ..cache import author_payloads, post_payloads
+from ..models import Author, Comment, Post, Stamp
+from ..serializers import AuthorSerializer, PostSerializer
+from ..versions import author_stamp
+from .factories import create_author, create_post
+
+
+class PayloadCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_matches_serializer(self):
+        post = create_post(self.alice)
+
+        self.assertEqual(
+            author_payloads.get(self.alice), AuthorSerializer(self.alice).data
+        )
+        self.assertEqual(post_payloads.get(post), PostSerializer(post).data)
+        # Served from the cache the second time
+        self.assertEqual(post_payloads.get(post), PostSerializer(post).data)
+
+    def test_hits_and_misses_are_counted(self):
+        author_payloads.get_many([self.alice, self.bob])
+        author_payloads.get_many([self.bob, self.alice])
+
+        self.assertEqual(
+            metrics.get("serialization_cache_misses_total", kind="author"), 2
+        )
+        self.assertEqual(
+            metrics.get("serialization_cache_hits_total", kind="author"), 2
+        )
+
+    def test_keeps_order(self):
+        payloads = author_payloads.get_many([self.bob, self.alice, self.bob])
+        self.assertEqual(
+            [payload["displayName"] for payload in payloads], ["Bob", "Alice", "Bob"]
+        )
+
+    def test_save_invalidates(self):
+        author_payloads.get(self.alice)
+        self.alice.displayName = "Alicia"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.save()
+
+        self.assertEqual(author_payloads.get(self.alice)["displayName"], "Alicia")
+
+    def test_stamp_retires_payloads_of_every_process(self):
+        # A change made elsewhere leaves this process's entry in place but
+        # bumps the stamp it is keyed by
+        author_payloads.get(self.alice)
+        Author.objects.filter(pk=self.alice.pk).update(displayName="Alicia")
+        Stamp.objects.create(name=author_stamp(self.alice.pk), changed=time.time_ns())
+        self.alice.refresh_from_db()
+
+        self.assertEqual(author_payloads.get(self.alice)["displayName"], "Alicia")
+
+    def test_comment_invalidates_post(self):
+        post = create_post(self.alice)
+        post_payloads.get(post)
+
+        self.client.force_login(self.bob.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("project:add_comment", args=[post.id]), {"content": "Hi"}
+            )
+        post.refresh_from_db()
+        self.assertEqual(post_payloads.get(post)["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.get().delete()
+        post_payloads.get(post)
+        self.assertEqual(
+            metrics.get("serialization_cache_misses_total", kind="post"), 3
+        )
+
+    def test_refresh_counters_invalidates_posts(self):
+        post = create_post(self.alice)
+        post_payloads.get(post)
+        Post.objects.filter(pk=post.pk).update(comment_count=5)
+        post.refresh_from_db()
+
+        call_command("refresh_counters", stdout=StringIO())
+        self.assertEqual(post_payloads.get(post)["count"], 0)
+
+
+class MetricsViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_exposes_counters(self):
+        author = create_author("Alice")
+        self.client.get(reverse("project:author_api", args=[author.id]))
+        self.client.get(reverse("project:author_api", args=[author.id]))
+
+        with self.settings(METRICS_TOKEN="secret"):
+            resp = self.client.get(
+                reverse("project:metrics"), HTTP_AUTHORIZATION="Bearer secret"
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(
+            'serialization_cache_hits_total{kind="author"} 1', resp.content.decode()
+        )
+        self.assertIn(
+            'serialization_cache_misses_total{kind="author"} 1', resp.content.decode()
+        )
+
+    def test_requires_token_or_staff(self):
+        url = reverse("project:metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        with self.settings(METRICS_TOKEN="secret"):
+            resp = self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(resp.status_code, 403)
+
+        author = create_author("Alice")
+        self.client.force_login(author.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        User.objects.filter(pk=author.user.pk).update(is_staff=True)
+        self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..categories import parse_categories
+from ..counters import refresh_counters
+from ..models import Author, Category, Post, PostCategory
+
+
+def create_post(author, **kwargs):
+    fields = {
+        "author": author,
+        "title": "Untitled",
+        "contentType": "text/plain",
+        "unlisted": False,
+    }
+    fields.update(kwargs)
+    return Post.objects.create(**fields)
+
+
+def post_counts():
+    return dict(Category.objects.values_list("name", "post_count"))
+
+
+class CategoryIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="Alice", password="testpassword1")
+        cls.alice = Author.objects.create(user=user, displayName="Alice")
+
+    def test_parse_categories(self):
+        self.assertEqual(
+            parse_categories("Django, web  web;python-3"), ["django", "web", "python-3"]
+        )
+        self.assertEqual(parse_categories(""), [])
+        self.assertEqual(parse_categories("x" * 60), ["x" * 50])
+
+    def test_create_indexes_categories(self):
+        post = create_post(self.alice, categories="django web")
+        create_post(self.alice, categories="web")
+
+        self.assertEqual(post_counts(), {"django": 1, "web": 2})
+        self.assertCountEqual(
+            post.tags.values_list("name", flat=True), ["django", "web"]
+        )
+
+    def test_edit_moves_post_between_categories(self):
+        post = create_post(self.alice, categories="django web")
+        post.categories = "web python"
+        post.published = timezone.now() - timedelta(days=1)
+        post.save()
+
+        self.assertEqual(post_counts(), {"django": 0, "web": 1, "python": 1})
+        self.assertFalse(
+            PostCategory.objects.exclude(published=post.published).exists()
+        )
+
+    def test_only_public_listed_posts_are_indexed(self):
+        create_post(self.alice, categories="web", unlisted=True)
+        create_post(
+            self.alice,
+            categories="web",
+            visibility=Post.VisibilityChoice.FRIENDS_ONLY,
+        )
+        post = create_post(self.alice, categories="web")
+        self.assertEqual(post_counts(), {"web": 1})
+
+        post.visibility = Post.VisibilityChoice.PRIVATE
+        post.save()
+        self.assertEqual(post_counts(), {"web": 0})
+
+    def test_delete_decrements_counts(self):
+        post = create_post(self.alice, categories="django web")
+        post.delete()
+
+        self.assertEqual(post_counts(), {"django": 0, "web": 0})
+        self.assertFalse(PostCategory.objects.exists())
+
+    def test_refresh_counters(self):
+        create_post(self.alice, categories="web")
+        Category.objects.update(post_count=7)
+
+        refresh_counters()
+        self.assertEqual(post_counts(), {"web": 1})
+
+
+class CategoryPostsAPITest(APITestCase):
+    url_name = "project:category_posts_api"
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="Alice", password="testpassword1")
+        alice = Author.objects.create(user=user, displayName="Alice")
+        now = timezone.now()
+        cls.posts = [
+            create_post(
+                alice,
+                title=f"Post {i}",
+                categories="Travel",
+                published=now - timedelta(hours=i),
+            )
+            for i in range(3)
+        ]
+        create_post(alice, categories="cooking")
+
+    def test_feed_is_paginated_newest_first(self):
+        url = reverse(self.url_name, args=["travel"])
+        resp = self.client.get(url, {"size": 2})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["type"], "posts")
+        self.assertEqual(resp.data["category"], "travel")
+        self.assertEqual(resp.data["count"], 3)
+        self.assertEqual(
+            [item["title"] for item in resp.data["items"]], ["Post 0", "Post 1"]
+        )
+
+        resp = self.client.get(url, {"size": 2, "cursor": resp.data["next"]})
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["Post 2"])
+        self.assertIsNone(resp.data["next"])
+
+    def test_name_is_case_insensitive(self):
+        resp = self.client.get(reverse(self.url_name, args=["TRAVEL"]))
+        self.assertEqual(len(resp.data["items"]), 3)
+
+    def test_unknown_category(self):
+        resp = self.client.get(reverse(self.url_name, args=["nope"]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(
+            reverse(self.url_name, args=["travel"]), {"cursor": "bogus"}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
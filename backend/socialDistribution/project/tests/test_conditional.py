@@ -0,0 +1,134 @@
+import time
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Stamp
+from ..versions import AUTHORS
+from .factories import create_author, create_post
+
+
+class ConditionalGetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.alice.followers.add(cls.bob)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNotModified(self, url, **headers):
+        resp = self.client.get(url, headers=headers)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp.content, b"")
+
+    def assertModified(self, url, etag):
+        resp = self.client.get(url, headers={"if-none-match": etag})
+        self.assertNotEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_authors(self):
+        url = reverse("project:get_authors")
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        etag = resp["ETag"]
+        self.assertNotModified(url, **{"if-none-match": etag})
+
+        self.alice.displayName = "Alicia"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.save()
+        self.assertModified(url, etag)
+        self.assertIn("Last-Modified", self.client.get(url))
+
+    def test_stamps_shared_between_processes(self):
+        url = reverse("project:get_authors")
+        etag = self.client.get(url)["ETag"]
+
+        # A worker with a cold cache reads the same stamps
+        cache.clear()
+        self.assertNotModified(url, **{"if-none-match": etag})
+
+        # A bump committed by another process, e.g. a management command
+        Stamp.objects.create(name=AUTHORS, changed=time.time_ns())
+        self.assertModified(url, etag)
+
+    def test_author_posts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = create_post(self.alice)
+        url = reverse("project:new_post_api", args=[self.alice.id])
+        resp = self.client.get(url)
+        etag = resp["ETag"]
+        self.assertNotModified(url, **{"if-none-match": etag})
+        self.assertNotModified(url, **{"if-modified-since": resp["Last-Modified"]})
+
+        post.title = "Edited"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertModified(url, etag)
+
+    def test_author_posts_depend_on_viewer_and_query(self):
+        url = reverse("project:new_post_api", args=[self.alice.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.assertModified(url + "?stream=1", etag)
+        self.client.force_authenticate(self.bob.user)
+        self.assertModified(url, etag)
+
+    def test_inbox(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = create_post(self.alice)
+        url = reverse("project:inbox_api", args=[self.bob.id])
+        etag = self.client.get(url)["ETag"]
+
+        # The author, the page's rows and their stamps are read; no posts
+        # are loaded
+        with self.assertNumQueries(3):
+            self.assertNotModified(url, **{"if-none-match": etag})
+
+        post.content = "Edited"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertModified(url, etag)
+
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(self.alice)
+        self.assertModified(url, etag)
+
+    def test_inbox_deleted_post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(self.alice, title="Older")
+            newest = create_post(self.alice)
+        url = reverse("project:inbox_api", args=[self.bob.id])
+        resp = self.client.get(url)
+        # The page's newest stamp goes back when its newest post is deleted
+        self.assertNotIn("Last-Modified", resp)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.delete()
+        self.assertModified(url, resp["ETag"])
+
+    def test_inbox_invalid_cursor(self):
+        url = reverse("project:inbox_api", args=[self.bob.id])
+        resp = self.client.get(url, {"cursor": "bogus"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_followers(self):
+        url = reverse("project:get_followers", args=[self.alice.id])
+        etag = self.client.get(url)["ETag"]
+        self.assertNotModified(url, **{"if-none-match": etag})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.followers.add(create_author("Carl"))
+        self.assertModified(url, etag)
+
+    def test_unsafe_methods_unaffected(self):
+        url = reverse("project:api_follower", args=[self.alice.id, self.bob.id])
+        etag = self.client.get(url)["ETag"]
+
+        resp = self.client.delete(url, headers={"if-none-match": etag})
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
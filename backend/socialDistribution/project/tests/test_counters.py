@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Author, Comment, CommentLike, InboxItem, Post, PostLike
+from ..serializers import PostSerializer
+
+
+class CounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            Author.objects.create(user=user, displayName=name)
+
+    def setUp(self):
+        self.alice = Author.objects.get(displayName="Alice")
+        self.bob = Author.objects.get(displayName="Bob")
+        self.post = Post.objects.create(
+            author=self.alice,
+            title="Hello",
+            content="World",
+            contentType="text/plain",
+            unlisted=False,
+        )
+        self.client.force_login(self.bob.user)
+
+    def test_like_and_unlike(self):
+        url = reverse("project:like_post", args=[self.post.id])
+
+        self.client.post(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        self.client.post(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_add_comment(self):
+        url = reverse("project:add_comment", args=[self.post.id])
+
+        self.client.post(url, {"content": "Nice"})
+        self.client.post(url, {"content": "Very nice"})
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(PostSerializer(self.post).data["count"], 2)
+
+    def test_refresh_counters(self):
+        comment = Comment.objects.create(
+            author=self.bob, post=self.post, comment="Nice", contentType="text/plain"
+        )
+        PostLike.objects.create(author=self.bob, post=self.post)
+        CommentLike.objects.create(author=self.alice, comment=comment)
+        Post.objects.update(like_count=7)
+
+        call_command("refresh_counters", stdout=StringIO())
+
+        self.post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertEqual(comment.like_count, 1)
+
+    def test_stream_has_no_per_post_counts(self):
+        def render_home():
+            # Render every fragment
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("project:home"))
+            return len(queries)
+
+        InboxItem.objects.create(author=self.bob, post=self.post)
+        baseline = render_home()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                post = Post.objects.create(
+                    author=self.alice,
+                    title=f"Post {i}",
+                    contentType="text/plain",
+                    unlisted=False,
+                )
+                InboxItem.objects.create(author=self.bob, post=post)
+
+        self.assertEqual(render_home(), baseline)
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TestCase, override_settings
+
+from ..federation import FederationClient, FederationError, fetch_remote_authors
+from ..models import Node
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunked(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(body), 7):
+            chunk = body[start : start + 7]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if self.path.endswith("/authors/"):
+                if server.failures > 0:
+                    server.failures -= 1
+                    self.send_json({}, status=503)
+                else:
+                    self.send_json({"type": "authors", "items": [server.name]})
+            elif self.path.endswith("/posts/"):
+                self.send_chunked([{"title": "Remote post"}])
+            elif self.path.endswith("/followers/"):
+                self.send_json({"type": "followers", "items": ["f1", "f2"]})
+            else:
+                self.send_json({}, status=404)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.requests.append(self.path)
+        self.send_json({}, status=503)
+
+
+class GarbageHandler(StubHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+        self.wfile.write(b"garbage\r\n\r\n")
+        self.close_connection = True
+
+
+class RawHandler(StubHandler):
+    """
+    Answers with the server's `raw` bytes as the body, delimited by closing
+    the connection
+    """
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+        self.wfile.write(b"HTTP/1.1 200 OK\r\n\r\n" + self.server.raw)
+        self.close_connection = True
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients going away mid-response is part of the timeout tests
+        pass
+
+
+class StubNode:
+    """
+    A peer node served from a thread, counting connections and requests
+    """
+
+    def __init__(self, name, delay=0, failures=0, handler=StubHandler):
+        self.server = StubServer(("127.0.0.1", 0), handler)
+        self.server.name = name
+        self.server.delay = delay
+        self.server.failures = failures
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.requests = []
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.01,), daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/project/api/"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FederationClientTest(TestCase):
+    def start_node(self, name, **kwargs):
+        stub = StubNode(name, **kwargs)
+        self.addCleanup(stub.stop)
+        node = Node.objects.create(nodeName=name, apiURL=stub.url)
+        return stub, node
+
+    def run_client(self, coro_func, **kwargs):
+        async def run():
+            async with FederationClient(backoff=0.01, **kwargs) as client:
+                return await coro_func(client)
+
+        return asyncio.run(run())
+
+    def test_fetches_authors_posts_and_followers(self):
+        stub, node = self.start_node("alpha")
+
+        async def fetch(client):
+            return (
+                await client.get_authors(node),
+                await client.get_posts(node, "abc"),
+                await client.get_followers(node, "abc"),
+            )
+
+        authors, posts, followers = self.run_client(fetch)
+        self.assertEqual(authors, ["alpha"])
+        self.assertEqual(posts, [{"title": "Remote post"}])
+        self.assertEqual(followers, ["f1", "f2"])
+        self.assertEqual(
+            stub.server.requests,
+            [
+                "/project/api/authors/",
+                "/project/api/authors/abc/posts/",
+                "/project/api/authors/abc/followers/",
+            ],
+        )
+
+    def test_reuses_connections(self):
+        stub, node = self.start_node("alpha")
+
+        async def fetch(client):
+            for _ in range(5):
+                await client.get_authors(node)
+
+        self.run_client(fetch)
+        self.assertEqual(len(stub.server.requests), 5)
+        self.assertEqual(stub.server.connections, 1)
+
+    def test_limits_concurrency_per_node(self):
+        stub, node = self.start_node("alpha", delay=0.05)
+
+        async def fetch(client):
+            await asyncio.gather(*(client.get_authors(node) for _ in range(6)))
+
+        self.run_client(fetch, max_connections=2)
+        self.assertEqual(stub.server.max_in_flight, 2)
+        self.assertEqual(stub.server.connections, 2)
+
+    def test_retries_unavailable_node(self):
+        stub, node = self.start_node("alpha", failures=2)
+
+        authors = self.run_client(lambda client: client.get_authors(node), retries=2)
+        self.assertEqual(authors, ["alpha"])
+        self.assertEqual(len(stub.server.requests), 3)
+
+    def test_gives_up_after_retries(self):
+        stub, node = self.start_node("alpha", failures=5)
+
+        with self.assertRaises(FederationError):
+            self.run_client(lambda client: client.get_authors(node), retries=1)
+        self.assertEqual(len(stub.server.requests), 2)
+
+    def test_timeout(self):
+        stub, node = self.start_node("alpha", delay=0.5)
+
+        with self.assertRaises(FederationError):
+            self.run_client(
+                lambda client: client.get_authors(node), timeout=0.1, retries=0
+            )
+
+    @override_settings(FEDERATION_RETRIES=0)
+    def test_gathers_nodes_concurrently(self):
+        _, alpha = self.start_node("alpha", delay=0.2)
+        _, beta = self.start_node("beta", delay=0.2)
+        dead = Node.objects.create(nodeName="dead", apiURL="http://127.0.0.1:9/")
+
+        results = fetch_remote_authors([alpha, beta, dead])
+
+        self.assertEqual(results[alpha], ["alpha"])
+        self.assertEqual(results[beta], ["beta"])
+        self.assertIsInstance(results[dead], FederationError)
+
+    def test_sync_helper_inside_event_loop(self):
+        _, alpha = self.start_node("alpha")
+
+        async def run():
+            return fetch_remote_authors([alpha])
+
+        self.assertEqual(asyncio.run(run()), {alpha: ["alpha"]})
+
+    def test_api_url_without_trailing_slash(self):
+        stub, node = self.start_node("alpha")
+        node.apiURL = stub.url.rstrip("/")
+
+        self.assertEqual(
+            self.run_client(lambda client: client.get_authors(node)), ["alpha"]
+        )
+        self.assertEqual(stub.server.requests, ["/project/api/authors/"])
+
+    def test_malformed_response(self):
+        stub, node = self.start_node("alpha", handler=GarbageHandler)
+
+        with self.assertRaises(FederationError):
+            self.run_client(lambda client: client.get_authors(node), retries=2)
+        self.assertEqual(len(stub.server.requests), 1)
+
+    def test_bad_json(self):
+        for raw in [b"{not json", b"\xff\xfe", b"[1, 2]", b'{"items": 3}']:
+            with self.subTest(raw=raw):
+                stub, node = self.start_node("alpha", handler=RawHandler)
+                stub.server.raw = raw
+
+                with self.assertRaises(FederationError):
+                    self.run_client(lambda client: client.get_authors(node))
+
+    def test_body_over_limit(self):
+        stub, node = self.start_node("alpha")
+        raw, raw_node = self.start_node("beta", handler=RawHandler)
+        raw.server.raw = b'{"items": []}' + b" " * 100
+
+        for fetch in [
+            # Content-Length, chunked, and read until the peer closes
+            lambda client: client.get_authors(node),
+            lambda client: client.get_posts(node, "abc"),
+            lambda client: client.get_authors(raw_node),
+        ]:
+            with self.assertRaises(FederationError):
+                self.run_client(fetch, max_body=20)
+        self.assertEqual(
+            self.run_client(lambda client: client.get_authors(raw_node)), []
+        )
+
+    def test_does_not_retry_post(self):
+        stub, node = self.start_node("alpha")
+
+        with self.assertRaises(FederationError):
+            self.run_client(
+                lambda client: client.request(node, "POST", "authors/abc/inbox", b"{}"),
+                retries=2,
+            )
+        self.assertEqual(stub.server.requests, ["/project/api/authors/abc/inbox"])
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.urls import reverse
 
@@ -9,6 +11,7 @@ from rest_framework import status
 
 from ..models import Author, FollowRequest
 from ..serializers import FollowRequestSerializer, AuthorSerializer
+from .factories import create_author
 
 
 class FollowRequestSerializerTest(TestCase):
@@ -126,3 +129,127 @@ class FollowRequestAPITest(APITestCase):
         query = FollowRequest.objects.filter(follower=self.bob, following=self.alice)
         self.assertFalse(query.exists())
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FollowRequestBatchAPITest(APITestCase):
+    url_name = "project:api_follow_request_batch"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = []
+        for name in ["Alice", "Bob", "Carol", "Dave", "Erin"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            cls.authors.append(Author.objects.create(user=user, displayName=name))
+        cls.alice = cls.authors[0]
+
+    def setUp(self):
+        self.requests = [
+            FollowRequest.objects.create(
+                follower=author, following=self.alice, summary="Follow"
+            )
+            for author in self.authors[1:]
+        ]
+        self.client.force_authenticate(self.alice.user)
+
+    def post(self, data, author=None):
+        url = reverse(self.url_name, args=[(author or self.alice).id])
+        return self.client.post(url, data, format="json")
+
+    def test_accepts_and_declines(self):
+        bob_fr, carol_fr, dave_fr, erin_fr = self.requests
+        missing = uuid.uuid4()
+
+        resp = self.post(
+            {
+                "accept": [str(bob_fr.id), str(carol_fr.id), str(missing)],
+                "decline": [str(dave_fr.id)],
+            }
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            resp.data["items"],
+            [
+                {"id": str(bob_fr.id), "result": "accepted"},
+                {"id": str(carol_fr.id), "result": "accepted"},
+                {"id": str(missing), "result": "not found"},
+                {"id": str(dave_fr.id), "result": "declined"},
+            ],
+        )
+        self.assertQuerySetEqual(
+            self.alice.followers.order_by("displayName"),
+            ["Bob", "Carol"],
+            transform=lambda author: author.displayName,
+        )
+        self.assertQuerySetEqual(FollowRequest.objects.all(), [erin_fr])
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.follower_count, 2)
+
+    def test_one_insert_and_one_delete(self):
+        ids = [str(fr.id) for fr in self.requests]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post({"accept": ids})
+
+        statements = [query["sql"] for query in queries]
+        inserts = [sql for sql in statements if "INTO" in sql and "following" in sql]
+        deletes = [
+            sql
+            for sql in statements
+            if sql.startswith("DELETE") and FollowRequest._meta.db_table in sql
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(self.alice.followers.count(), 4)
+
+    def answer_requests(self, size):
+        """
+        Queries taken, on_commit callbacks included, to accept half of `size`
+        new requests to Alice and decline the rest. Each follower follows and
+        is followed by someone, so the suggestions have paths to update.
+        """
+        ids = []
+        for i in range(size):
+            follower = create_author(f"Fan{size}x{i}")
+            follower.following.add(self.authors[1])
+            follower.followers.add(self.authors[2])
+            fr = FollowRequest.objects.create(
+                follower=follower, following=self.alice, summary="Follow"
+            )
+            ids.append(str(fr.id))
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.post({"accept": ids[::2], "decline": ids[1::2]})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_batch(self):
+        self.alice.following.add(self.authors[3])
+
+        self.assertEqual(self.answer_requests(2), self.answer_requests(8))
+        self.assertEqual(self.alice.followers.count(), 5)
+
+    def test_other_authors_requests_not_found(self):
+        bob = self.authors[1]
+        carol_to_bob = FollowRequest.objects.create(
+            follower=self.authors[2], following=bob, summary="Follow"
+        )
+
+        resp = self.post({"accept": [str(carol_to_bob.id)]})
+
+        self.assertEqual(resp.data["items"][0]["result"], "not found")
+        self.assertTrue(FollowRequest.objects.filter(pk=carol_to_bob.pk).exists())
+
+    def test_only_the_author_may_answer(self):
+        resp = self.post({"accept": [str(self.requests[0].id)]}, author=self.authors[1])
+
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bad_data(self):
+        fr_id = str(self.requests[0].id)
+
+        for data in [{"accept": ["nope"]}, {"accept": [fr_id], "decline": [fr_id]}]:
+            resp = self.post(data)
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(FollowRequest.objects.count(), 4)
@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from ..friends import cached_friend_ids, get_friend_ids, invalidate_friends
+from ..models import Author, FollowRequest, Post
+from ..visibility import can_view_post
+
+
+@override_settings(SHARED_CACHE=True)
+class FriendSetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob", "Carl"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            setattr(
+                cls, name.lower(), Author.objects.create(user=user, displayName=name)
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def befriend(self, a, b):
+        a.following.add(b)
+        b.following.add(a)
+
+    def test_friends_are_mutual_follows(self):
+        self.befriend(self.alice, self.bob)
+        self.alice.following.add(self.carl)
+
+        self.assertEqual(get_friend_ids(self.alice.id), {self.bob.id})
+        self.assertEqual(get_friend_ids(self.bob.id), {self.alice.id})
+        self.assertEqual(get_friend_ids(self.carl.id), set())
+
+    def test_friend_set_is_cached(self):
+        self.befriend(self.alice, self.bob)
+        get_friend_ids(self.alice.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_friend_ids(self.alice.id), {self.bob.id})
+
+    @override_settings(SHARED_CACHE=False)
+    def test_not_cached_per_process(self):
+        self.befriend(self.alice, self.bob)
+        get_friend_ids(self.alice.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_friend_ids(self.alice.id), {self.bob.id})
+        self.assertNotIsInstance(cached_friend_ids(self.alice.id), frozenset)
+
+    def test_invalidated_again_on_commit(self):
+        self.befriend(self.alice, self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_friends([self.alice.id])
+            # A reader racing the change caches the set it still sees
+            get_friend_ids(self.alice.id)
+
+        with self.assertNumQueries(1):
+            get_friend_ids(self.alice.id)
+
+    def test_unfollow_invalidates_both_sides(self):
+        self.befriend(self.alice, self.bob)
+        get_friend_ids(self.alice.id)
+        get_friend_ids(self.bob.id)
+
+        self.client.force_login(self.alice.user)
+        self.client.post(reverse("project:unfollow", args=[self.bob.id]))
+
+        self.assertEqual(get_friend_ids(self.alice.id), set())
+        self.assertEqual(get_friend_ids(self.bob.id), set())
+
+    def test_accept_follow_request_invalidates(self):
+        self.bob.following.add(self.alice)
+        self.assertEqual(get_friend_ids(self.bob.id), set())
+
+        request = FollowRequest.objects.create(
+            follower=self.alice, following=self.bob, summary=""
+        )
+        self.client.force_login(self.bob.user)
+        self.client.post(reverse("project:accept_follow", args=[request.id]))
+
+        self.assertEqual(get_friend_ids(self.bob.id), {self.alice.id})
+
+    def test_follower_api_invalidates(self):
+        self.alice.following.add(self.bob)
+        self.assertEqual(get_friend_ids(self.alice.id), set())
+
+        url = reverse("project:api_follower", args=[self.alice.id, self.bob.id])
+        resp = self.client.put(url)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(get_friend_ids(self.alice.id), {self.bob.id})
+
+        self.client.delete(url)
+        self.assertEqual(get_friend_ids(self.alice.id), set())
+
+
+class PostVisibilityTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob", "Carl"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            setattr(
+                cls, name.lower(), Author.objects.create(user=user, displayName=name)
+            )
+        cls.alice.following.add(cls.bob)
+        cls.bob.following.add(cls.alice)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, visibility):
+        return Post.objects.create(
+            author=self.alice,
+            title="Hello",
+            contentType="text/plain",
+            unlisted=False,
+            visibility=visibility,
+        )
+
+    def test_can_view_post(self):
+        Visibility = Post.VisibilityChoice
+        public = self.create_post(Visibility.PUBLIC)
+        friends = self.create_post(Visibility.FRIENDS_ONLY)
+        private = self.create_post(Visibility.PRIVATE)
+
+        for viewer, expected in [
+            (None, [True, False, False]),
+            (self.alice, [True, True, True]),
+            (self.bob, [True, True, False]),
+            (self.carl, [True, False, False]),
+        ]:
+            self.assertEqual(
+                [can_view_post(viewer, post) for post in (public, friends, private)],
+                expected,
+            )
+
+    def test_post_page_hides_friends_only_posts(self):
+        post = self.create_post(Post.VisibilityChoice.FRIENDS_ONLY)
+        url = reverse("project:post", args=[post.id])
+
+        self.client.force_login(self.carl.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_login(self.bob.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
@@ -0,0 +1,263 @@
+import base64
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from ..models import Author, Comment, FollowRequest, InboxItem, Node, Post, PostLike
+from ..remote_authors import node_for_url
+from ..stream import get_stream_page
+
+PEER = "http://peer.example/api/"
+
+
+def basic_auth(username, password):
+    token = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return f"Basic {token}"
+
+
+def remote_author(name, author_id=None):
+    author_id = author_id or uuid.uuid4()
+    return {
+        "type": "author",
+        "id": str(author_id),
+        "url": f"{PEER}authors/{author_id}",
+        "displayName": name,
+        "github": "",
+        "profileImage": "https://example.com/avatar.png",
+    }
+
+
+def remote_post(author, **kwargs):
+    post_id = uuid.uuid4()
+    return {
+        "type": "post",
+        "id": str(post_id),
+        "title": "Remote post",
+        "source": f"{author['url']}/posts/{post_id}",
+        "origin": f"{author['url']}/posts/{post_id}",
+        "contentType": "text/plain",
+        "content": "Hello from elsewhere",
+        "author": author,
+        "visibility": "PUBLIC",
+        "unlisted": False,
+        **kwargs,
+    }
+
+
+class InboxBatchAPITest(APITestCase):
+    url_name = "project:inbox_batch_api"
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="Alice", password="testpassword1")
+        cls.alice = Author.objects.create(user=user, displayName="Alice")
+        cls.node = Node(nodeName="peer", apiURL=PEER, username="peer")
+        cls.node.set_password("peerpassword1")
+        cls.node.save()
+        cls.post = Post.objects.create(
+            author=cls.alice,
+            title="Local post",
+            source="http://local.example/posts/1",
+            unlisted=False,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("peer", "peerpassword1"))
+        self.bob = remote_author("Bob")
+        self.carol = remote_author("Carol")
+
+    def post_items(self, items):
+        url = reverse(self.url_name, args=[self.alice.id])
+        return self.client.post(url, {"type": "inbox", "items": items}, format="json")
+
+    def like(self, author):
+        return {
+            "type": "Like",
+            "author": author,
+            "object": f"http://local.example/api/authors/{self.alice.id}/posts/{self.post.id}",
+        }
+
+    def comment(self, author):
+        return {
+            "type": "comment",
+            "id": f"http://local.example/api/authors/{self.alice.id}/posts/{self.post.id}"
+            f"/comments/{uuid.uuid4()}",
+            "author": author,
+            "comment": "Nice",
+            "contentType": "text/plain",
+        }
+
+    def test_ingests_every_type(self):
+        post = remote_post(self.bob)
+        items = [
+            post,
+            self.like(self.bob),
+            self.like(self.carol),
+            self.comment(self.carol),
+            {
+                "type": "Follow",
+                "summary": "Bob wants to follow Alice",
+                "actor": self.bob,
+            },
+        ]
+
+        resp = self.post_items(items)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [item["result"] for item in resp.data["items"]], ["accepted"] * 5
+        )
+        # Each remote author is stored once
+        self.assertEqual(Author.objects.filter(node=self.node).count(), 2)
+        bob = Author.objects.get(url=self.bob["url"])
+        self.assertIsNone(bob.user)
+
+        remote = Post.objects.get(pk=post["id"])
+        self.assertEqual(remote.author, bob)
+        self.assertEqual(
+            [page_post.pk for page_post in get_stream_page(self.alice).items],
+            [remote.pk],
+        )
+        self.assertEqual(
+            set(
+                InboxItem.objects.filter(author=self.alice).values_list(
+                    "item_type", flat=True
+                )
+            ),
+            {"post"},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 2)
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertTrue(
+            FollowRequest.objects.filter(follower=bob, following=self.alice).exists()
+        )
+
+    def test_redelivery_is_idempotent(self):
+        items = [
+            remote_post(self.bob),
+            self.like(self.bob),
+            self.comment(self.bob),
+            {"type": "follow", "actor": self.bob},
+        ]
+
+        self.post_items(items)
+        resp = self.post_items(items)
+
+        self.assertEqual(
+            [item["result"] for item in resp.data["items"]], ["accepted"] * 4
+        )
+        self.assertEqual(Post.objects.filter(author__node=self.node).count(), 1)
+        self.assertEqual(PostLike.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(FollowRequest.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+    def test_bulk_writes(self):
+        authors = [remote_author(f"Remote{i}") for i in range(20)]
+        small = [remote_post(self.bob), self.like(self.bob)]
+        large = [remote_post(author) for author in authors]
+        large += [self.like(author) for author in authors]
+        # The registered nodes are read once and then cached; the sending
+        # node is read once per request to authenticate it
+        node_for_url(PEER)
+
+        with self.assertNumQueries(14):
+            self.post_items(small)
+        with self.assertNumQueries(14):
+            self.post_items(large)
+        self.assertEqual(Author.objects.filter(node=self.node).count(), 21)
+        self.assertEqual(PostLike.objects.count(), 21)
+
+    def test_per_item_errors(self):
+        items = [
+            {"type": "dislike"},
+            remote_post(self.bob, unlisted="maybe"),
+            remote_post(
+                {**self.bob, "url": f"http://unknown.example/authors/{uuid.uuid4()}"}
+            ),
+            {**self.like(self.bob), "object": f"{PEER}posts/{uuid.uuid4()}"},
+            remote_post(self.bob),
+        ]
+
+        resp = self.post_items(items)
+
+        results = resp.data["items"]
+        self.assertEqual(
+            [item["result"] for item in results],
+            ["rejected"] * 4 + ["accepted"],
+        )
+        self.assertIn("type", results[0]["errors"])
+        self.assertIn("unlisted", results[1]["errors"])
+        self.assertIn("author", results[2]["errors"])
+        self.assertIn("object", results[3]["errors"])
+
+    def test_post_id_owned_by_another_author(self):
+        resp = self.post_items([{**remote_post(self.bob), "id": str(self.post.id)}])
+
+        self.assertEqual(resp.data["items"][0]["result"], "rejected")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.author, self.alice)
+
+    def test_author_of_another_node_is_rejected(self):
+        Node.objects.create(nodeName="other", apiURL="http://other.example/api/")
+        dave = {
+            **remote_author("Dave"),
+            "url": f"http://other.example/api/authors/{uuid.uuid4()}",
+        }
+
+        resp = self.post_items([remote_post(dave), self.like(dave)])
+
+        self.assertEqual(
+            [item["result"] for item in resp.data["items"]], ["rejected"] * 2
+        )
+        self.assertFalse(Author.objects.filter(url=dave["url"]).exists())
+        self.assertEqual(PostLike.objects.count(), 0)
+
+    def test_reaction_to_another_authors_post_is_rejected(self):
+        user = User.objects.create(username="Erin", password="testpassword1")
+        erin = Author.objects.create(user=user, displayName="Erin")
+        post = Post.objects.create(author=erin, title="Erin's post", unlisted=False)
+        post_url = f"http://local.example/api/authors/{erin.id}/posts/{post.id}"
+
+        resp = self.post_items(
+            [
+                {**self.like(self.bob), "object": post_url},
+                {**self.comment(self.bob), "id": f"{post_url}/comments/{uuid.uuid4()}"},
+            ]
+        )
+
+        self.assertEqual(
+            [item["result"] for item in resp.data["items"]], ["rejected"] * 2
+        )
+        self.assertEqual(PostLike.objects.count(), 0)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_requires_node_credentials(self):
+        self.client.credentials()
+        resp = self.post_items([remote_post(self.bob)])
+        self.assertEqual(resp.status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("peer", "wrong"))
+        resp = self.post_items([remote_post(self.bob)])
+        self.assertEqual(resp.status_code, 401)
+
+        self.client.force_authenticate(self.alice.user)
+        resp = self.post_items([remote_post(self.bob)])
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(Post.objects.filter(author__node=self.node).exists())
+
+    def test_bad_batch(self):
+        url = reverse(self.url_name, args=[self.alice.id])
+
+        resp = self.client.post(url, {"items": "nope"}, format="json")
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.post(url, [{"type": "follow"}] * 501, format="json")
+        self.assertEqual(resp.status_code, 400)
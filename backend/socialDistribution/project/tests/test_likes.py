@@ -0,0 +1,152 @@
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from ..likes import set_comment_like, set_post_like
+from ..models import Comment, CommentLike, Post, PostLike
+from .factories import create_author, create_post
+
+
+class LikeToggleTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.post = create_post(cls.alice, source="http://example.com/posts/1")
+        cls.comment = Comment.objects.create(
+            author=cls.alice, post=cls.post, comment="Hi", contentType="text/plain"
+        )
+
+    def test_unique_constraints(self):
+        PostLike.objects.create(author=self.bob, post=self.post)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PostLike.objects.create(author=self.bob, post=self.post)
+
+        CommentLike.objects.create(author=self.bob, comment=self.comment)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CommentLike.objects.create(author=self.bob, comment=self.comment)
+
+    def test_toggle(self):
+        self.assertTrue(set_post_like(self.bob, self.post))
+        self.assertFalse(set_post_like(self.bob, self.post))
+        self.assertTrue(set_post_like(self.bob, self.post))
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(PostLike.objects.count(), 1)
+
+    def test_set_is_idempotent(self):
+        for _ in range(3):
+            self.assertTrue(set_post_like(self.bob, self.post, liked=True))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        for _ in range(3):
+            self.assertFalse(set_post_like(self.bob, self.post, liked=False))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def statements(self, *args):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                set_post_like(self.bob, self.post, *args)
+        return [
+            query["sql"].split()[0]
+            for query in queries
+            if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))
+        ]
+
+    def test_statements(self):
+        # A toggle tries the DELETE first, then INSERTs; the like count is
+        # updated and the post's stamps bumped on commit
+        self.assertEqual(self.statements(), ["DELETE", "INSERT", "UPDATE", "INSERT"])
+        self.assertEqual(self.statements(), ["DELETE", "UPDATE", "INSERT"])
+        self.assertEqual(self.statements(True), ["INSERT", "UPDATE", "INSERT"])
+        self.assertEqual(self.statements(True), ["INSERT"])
+        self.assertEqual(self.statements(False), ["DELETE", "UPDATE", "INSERT"])
+        self.assertEqual(self.statements(False), ["DELETE"])
+
+    def test_comment_like(self):
+        self.assertTrue(set_comment_like(self.bob, self.comment))
+        self.assertTrue(set_comment_like(self.bob, self.comment, liked=True))
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.like_count, 1)
+
+        self.assertFalse(set_comment_like(self.bob, self.comment))
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.like_count, 0)
+
+
+class LikeAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.post = create_post(cls.alice, source="http://example.com/posts/1")
+        cls.comment = Comment.objects.create(
+            author=cls.alice, post=cls.post, comment="Hi", contentType="text/plain"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.bob.user)
+
+    def test_put_and_delete_post_like(self):
+        url = reverse("project:post_like_api", args=[self.post.id])
+
+        for _ in range(2):
+            resp = self.client.put(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.data, {"type": "like", "liked": True})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        for _ in range(2):
+            resp = self.client.delete(url)
+            self.assertEqual(resp.data, {"type": "like", "liked": False})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+        self.assertFalse(PostLike.objects.exists())
+
+    def test_post_toggles(self):
+        url = reverse("project:post_like_api", args=[self.post.id])
+
+        self.assertTrue(self.client.post(url).data["liked"])
+        self.assertFalse(self.client.post(url).data["liked"])
+
+    def test_comment_like(self):
+        url = reverse("project:comment_like_api", args=[self.comment.id])
+
+        self.client.put(url)
+        self.client.put(url)
+
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.like_count, 1)
+        self.assertEqual(CommentLike.objects.count(), 1)
+
+    def test_repeated_like_adds_no_queries(self):
+        url = reverse("project:post_like_api", args=[self.post.id])
+        self.client.put(url)
+
+        # The like already exists, so its INSERT is turned away and nothing
+        # is updated
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(url)
+        self.assertFalse(
+            any(query["sql"].startswith("UPDATE") for query in queries),
+        )
+
+    def test_hidden_post(self):
+        post = create_post(self.alice, visibility=Post.VisibilityChoice.PRIVATE)
+        resp = self.client.put(reverse("project:post_like_api", args=[post.id]))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_requires_login(self):
+        self.client.force_authenticate(None)
+        resp = self.client.put(reverse("project:post_like_api", args=[self.post.id]))
+        self.assertIn(resp.status_code, (401, 403))
+        self.assertFalse(PostLike.objects.exists())
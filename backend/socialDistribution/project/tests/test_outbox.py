@@ -0,0 +1,267 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import metrics
+from ..models import Node, OutboxItem, Post
+from ..outbox import deliver_due, enqueue_post
+from ..serializers import InboxPostSerializer
+from .factories import create_author, create_post
+from .test_federation import StubHandler, StubNode
+
+
+def create_remote(name, node):
+    """
+    A remote author whose node names them by something other than a UUID
+    """
+    author = create_author(name, node=node)
+    author.url = f"{node.apiURL}authors/{name.lower()}"
+    author.save(update_fields=["url"])
+    return author
+
+
+class InboxHandler(StubHandler):
+    """
+    Accepts inbox POSTs, answering with the server's `status` once its
+    `failures` are used up, and skipping repeated idempotency keys
+    """
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.requests.append(self.path)
+            server.auth.append(self.headers["Authorization"])
+            if server.failures > 0:
+                server.failures -= 1
+                status = 503
+            else:
+                status = server.status
+                key = self.headers["Idempotency-Key"]
+                if status < 300 and key not in server.received:
+                    server.received[key] = json.loads(body)[0]
+        self.send_json({"type": "inbox", "items": server.results}, status=status)
+
+
+@override_settings(OUTBOX_BACKOFF_SECONDS=30, OUTBOX_MAX_ATTEMPTS=3)
+class OutboxTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.local = create_author("Local")
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def start_node(self, name, failures=0, status=201):
+        stub = StubNode(name, failures=failures, handler=InboxHandler)
+        stub.server.status = status
+        stub.server.received = {}
+        stub.server.auth = []
+        stub.server.results = [{"type": "post", "result": "accepted"}]
+        self.addCleanup(stub.stop)
+        return stub, Node.objects.create(nodeName=name, apiURL=stub.url)
+
+    def create_post(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_post(self.alice, **kwargs)
+
+    def test_enqueues_remote_followers_on_commit(self):
+        stub, node = self.start_node("beta")
+        remote = create_remote("Remote", node)
+        self.alice.followers.add(remote, self.local)
+
+        post = self.create_post()
+
+        item = OutboxItem.objects.get()
+        self.assertEqual(item.recipient, remote)
+        self.assertEqual(item.node, node)
+        self.assertEqual(item.idempotency_key, f"post:{post.pk}:{remote.pk}")
+        self.assertEqual(item.payload["type"], "post")
+        self.assertEqual(item.payload["title"], "Hello")
+
+    def test_enqueue_dedupes(self):
+        _, node = self.start_node("beta")
+        self.alice.followers.add(create_remote("Remote", node))
+
+        post = self.create_post()
+        enqueue_post(post.pk)
+
+        self.assertEqual(OutboxItem.objects.count(), 1)
+
+    def test_respects_visibility(self):
+        _, node = self.start_node("beta")
+        friend = create_remote("Friend", node)
+        follower = create_remote("Follower", node)
+        self.alice.followers.add(friend, follower)
+        self.alice.following.add(friend)
+
+        self.create_post(visibility=Post.VisibilityChoice.FRIENDS_ONLY)
+        self.create_post(visibility=Post.VisibilityChoice.PRIVATE)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(self.alice, unlisted=True)
+
+        self.assertQuerySetEqual(
+            OutboxItem.objects.values_list("recipient", flat=True), [friend.pk]
+        )
+
+    def test_delivers_batched_per_node(self):
+        beta_stub, beta = self.start_node("beta")
+        gamma_stub, gamma = self.start_node("gamma")
+        remotes = [create_remote(f"Beta{i}", beta) for i in range(3)]
+        remotes.append(create_remote("Gamma", gamma))
+        self.alice.followers.add(*remotes)
+
+        post = self.create_post()
+        outcome = deliver_due()
+
+        self.assertEqual(outcome, {"delivered": 4, "retried": 0, "failed": 0})
+        self.assertEqual(len(beta_stub.server.received), 3)
+        self.assertEqual(len(gamma_stub.server.received), 1)
+        # At the URL the peer knows the author by, not the shadow row's id
+        self.assertIn(
+            "/project/api/authors/beta0/inbox/batch", beta_stub.server.requests
+        )
+        self.assertLessEqual(beta_stub.server.connections, 3)
+        self.assertFalse(
+            OutboxItem.objects.exclude(status=OutboxItem.Status.DELIVERED).exists()
+        )
+        payload = gamma_stub.server.received[f"post:{post.pk}:{remotes[3].pk}"]
+        self.assertEqual(payload["title"], "Hello")
+        self.assertEqual(metrics.get("outbox_delivery_latency_seconds_count"), 4)
+
+    @override_settings(NODE_API_URL="http://alpha.example/api/")
+    def test_sends_inbox_item_with_credentials(self):
+        stub, node = self.start_node("beta")
+        node.outbound_username = "alpha"
+        node.outbound_password = "alphapassword1"
+        node.save()
+        remote = create_remote("Remote", node)
+        self.alice.followers.add(remote)
+
+        post = self.create_post()
+        deliver_due()
+
+        self.assertEqual(stub.server.auth, ["Basic YWxwaGE6YWxwaGFwYXNzd29yZDE="])
+        payload = stub.server.received[f"post:{post.pk}:{remote.pk}"]
+        self.assertEqual(
+            payload["author"]["url"],
+            f"http://alpha.example/api/authors/{self.alice.pk}",
+        )
+        # As the peer's inbox/batch endpoint validates it
+        serializer = InboxPostSerializer(data=payload)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_item_rejected_in_batch_fails_at_once(self):
+        stub, node = self.start_node("beta", status=200)
+        stub.server.results = [{"type": "post", "result": "rejected", "errors": {}}]
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        self.assertEqual(deliver_due()["failed"], 1)
+        self.assertIn("Rejected", OutboxItem.objects.get().last_error)
+
+    def test_retries_with_backoff(self):
+        stub, node = self.start_node("beta", failures=2)
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        started = timezone.now()
+        self.assertEqual(deliver_due()["retried"], 1)
+        item = OutboxItem.objects.get()
+        self.assertEqual(item.attempts, 1)
+        self.assertIn("503", item.last_error)
+        self.assertGreaterEqual(item.next_attempt_at, started + timedelta(seconds=30))
+
+        # Not due yet
+        self.assertEqual(deliver_due()["retried"], 0)
+
+        OutboxItem.objects.update(next_attempt_at=timezone.now())
+        deliver_due()
+        item.refresh_from_db()
+        self.assertGreaterEqual(item.next_attempt_at, started + timedelta(seconds=60))
+
+        OutboxItem.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due()["delivered"], 1)
+        item.refresh_from_db()
+        self.assertEqual(item.status, OutboxItem.Status.DELIVERED)
+        self.assertEqual(item.attempts, 3)
+        self.assertEqual(len(stub.server.received), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        _, node = self.start_node("beta", failures=10)
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        for _ in range(3):
+            OutboxItem.objects.update(next_attempt_at=timezone.now())
+            deliver_due()
+
+        item = OutboxItem.objects.get()
+        self.assertEqual(item.status, OutboxItem.Status.FAILED)
+        self.assertEqual(item.attempts, 3)
+
+    def test_rejected_item_fails_at_once(self):
+        _, node = self.start_node("beta", status=400)
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        self.assertEqual(deliver_due()["failed"], 1)
+        self.assertEqual(OutboxItem.objects.get().attempts, 1)
+
+    def test_unreachable_node_is_retried(self):
+        node = Node.objects.create(nodeName="dead", apiURL="http://127.0.0.1:9/")
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        self.assertEqual(deliver_due()["retried"], 1)
+        self.assertNotEqual(OutboxItem.objects.get().last_error, "")
+
+    def test_command(self):
+        stub, node = self.start_node("beta")
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        out = StringIO()
+        call_command("deliver_outbox", "--once", stdout=out)
+        self.assertIn("Delivered 1", out.getvalue())
+        self.assertEqual(len(stub.server.received), 1)
+
+    def test_worker_metrics_reach_web_process(self):
+        _, node = self.start_node("beta", failures=1)
+        self.alice.followers.add(create_remote("Remote", node))
+        self.create_post()
+
+        call_command("deliver_outbox", "--once", stdout=StringIO())
+        # The web process keeps counters of its own
+        metrics.reset()
+        metrics.incr("outbox_deliveries_total", node="beta", status="pending")
+
+        with self.settings(METRICS_TOKEN="secret"):
+            resp = self.client.get(
+                reverse("project:metrics"), HTTP_AUTHORIZATION="Bearer secret"
+            )
+        body = resp.content.decode()
+        self.assertIn("# TYPE outbox_queue_depth gauge\noutbox_queue_depth 1\n", body)
+        self.assertIn("outbox_oldest_pending_seconds", body)
+        self.assertIn('outbox_deliveries_total{node="beta",status="pending"} 2\n', body)
+        self.assertIn('federation_requests_total{node="beta",status="503"} 1\n', body)
+
+    def test_flush_adds_to_stored_counters(self):
+        for _ in range(2):
+            metrics.incr("outbox_deliveries_total", 3, node="beta", status="failed")
+            metrics.set_gauge("outbox_queue_depth", 5)
+            metrics.flush()
+
+        self.assertEqual(metrics.get("outbox_deliveries_total", node="beta"), 0)
+        self.assertIn(
+            'outbox_deliveries_total{node="beta",status="failed"} 6\n', metrics.render()
+        )
+        self.assertIn("outbox_queue_depth 5\n", metrics.render())
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Author, InboxItem, Post
+from ..pagination import InvalidCursor, KeysetPaginator, encode_cursor
+
+
+def create_posts(author, count, published=None):
+    now = timezone.now()
+    posts = [
+        Post(
+            author=author,
+            title=f"Post {i}",
+            content="content",
+            contentType="text/plain",
+            unlisted=False,
+            published=published or now - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+    return Post.objects.bulk_create(posts)
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="Alice", password="testpassword1")
+        cls.alice = Author.objects.create(user=user, displayName="Alice")
+
+    def collect(self, paginator, queryset, size):
+        items, cursor = [], None
+        while True:
+            page = paginator.paginate(queryset, cursor, size)
+            items.extend(page.items)
+            if not page.has_next:
+                return items
+            cursor = page.next_cursor
+
+    def test_pages_cover_all_rows_in_order(self):
+        create_posts(self.alice, 7)
+        queryset = Post.objects.all()
+
+        items = self.collect(KeysetPaginator(), queryset, 3)
+
+        expected = list(queryset.order_by("-published", "-id"))
+        self.assertEqual(items, expected)
+
+    def test_ties_broken_by_id(self):
+        create_posts(self.alice, 5, published=timezone.now())
+        queryset = Post.objects.all()
+
+        items = self.collect(KeysetPaginator(), queryset, 2)
+
+        self.assertEqual(len(set(items)), 5)
+        self.assertEqual(items, list(queryset.order_by("-published", "-id")))
+
+    def test_ascending_keys(self):
+        create_posts(self.alice, 5)
+        paginator = KeysetPaginator(keys=("published", "id"))
+        queryset = Post.objects.all()
+
+        items = self.collect(paginator, queryset, 2)
+
+        self.assertEqual(items, list(queryset.order_by("published", "id")))
+
+    def test_deep_page_is_single_query(self):
+        create_posts(self.alice, 10)
+        paginator = KeysetPaginator()
+        page = paginator.paginate(Post.objects.all(), size=8)
+
+        with self.assertNumQueries(1):
+            page = paginator.paginate(Post.objects.all(), page.next_cursor, 8)
+        self.assertEqual(len(page.items), 2)
+        self.assertFalse(page.has_next)
+
+    def test_page_size_capped(self):
+        paginator = KeysetPaginator(page_size=5, max_page_size=10)
+
+        self.assertEqual(paginator.get_page_size(None), 5)
+        self.assertEqual(paginator.get_page_size("abc"), 5)
+        self.assertEqual(paginator.get_page_size("1000"), 10)
+        self.assertEqual(paginator.get_page_size("0"), 1)
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator()
+        bad_values = encode_cursor(["yesterday", "not-a-uuid"])
+        for cursor in ["garbage", "WyJhIl0", bad_values]:
+            with self.assertRaises(InvalidCursor):
+                paginator.paginate(Post.objects.all(), cursor)
+
+
+class StreamPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            Author.objects.create(user=user, displayName=name)
+
+    def setUp(self):
+        self.alice = Author.objects.get(displayName="Alice")
+        self.bob = Author.objects.get(displayName="Bob")
+        self.posts = create_posts(self.alice, 5)
+        InboxItem.objects.bulk_create(
+            InboxItem(author=self.bob, post=post, received_at=post.published)
+            for post in self.posts
+        )
+
+    def test_inbox_api_pages(self):
+        url = reverse("project:inbox_api", args=[self.bob.id])
+
+        resp = self.client.get(url, {"size": 3})
+        self.assertEqual(len(resp.data["items"]), 3)
+        self.assertIsNotNone(resp.data["next"])
+
+        resp = self.client.get(url, {"size": 3, "cursor": resp.data["next"]})
+        self.assertEqual(len(resp.data["items"]), 2)
+        self.assertIsNone(resp.data["next"])
+        ids = [item["id"] for item in resp.data["items"]]
+        self.assertEqual(ids, [str(post.id) for post in self.posts[3:]])
+
+    def test_inbox_api_invalid_cursor(self):
+        url = reverse("project:inbox_api", args=[self.bob.id])
+
+        resp = self.client.get(url, {"cursor": "garbage"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_home_stream_pages(self):
+        self.client.force_login(self.bob.user)
+        url = reverse("project:home")
+
+        resp = self.client.get(url, {"size": 2})
+        self.assertEqual(resp.context["latest_posts"], self.posts[:2])
+        self.assertIsNotNone(resp.context["next_cursor"])
+
+        resp = self.client.get(url, {"cursor": "garbage"})
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,112 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from ..models import Comment, FollowRequest, PostLike
+from .factories import create_author, create_post
+from .query_budget import QueryBudgetMixin
+
+
+def create_news_post(author, title):
+    return create_post(author, title=title, content="Hello world", categories="news")
+
+
+class QueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """
+    Alice gains a friend, a post of her own, and a comment and like on her
+    first post from that friend, per unit of size. Each friend posts in the
+    same category, follows an author suggested to Alice through them, and
+    that author asks to follow Alice.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.post = create_news_post(cls.alice, "First")
+
+    def setUp(self):
+        self.size = 0
+        self.client.force_login(self.alice.user)
+        self.client.force_authenticate(self.alice.user)
+
+    def grow(self, size):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(self.size, size):
+                friend = create_author(f"Friend{i}")
+                stranger = create_author(f"Stranger{i}")
+                self.alice.followers.add(friend)
+                friend.followers.add(self.alice)
+                stranger.followers.add(friend)
+                FollowRequest.objects.create(
+                    follower=stranger, following=self.alice, summary="Follow me"
+                )
+                create_news_post(friend, f"Friend post {i}")
+                create_news_post(self.alice, f"Alice post {i}")
+                Comment.objects.create(
+                    author=friend,
+                    post=self.post,
+                    comment="Nice",
+                    contentType="text/plain",
+                )
+                PostLike.objects.create(
+                    author=friend, post=self.post, summary="Friend likes this"
+                )
+        self.size = size
+
+    def get(self, url_name, *args, **params):
+        self.assertQueryBudget(
+            url_name, lambda: self.client.get(reverse(url_name, args=args), params)
+        )
+
+    def test_home(self):
+        self.get("project:home")
+
+    def test_stream(self):
+        self.get("project:stream", self.alice.displayName)
+
+    def test_post(self):
+        self.get("project:post", self.post.pk)
+
+    def test_author(self):
+        self.get("project:author", self.alice.pk)
+
+    def test_profile(self):
+        self.get("project:profile", self.alice.pk)
+
+    def test_search(self):
+        self.get("project:search", username="Friend")
+
+    def test_authors_api(self):
+        self.get("project:get_authors")
+
+    def test_author_api(self):
+        self.get("project:author_api", self.alice.pk)
+
+    def test_author_posts_api(self):
+        self.get("project:new_post_api", self.alice.pk)
+
+    def test_comments_api(self):
+        self.get("project:post_comments_api", self.alice.pk, self.post.pk)
+
+    def test_likes_api(self):
+        self.get("project:post_likes_api", self.alice.pk, self.post.pk)
+
+    def test_inbox_api(self):
+        self.get("project:inbox_api", self.alice.pk)
+
+    def test_search_authors_api(self):
+        self.get("project:search_authors_api", q="Friend")
+
+    def test_search_posts_api(self):
+        self.get("project:search_posts_api", q="hello")
+
+    def test_category_posts_api(self):
+        self.get("project:category_posts_api", "news")
+
+    def test_suggestions_api(self):
+        self.get("project:suggestions_api", self.alice.pk)
+
+    def test_followers_api(self):
+        self.get("project:get_followers", self.alice.pk)
+
+    def test_follow_requests_api(self):
+        self.get("project:api_follow_request", self.alice.pk)
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from ..likes import set_post_like
+from ..models import Comment, Post, PostLike
+from .factories import create_author, create_post
+
+
+class ReactionsAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.post = create_post(cls.alice)
+        start = timezone.now() - timedelta(days=1)
+        cls.commenters = [create_author(f"Commenter{i}") for i in range(5)]
+        for i, author in enumerate(cls.commenters):
+            Comment.objects.create(
+                author=author,
+                post=cls.post,
+                comment=f"Comment {i}",
+                contentType="text/plain",
+                published=start + timedelta(minutes=i),
+            )
+            PostLike.objects.create(
+                author=author,
+                post=cls.post,
+                summary=f"{author.displayName} likes this",
+                published=start + timedelta(minutes=i),
+            )
+        # The totals come from the post's counters
+        Post.objects.filter(pk=cls.post.pk).update(comment_count=5, like_count=5)
+
+    def setUp(self):
+        cache.clear()
+
+    def url(self, name, post=None):
+        post = post or self.post
+        return reverse(f"project:{name}", args=[post.author_id, post.id])
+
+    def read_all(self, name):
+        pages = []
+        cursor = None
+        while True:
+            params = {"size": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = self.client.get(self.url(name), params)
+            self.assertEqual(resp.status_code, 200)
+            pages.append(resp.data)
+            cursor = resp.data["next"]
+            if cursor is None:
+                return pages
+
+    def test_comments_paged_oldest_first(self):
+        pages = self.read_all("post_comments_api")
+
+        self.assertEqual([len(page["items"]) for page in pages], [2, 2, 1])
+        comments = [item for page in pages for item in page["items"]]
+        self.assertEqual(
+            [comment["comment"] for comment in comments],
+            [f"Comment {i}" for i in range(5)],
+        )
+        self.assertEqual(comments[0]["type"], "comment")
+        self.assertEqual(comments[0]["author"]["displayName"], "Commenter0")
+        self.assertEqual(pages[0]["type"], "comments")
+        self.assertEqual(pages[0]["count"], 5)
+
+    def test_likes_paged_oldest_first(self):
+        pages = self.read_all("post_likes_api")
+
+        likes = [item for page in pages for item in page["items"]]
+        self.assertEqual(
+            [like["author"]["displayName"] for like in likes],
+            [f"Commenter{i}" for i in range(5)],
+        )
+        self.assertEqual(likes[0]["type"], "Like")
+        self.assertEqual(pages[0]["type"], "likes")
+        self.assertEqual(pages[0]["count"], 5)
+
+    def test_authors_loaded_in_the_same_query(self):
+        for name in ["post_comments_api", "post_likes_api"]:
+            # The stamps, the post, then the page with its authors
+            with self.assertNumQueries(3):
+                self.client.get(self.url(name), {"size": 5})
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(self.url("post_comments_api"), {"cursor": "nope"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_hidden_and_missing_posts(self):
+        private = create_post(self.alice, visibility=Post.VisibilityChoice.PRIVATE)
+        resp = self.client.get(self.url("post_likes_api", private))
+        self.assertEqual(resp.status_code, 404)
+
+        url = reverse(
+            "project:post_likes_api", args=[self.commenters[0].id, self.post.id]
+        )
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_not_modified_until_a_new_like(self):
+        resp = self.client.get(self.url("post_likes_api"))
+        etag = resp["ETag"]
+
+        resp = self.client.get(self.url("post_likes_api"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            set_post_like(self.alice, self.post)
+        resp = self.client.get(self.url("post_likes_api"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], 6)
@@ -0,0 +1,280 @@
+import uuid
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from .. import metrics
+from ..models import Author, FollowRequest, Node
+from ..remote_authors import (
+    cache_key,
+    get_remote_author,
+    node_for_url,
+    refresh_due,
+    resolve_author,
+)
+from .test_federation import RawHandler, StubHandler, StubNode
+from .test_inbox_batch import basic_auth
+
+
+class ProfileHandler(StubHandler):
+    """
+    Serves the profile of any author id, named after the server's `name`
+    """
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        author_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+        self.send_json(
+            {
+                "type": "author",
+                "id": author_id,
+                "url": f"{self.server.base_url}authors/{author_id}",
+                "displayName": self.server.name,
+                "github": "",
+                "profileImage": "https://example.com/remote.png",
+            }
+        )
+
+
+class RemoteAuthorTestMixin:
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.stub = StubNode("Remote", handler=ProfileHandler)
+        self.stub.server.base_url = self.stub.url
+        self.addCleanup(self.stub.stop)
+        self.node = Node.objects.create(nodeName="beta", apiURL=self.stub.url)
+        self.remote_id = uuid.uuid4()
+        self.remote_url = f"{self.stub.url}authors/{self.remote_id}"
+
+
+class RemoteAuthorCacheTest(RemoteAuthorTestMixin, TestCase):
+    def test_fetches_on_miss_then_serves_from_cache(self):
+        author = get_remote_author(self.remote_url)
+
+        self.assertEqual(author.pk, self.remote_id)
+        self.assertEqual(author.displayName, "Remote")
+        self.assertEqual(author.node, self.node)
+        self.assertIsNone(author.user)
+        self.assertEqual(len(self.stub.server.requests), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_remote_author(self.remote_url), author)
+        self.assertEqual(len(self.stub.server.requests), 1)
+        self.assertEqual(
+            metrics.get("remote_author_cache_hits_total", state="fresh"), 1
+        )
+
+    def test_embedded_profile_is_stored_without_fetching(self):
+        author = get_remote_author(
+            self.remote_url,
+            {"url": self.remote_url, "displayName": "Embedded"},
+            self.node,
+        )
+
+        self.assertEqual(author.displayName, "Embedded")
+        self.assertEqual(author.pk, self.remote_id)
+        self.assertEqual(self.stub.server.requests, [])
+
+    def test_embedded_profile_from_another_sender_is_ignored(self):
+        get_remote_author(self.remote_url)
+        cache.clear()
+        other = Node.objects.create(nodeName="gamma", apiURL="http://gamma.example/")
+
+        for sender in (None, other):
+            author = get_remote_author(
+                self.remote_url, {"displayName": "Impostor"}, sender
+            )
+            self.assertEqual(author.displayName, "Remote")
+        self.assertEqual(Author.objects.get(url=self.remote_url).displayName, "Remote")
+
+    def test_shadow_row_is_updated_not_duplicated(self):
+        get_remote_author(self.remote_url, {"displayName": "Old"}, self.node)
+        cache.clear()
+        get_remote_author(self.remote_url)
+
+        author = Author.objects.get(url=self.remote_url)
+        self.assertEqual(author.displayName, "Remote")
+
+    @override_settings(REMOTE_AUTHOR_CACHE_TIMEOUT=0)
+    def test_stale_entry_is_served_while_refreshing(self):
+        get_remote_author(self.remote_url, {"displayName": "Old"}, self.node)
+
+        author = get_remote_author(self.remote_url)
+        # The second read finds the refresh already requested
+        with self.assertNumQueries(0):
+            get_remote_author(self.remote_url)
+
+        self.assertEqual(author.displayName, "Old")
+        self.assertEqual(self.stub.server.requests, [])
+        self.assertIsNotNone(
+            Author.objects.get(url=self.remote_url).refresh_requested_at
+        )
+        self.assertEqual(
+            metrics.get("remote_author_cache_hits_total", state="stale"), 2
+        )
+
+        out = StringIO()
+        call_command("refresh_remote_authors", "--once", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Refreshed 1, failed 0")
+        author = Author.objects.get(url=self.remote_url)
+        self.assertEqual(author.displayName, "Remote")
+        self.assertIsNone(author.refresh_requested_at)
+
+    def test_stale_entry_picks_up_refreshed_row(self):
+        get_remote_author(self.remote_url, {"displayName": "Old"}, self.node)
+        entry = cache.get(cache_key(self.remote_url))
+        cache.set(cache_key(self.remote_url), dict(entry, fetched=0))
+        # Refreshed by the worker, in a process not sharing this cache
+        Author.objects.filter(url=self.remote_url).update(
+            displayName="Remote", refreshed_at=timezone.now()
+        )
+
+        author = get_remote_author(self.remote_url)
+
+        self.assertEqual(author.displayName, "Remote")
+        self.assertIsNone(Author.objects.get(url=self.remote_url).refresh_requested_at)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_remote_author(self.remote_url), author)
+
+    @override_settings(FEDERATION_RETRIES=0)
+    def test_failed_refresh_is_dropped(self):
+        author = get_remote_author(self.remote_url)
+        self.stub.stop()
+        Author.objects.filter(pk=author.pk).update(refresh_requested_at=timezone.now())
+
+        with self.assertLogs("project.remote_authors", "WARNING"):
+            self.assertEqual(refresh_due(), {"refreshed": 0, "failed": 1})
+        author.refresh_from_db()
+        self.assertIsNone(author.refresh_requested_at)
+        self.assertIsNone(author.refreshed_at)
+
+    def test_unknown_host_is_not_remote(self):
+        self.assertIsNone(get_remote_author("http://elsewhere.example/authors/1"))
+
+    def test_resolves_local_author(self):
+        user = User.objects.create(username="Alice", password="testpassword1")
+        alice = Author.objects.create(user=user, displayName="Alice")
+
+        self.assertEqual(resolve_author({"displayName": "Alice"}), alice)
+
+    def test_deleting_shadow_row_drops_entry(self):
+        get_remote_author(self.remote_url).delete()
+
+        author = get_remote_author(self.remote_url)
+        self.assertTrue(Author.objects.filter(pk=author.pk).exists())
+
+
+class RemoteFollowRequestTest(RemoteAuthorTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.node.username = "beta"
+        self.node.set_password("betapassword1")
+        self.node.save()
+        user = User.objects.create(username="Alice", password="testpassword1")
+        self.alice = Author.objects.create(user=user, displayName="Alice")
+
+    def follow(self, display_name="Remote"):
+        alice = self.alice
+        data = {
+            "type": "Follow",
+            "summary": "Remote wants to follow Alice",
+            "actor": {
+                "id": str(self.remote_id),
+                "url": self.remote_url,
+                "host": "127.0.0.1",
+                "displayName": display_name,
+                "github": "",
+                "profileImage": "https://example.com/remote.png",
+            },
+            "object": {
+                "id": str(alice.id),
+                "url": alice.url,
+                "host": alice.host,
+                "displayName": alice.displayName,
+                "github": alice.github,
+                "profileImage": alice.profileImage,
+            },
+        }
+        url = reverse("project:api_follow_request", args=[alice.id])
+        return self.client.post(url, data, format="json")
+
+    def test_follow_request_from_remote_author(self):
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("beta", "betapassword1"))
+
+        resp = self.follow()
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(
+            FollowRequest.objects.filter(
+                follower_id=self.remote_id, following=self.alice
+            ).exists()
+        )
+        self.assertEqual(Author.objects.filter(node=self.node).count(), 1)
+        self.assertEqual(self.stub.server.requests, [])
+
+    def test_unauthenticated_profile_is_fetched_from_its_node(self):
+        resp = self.follow(display_name="Impostor")
+
+        self.assertEqual(resp.status_code, 201)
+        author = Author.objects.get(node=self.node)
+        self.assertEqual(author.displayName, "Remote")
+        self.assertEqual(len(self.stub.server.requests), 1)
+
+    def test_bad_profile_is_rejected(self):
+        self.stub.server.RequestHandlerClass = RawHandler
+        for raw in [b"<html>", b'["not", "an", "author"]']:
+            with self.subTest(raw=raw):
+                self.stub.server.raw = raw
+
+                resp = self.follow()
+
+                self.assertEqual(resp.status_code, 400)
+        self.assertFalse(Author.objects.filter(node=self.node).exists())
+
+    def test_bad_node_credentials_are_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("beta", "wrong"))
+
+        resp = self.follow()
+
+        self.assertEqual(resp.status_code, 401)
+        self.assertFalse(Author.objects.filter(node=self.node).exists())
+
+
+class ShadowRowListingTest(RemoteAuthorTestMixin, APITestCase):
+    def test_shadow_rows_are_not_listed_as_local_authors(self):
+        user = User.objects.create(username="Alice", password="testpassword1")
+        alice = Author.objects.create(user=user, displayName="Alice")
+        user = User.objects.create(username="Bob", password="testpassword1")
+        bob = Author.objects.create(user=user, displayName="Bob")
+        remote = get_remote_author(self.remote_url)
+        alice.following.add(bob)
+        bob.following.add(remote)
+        self.client.force_authenticate(user)
+
+        resp = self.client.get(reverse("project:get_authors"))
+        self.assertEqual(
+            [item["displayName"] for item in resp.data["items"]], ["Alice", "Bob"]
+        )
+        resp = self.client.get(reverse("project:search_authors_api"), {"q": "Re"})
+        self.assertEqual(resp.data["items"], [])
+        resp = self.client.get(reverse("project:suggestions_api", args=[alice.id]))
+        self.assertEqual(resp.data["items"], [])
+
+
+class NodeLookupTest(RemoteAuthorTestMixin, TestCase):
+    def test_nodes_are_cached_until_changed(self):
+        self.assertEqual(node_for_url(self.remote_url), self.node)
+        with self.assertNumQueries(0):
+            self.assertEqual(node_for_url(self.remote_url), self.node)
+            self.assertIsNone(node_for_url("http://elsewhere.example/authors/1"))
+
+        self.node.delete()
+        self.assertIsNone(node_for_url(self.remote_url))
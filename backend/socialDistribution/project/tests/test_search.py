@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Author
+from ..pagination import OffsetPaginator
+from ..search import search_authors
+
+
+def create_authors(names):
+    for name in names:
+        user = User.objects.create(username=name, password="testpassword1")
+        Author.objects.create(user=user, displayName=name)
+
+
+class SearchAuthorsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_authors(["alice", "Alicia", "Bob", "Malia", "ali"])
+
+    def names(self, query):
+        return [author.displayName for author in search_authors(query)]
+
+    def test_prefix_case_insensitive(self):
+        self.assertEqual(self.names("ALI"), ["ali", "alice", "Alicia"])
+
+    def test_no_match(self):
+        self.assertEqual(self.names("zed"), [])
+
+    def test_empty_query_lists_everyone_by_name(self):
+        self.assertEqual(self.names("  "), ["ali", "alice", "Alicia", "Bob", "Malia"])
+
+    def test_search_page(self):
+        self.client.force_login(User.objects.get(username="alice"))
+        resp = self.client.get(reverse("project:search"), {"username": "bo"})
+        self.assertEqual(
+            list(resp.context["userlist"]), [Author.objects.get(displayName="Bob")]
+        )
+
+
+class OffsetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_authors([f"user{i}" for i in range(7)])
+
+    def test_pages(self):
+        paginator = OffsetPaginator(page_size=3)
+        queryset = search_authors("user")
+
+        first = paginator.paginate(queryset)
+        second = paginator.paginate(queryset, first.next_cursor)
+        third = paginator.paginate(queryset, second.next_cursor)
+
+        self.assertEqual(first.items + second.items + third.items, list(queryset))
+        self.assertFalse(third.has_next)
+
+    def test_stops_at_max_offset(self):
+        paginator = OffsetPaginator(page_size=3, max_offset=3)
+        queryset = search_authors("user")
+
+        second = paginator.paginate(queryset, paginator.paginate(queryset).next_cursor)
+        self.assertEqual(len(second.items), 3)
+        self.assertFalse(second.has_next)
+
+
+class SearchAuthorsAPITest(APITestCase):
+    url_name = "project:search_authors_api"
+
+    @classmethod
+    def setUpTestData(cls):
+        create_authors(["alice", "Alicia", "Bob"])
+
+    def test_search(self):
+        resp = self.client.get(reverse(self.url_name), {"q": "ali", "size": 1})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["type"], "authors")
+        self.assertEqual(resp.data["items"][0]["displayName"], "alice")
+
+        resp = self.client.get(
+            reverse(self.url_name), {"q": "ali", "cursor": resp.data["next"]}
+        )
+        self.assertEqual(resp.data["items"][0]["displayName"], "Alicia")
+        self.assertIsNone(resp.data["next"])
+
+    def test_invalid_cursor(self):
+        resp = self.client.get(reverse(self.url_name), {"q": "ali", "cursor": "bad"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
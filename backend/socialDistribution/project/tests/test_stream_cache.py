@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import FollowRequest, Stamp
+from ..versions import author_posts_stamp, post_stamp
+from .factories import create_author, create_post
+
+
+class StreamFragmentCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.alice.followers.add(cls.bob)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.bob.user)
+
+    def create_post(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_post(self.alice, title=title)
+
+    def render_home(self):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(reverse("project:home"))
+        return resp.content.decode(), [query["sql"] for query in queries]
+
+    def test_repeat_visit_skips_stream_queries(self):
+        self.create_post("First")
+        first, first_queries = self.render_home()
+        second, second_queries = self.render_home()
+
+        self.assertEqual(first, second)
+        self.assertLess(len(second_queries), len(first_queries))
+        # Only the page's rows and stamps are read, not its posts
+        self.assertFalse([sql for sql in second_queries if '"content"' in sql])
+        self.assertFalse(
+            [sql for sql in second_queries if "project_followrequest" in sql]
+        )
+
+    def test_new_post_shows_up(self):
+        self.create_post("First")
+        self.render_home()
+        self.create_post("Second")
+
+        self.assertIn("Second", self.render_home()[0])
+
+    def test_edit_and_delete_show_up(self):
+        post = self.create_post("First")
+        self.render_home()
+
+        post.title = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        self.assertIn("Renamed", self.render_home()[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertNotIn("Renamed", self.render_home()[0])
+
+    def test_like_shows_up(self):
+        post = self.create_post("First")
+        self.render_home()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("project:like_post", args=[post.id]))
+        self.assertIn("1 &#x1F44D;", self.render_home()[0])
+
+    def test_like_bumps_no_reader_stamps(self):
+        post = self.create_post("First")
+        Stamp.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("project:like_post", args=[post.id]))
+        self.assertEqual(
+            set(Stamp.objects.values_list("name", flat=True)),
+            {post_stamp(post.pk), author_posts_stamp(self.alice.pk)},
+        )
+
+    def test_follow_requests_show_up(self):
+        carl = create_author("Carl")
+        self.render_home()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            request = FollowRequest.objects.create(
+                follower=carl, following=self.bob, summary=""
+            )
+        self.assertIn("Carl wants to follow you", self.render_home()[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("project:decline_follow", args=[request.pk]))
+        self.assertNotIn("Carl wants to follow you", self.render_home()[0])
+
+    def test_new_csrf_secret_renders_new_forms(self):
+        carl = create_author("Carl")
+        FollowRequest.objects.create(follower=carl, following=self.bob, summary="")
+        self.render_home()
+
+        # Logging in again rotates the CSRF secret
+        self.client.force_login(self.bob.user)
+        self.client.cookies.pop("csrftoken", None)
+        _, queries = self.render_home()
+        self.assertTrue([sql for sql in queries if "project_followrequest" in sql])
+
+    def test_follow_requests_hidden_from_other_visitors(self):
+        carl = create_author("Carl")
+        FollowRequest.objects.create(follower=carl, following=self.bob, summary="")
+        url = reverse("project:stream", args=[self.bob.displayName])
+        self.assertIn("Carl wants to follow you", self.client.get(url).content.decode())
+
+        self.client.force_login(carl.user)
+        body = self.client.get(url).content.decode()
+        self.assertNotIn("Carl wants to follow you", body)
+        self.assertNotIn("Decline", body)
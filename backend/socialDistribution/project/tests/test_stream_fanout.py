@@ -0,0 +1,202 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import signals
+from ..models import Author, Post
+from ..stream import get_stream_page
+
+
+def create_post(author, **kwargs):
+    return Post.objects.create(
+        author=author,
+        title="Hello",
+        content="World",
+        contentType="text/plain",
+        unlisted=False,
+        **kwargs,
+    )
+
+
+class StreamFanOutTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob", "Carl", "Dana"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            Author.objects.create(user=user, displayName=name)
+
+    def setUp(self):
+        self.alice = Author.objects.get(displayName="Alice")
+        self.bob = Author.objects.get(displayName="Bob")
+        self.carl = Author.objects.get(displayName="Carl")
+        self.dana = Author.objects.get(displayName="Dana")
+        self.alice.followers.add(self.bob, self.carl)
+
+    def test_followers_receive_post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = create_post(self.alice)
+
+        self.assertIn(post, self.bob.streamPosts.all())
+        self.assertIn(post, self.carl.streamPosts.all())
+        self.assertFalse(self.dana.streamPosts.exists())
+        self.assertFalse(self.alice.streamPosts.exists())
+
+    def test_deferred_until_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            create_post(self.alice)
+
+        self.assertFalse(self.bob.streamPosts.exists())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(self.bob.streamPosts.exists())
+
+    def test_no_followers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(self.dana)
+
+        self.assertFalse(Author.streamPosts.through.objects.exists())
+
+    def test_chunked_inserts(self):
+        self.alice.followers.add(self.dana)
+        post = create_post(self.alice)
+        Author.streamPosts.through.objects.all().delete()
+
+        batch_size = signals.FANOUT_BATCH_SIZE
+        signals.FANOUT_BATCH_SIZE = 2
+        try:
+            # 1 read of the followers, 2 inserts, plus the savepoint
+            with self.assertNumQueries(5):
+                rows = signals.fan_out_post(post.id, self.alice.id)
+        finally:
+            signals.FANOUT_BATCH_SIZE = batch_size
+
+        self.assertEqual(rows, 3)
+        self.assertEqual(post.inboxes.count(), 3)
+
+
+class FollowerCountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob", "Carl"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            Author.objects.create(user=user, displayName=name)
+
+    def setUp(self):
+        self.alice = Author.objects.get(displayName="Alice")
+        self.bob = Author.objects.get(displayName="Bob")
+        self.carl = Author.objects.get(displayName="Carl")
+
+    def follower_count(self, author):
+        author.refresh_from_db(fields=["follower_count"])
+        return author.follower_count
+
+    def test_follow_and_unfollow(self):
+        self.bob.following.add(self.alice)
+        self.carl.following.add(self.alice)
+        self.assertEqual(self.follower_count(self.alice), 2)
+
+        self.bob.following.remove(self.alice)
+        self.assertEqual(self.follower_count(self.alice), 1)
+
+    def test_reverse_side(self):
+        self.alice.followers.add(self.bob, self.carl)
+        self.assertEqual(self.follower_count(self.alice), 2)
+
+        self.alice.followers.remove(self.carl)
+        self.assertEqual(self.follower_count(self.alice), 1)
+
+    def test_clear(self):
+        self.alice.followers.add(self.bob, self.carl)
+        self.bob.following.add(self.carl)
+
+        self.bob.following.clear()
+        self.assertEqual(self.follower_count(self.alice), 1)
+        self.assertEqual(self.follower_count(self.carl), 0)
+
+        self.alice.followers.clear()
+        self.assertEqual(self.follower_count(self.alice), 0)
+
+
+@override_settings(STREAM_FANOUT_MAX_FOLLOWERS=1)
+class HybridStreamTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob", "Carl", "Dana"]:
+            user = User.objects.create(username=name, password="testpassword1")
+            Author.objects.create(user=user, displayName=name)
+
+    def setUp(self):
+        self.alice = Author.objects.get(displayName="Alice")
+        self.bob = Author.objects.get(displayName="Bob")
+        self.carl = Author.objects.get(displayName="Carl")
+        self.dana = Author.objects.get(displayName="Dana")
+        # Alice is over the threshold, Dana is not
+        self.alice.followers.add(self.bob, self.carl)
+        self.dana.followers.add(self.bob)
+        self.alice.refresh_from_db()
+        self.dana.refresh_from_db()
+
+    def test_popular_author_not_fanned_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(self.alice)
+
+        self.assertFalse(self.bob.streamPosts.exists())
+        self.assertFalse(self.carl.streamPosts.exists())
+
+    def test_stream_merges_pushed_and_pulled_posts(self):
+        posts = []
+        for author in [self.alice, self.dana, self.alice]:
+            with self.captureOnCommitCallbacks(execute=True):
+                posts.append(create_post(author))
+
+        self.assertEqual(list(self.bob.streamPosts.all()), [posts[1]])
+        # One query picks the page, one loads its posts
+        with self.assertNumQueries(2):
+            stream = get_stream_page(self.bob).items
+        self.assertEqual(stream, posts[::-1])
+
+    def test_stream_pages_across_pushed_and_pulled_posts(self):
+        posts = []
+        for author in [self.alice, self.dana] * 3:
+            with self.captureOnCommitCallbacks(execute=True):
+                posts.append(create_post(author))
+
+        first = get_stream_page(self.bob, size=4)
+        second = get_stream_page(self.bob, first.next_cursor, size=4)
+
+        self.assertEqual(first.items + second.items, posts[::-1])
+        self.assertFalse(second.has_next)
+
+    def test_unfollowed_popular_author_not_pulled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(self.alice)
+
+        self.assertEqual(get_stream_page(self.dana).items, [])
+
+    def test_no_duplicates_after_crossing_threshold(self):
+        # Pushed while Alice was under the threshold, then pulled as well
+        post = create_post(self.alice)
+        self.bob.streamPosts.add(post)
+
+        self.assertEqual(get_stream_page(self.bob).items, [post])
+
+    def test_crossing_below_threshold_backfills_inboxes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = create_post(self.alice)
+        self.assertFalse(self.bob.streamPosts.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.followers.remove(self.carl)
+
+        # No longer pulled, so it has to be in Bob's inbox
+        self.assertEqual(list(self.bob.streamPosts.all()), [post])
+        self.assertEqual(get_stream_page(self.bob).items, [post])
+
+    @override_settings(STREAM_PULL_MAX_AGE=3600)
+    def test_pull_reads_recent_posts_only(self):
+        recent = create_post(self.alice)
+        create_post(self.alice, published=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(get_stream_page(self.bob).items, [recent])
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from ..models import Author, Post
+
+
+@mock.patch("project.streaming.STREAM_CHUNK_SIZE", 2)
+class StreamingListTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["Alice", "Bob", "Carl", "Dana", "Émile "]:
+            user = User.objects.create(username=name, password="testpassword1")
+            Author.objects.create(user=user, displayName=name)
+
+    def setUp(self):
+        self.alice = Author.objects.get(displayName="Alice")
+        for author in Author.objects.exclude(pk=self.alice.pk):
+            self.alice.followers.add(author)
+        for i in range(5):
+            Post.objects.create(
+                author=self.alice,
+                title=f"Post {i}",
+                content="Ünïcode content",
+                contentType="text/plain",
+                unlisted=False,
+            )
+
+    def assertStreamMatches(self, url):
+        rendered = self.client.get(url)
+        streamed = self.client.get(url, {"stream": "true"})
+
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed["Content-Type"], "application/json")
+        self.assertEqual(b"".join(streamed.streaming_content), rendered.content)
+
+    def test_authors(self):
+        self.assertStreamMatches(reverse("project:get_authors"))
+
+    def test_followers(self):
+        self.assertStreamMatches(reverse("project:get_followers", args=[self.alice.id]))
+
+    def test_posts(self):
+        self.assertStreamMatches(reverse("project:new_post_api", args=[self.alice.id]))
+
+    def test_empty_list(self):
+        carl = Author.objects.get(displayName="Carl")
+        self.assertStreamMatches(reverse("project:get_followers", args=[carl.id]))
+        self.assertStreamMatches(reverse("project:new_post_api", args=[carl.id]))
@@ -0,0 +1,196 @@
+import random
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Author, AuthorSuggestion
+from ..suggestions import get_suggestions, path_scores, rebuild_suggestions
+
+
+def create_authors(names):
+    authors = []
+    for name in names:
+        user = User.objects.create(username=name, password="testpassword1")
+        authors.append(Author.objects.create(user=user, displayName=name))
+    return authors
+
+
+def stored_scores():
+    return set(
+        AuthorSuggestion.objects.values_list("author_id", "suggested_id", "score")
+    )
+
+
+class SuggestionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = create_authors(f"Author{i}" for i in range(8))
+        cls.alice, cls.bob, cls.carl, cls.dana = cls.authors[:4]
+
+    def test_ranked_by_shared_follows(self):
+        self.alice.following.add(self.bob, self.carl)
+        self.bob.following.add(self.dana)
+        self.carl.following.add(self.dana, self.authors[4])
+
+        suggestions = get_suggestions(self.alice)
+        self.assertEqual(
+            [(s.suggested, s.score) for s in suggestions],
+            [(self.dana, 2), (self.authors[4], 1)],
+        )
+
+    def test_excludes_followed_authors_and_self(self):
+        self.alice.following.add(self.bob)
+        self.bob.following.add(self.alice, self.carl)
+        self.alice.following.add(self.carl)
+
+        self.assertEqual(list(get_suggestions(self.alice)), [])
+
+    def test_incremental_updates_match_rebuild(self):
+        rng = random.Random(7)
+        for _ in range(60):
+            follower, followee = rng.sample(self.authors, 2)
+            action = rng.random()
+            if action < 0.6:
+                follower.following.add(followee)
+            elif action < 0.8:
+                followee.followers.remove(follower)
+            elif action < 0.9:
+                follower.following.clear()
+            else:
+                followee.followers.add(*rng.sample(self.authors, 3))
+
+        incremental = stored_scores()
+        rebuild_suggestions()
+        self.assertEqual(incremental, stored_scores())
+
+    def test_removing_missing_follow_changes_nothing(self):
+        self.alice.following.add(self.bob)
+        self.bob.following.add(self.carl)
+        self.alice.following.remove(self.dana)
+
+        self.assertEqual(stored_scores(), {(self.alice.id, self.carl.id, 1)})
+
+    def test_compute_suggestions_command(self):
+        self.alice.following.add(self.bob)
+        self.bob.following.add(self.carl)
+        AuthorSuggestion.objects.all().delete()
+
+        call_command("compute_suggestions", stdout=StringIO())
+        self.assertEqual(stored_scores(), {(self.alice.id, self.carl.id, 1)})
+
+
+@mock.patch("project.suggestions.MAX_SUGGESTION_LIMIT", 2)
+@mock.patch("project.suggestions.SUGGESTIONS_KEPT", 3)
+class KeptSuggestionTest(TestCase):
+    """
+    Each author keeps 3 rows, 2 of them served
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = create_authors(f"Author{i}" for i in range(10))
+        cls.alice, cls.bob, cls.carl = cls.authors[:3]
+
+    def served(self, author):
+        return [(s.suggested_id, s.score) for s in get_suggestions(author)]
+
+    def test_rebuild_keeps_best_rows(self):
+        self.alice.following.add(self.bob, self.carl)
+        self.bob.following.add(*self.authors[3:7])
+        self.carl.following.add(*self.authors[3:5])
+        rebuild_suggestions()
+
+        kept = dict(self.alice.suggestions.values_list("suggested_id", "score"))
+        self.assertEqual(sorted(kept.values()), [1, 2, 2])
+        self.assertEqual(kept[self.authors[3].id], 2)
+        self.assertEqual(kept[self.authors[4].id], 2)
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.suggestion_floor, 1)
+
+    def test_left_out_rows_come_back_when_served_rows_go(self):
+        self.alice.following.add(self.bob)
+        self.bob.following.add(*self.authors[3:8])
+        kept = list(self.alice.suggestions.values_list("suggested_id", flat=True))
+        self.assertEqual(len(kept), 3)
+
+        # Following two kept suggestions leaves fewer than 2 to serve, so the
+        # rest are read from the graph again
+        self.alice.following.add(*kept[:2])
+
+        rest = {author.id for author in self.authors[3:8]} - set(kept[:2])
+        self.assertEqual(self.served(self.alice), [(pk, 1) for pk in sorted(rest)][:2])
+
+    def test_incremental_updates_serve_the_best_scores(self):
+        rng = random.Random(11)
+        for _ in range(150):
+            follower, followee = rng.sample(self.authors, 2)
+            action = rng.random()
+            if action < 0.7:
+                follower.following.add(followee)
+            elif action < 0.9:
+                followee.followers.remove(follower)
+            elif action < 0.95:
+                follower.following.clear()
+            else:
+                followee.followers.add(*rng.sample(self.authors, 4))
+
+        exact = {
+            (path["author"], path["suggested"]): path["score"] for path in path_scores()
+        }
+        for author in self.authors:
+            served = self.served(author)
+            best = sorted(
+                (
+                    score
+                    for (author_id, _), score in exact.items()
+                    if author_id == author.pk
+                ),
+                reverse=True,
+            )
+            self.assertEqual([score for _, score in served], best[:2])
+            for suggested_id, score in served:
+                self.assertEqual(exact[author.pk, suggested_id], score)
+            self.assertLessEqual(author.suggestions.count(), 3)
+
+
+class SuggestionsAPITest(APITestCase):
+    url_name = "project:suggestions_api"
+
+    @classmethod
+    def setUpTestData(cls):
+        alice, bob, carl, dana = create_authors(["Alice", "Bob", "Carl", "Dana"])
+        cls.alice = alice
+        alice.following.add(bob, carl)
+        bob.following.add(dana)
+        carl.following.add(dana, bob)
+
+    def test_suggestions(self):
+        resp = self.client.get(reverse(self.url_name, args=[self.alice.id]))
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["type"], "suggestions")
+        self.assertEqual(
+            [
+                (item["author"]["displayName"], item["score"])
+                for item in resp.data["items"]
+            ],
+            [("Dana", 2)],
+        )
+
+    def test_queries_do_not_grow_with_graph(self):
+        url = reverse(self.url_name, args=[self.alice.id])
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_invalid_size(self):
+        resp = self.client.get(
+            reverse(self.url_name, args=[self.alice.id]), {"size": "many"}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
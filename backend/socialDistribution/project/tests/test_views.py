@@ -1,10 +1,12 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
+from django.db import connection
 from django.urls import reverse
 
 from rest_framework import status
 
-from ..models import Author
+from ..models import Author, Comment, Post, PostLike
 
 
 # Test signup and login
@@ -66,3 +68,59 @@ class ProfileEditViewTest(TestCase):
             target_status_code=status.HTTP_200_OK,
             fetch_redirect_response=True,
         )
+
+
+class PostViewTest(TestCase):
+    def setUp(self):
+        testuser = User.objects.create(username="user1", password="test1")
+        self.author = Author.objects.create(user=testuser, displayName="user1")
+        self.client.force_login(testuser)
+        self.post = Post.objects.create(
+            author=self.author,
+            title="Hello",
+            content="World",
+            contentType="text/plain",
+            unlisted=False,
+        )
+        self.url = reverse("project:post", args=[self.post.id])
+
+    def add_comments(self, count):
+        Comment.objects.bulk_create(
+            Comment(author=self.author, post=self.post, comment=f"Comment {i}")
+            for i in range(count)
+        )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_comments(self):
+        self.add_comments(2)
+        few = self.count_queries()
+
+        self.add_comments(40)
+        self.assertEqual(self.count_queries(), few)
+
+    def test_comments_paginated(self):
+        self.add_comments(25)
+
+        response = self.client.get(self.url)
+        comments = list(response.context["comments"])
+        self.assertEqual(len(comments), 20)
+
+        response = self.client.get(
+            self.url, {"cursor": response.context["next_cursor"]}
+        )
+        comments += response.context["comments"]
+        self.assertIsNone(response.context["next_cursor"])
+        self.assertEqual(len(set(comments)), 25)
+
+    def test_liked_state(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.context["liked"])
+
+        PostLike.objects.create(author=self.author, post=self.post)
+        response = self.client.get(self.url)
+        self.assertTrue(response.context["liked"])
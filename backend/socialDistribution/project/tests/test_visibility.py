@@ -0,0 +1,208 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APITestCase
+
+from ..friends import get_friend_ids
+from ..models import Post
+from ..stream import get_stream_page
+from ..visibility import visible_posts
+from .factories import create_author, create_post
+
+Visibility = Post.VisibilityChoice
+
+
+def create_posts(author):
+    """
+    One post of every visibility, plus an unlisted public one, keyed by title
+    """
+    posts = {}
+    for title, visibility, unlisted in [
+        ("public", Visibility.PUBLIC, False),
+        ("unlisted", Visibility.PUBLIC, True),
+        ("friends", Visibility.FRIENDS_ONLY, False),
+        ("private", Visibility.PRIVATE, False),
+    ]:
+        posts[title] = create_post(
+            author, title=title, visibility=visibility, unlisted=unlisted
+        )
+    return posts
+
+
+def titles(posts):
+    return sorted(post.title for post in posts)
+
+
+class VisiblePostsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.carl = create_author("Carl")
+        cls.alice.following.add(cls.bob)
+        cls.bob.following.add(cls.alice)
+        cls.carl.following.add(cls.alice)
+        create_posts(cls.alice)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_visible_posts(self):
+        self.assertEqual(titles(visible_posts(None)), ["public"])
+        self.assertEqual(titles(visible_posts(self.carl)), ["public"])
+        self.assertEqual(titles(visible_posts(self.bob)), ["friends", "public"])
+        self.assertEqual(
+            titles(visible_posts(self.alice)),
+            ["friends", "private", "public", "unlisted"],
+        )
+
+    def test_unlisted_posts_reachable_when_not_listing(self):
+        self.assertEqual(
+            titles(visible_posts(self.bob, listed=False)),
+            ["friends", "public", "unlisted"],
+        )
+
+    def test_single_query_with_cold_or_warm_friend_cache(self):
+        with self.assertNumQueries(1):
+            list(visible_posts(self.bob))
+
+        get_friend_ids(self.bob.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(titles(visible_posts(self.bob)), ["friends", "public"])
+
+
+class VisibleStreamTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.carl = create_author("Carl")
+        cls.alice.following.add(cls.bob)
+        cls.bob.following.add(cls.alice)
+        cls.carl.following.add(cls.alice)
+
+    def setUp(self):
+        cache.clear()
+
+    def stream_titles(self, author):
+        return titles(get_stream_page(author).items)
+
+    def test_pushed_posts_are_filtered(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_posts(self.alice)
+
+        self.assertEqual(self.stream_titles(self.bob), ["friends", "public"])
+        self.assertEqual(self.stream_titles(self.carl), ["public"])
+
+    @override_settings(STREAM_FANOUT_MAX_FOLLOWERS=1)
+    def test_pulled_posts_are_filtered(self):
+        create_posts(self.alice)
+
+        self.assertEqual(self.stream_titles(self.bob), ["friends", "public"])
+        self.assertEqual(self.stream_titles(self.carl), ["public"])
+
+    def test_page_is_filled_past_hidden_posts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                create_posts(self.alice)
+
+        page = get_stream_page(self.carl, size=3)
+        self.assertEqual(titles(page.items), ["public"] * 3)
+        self.assertIsNone(page.next_cursor)
+
+
+class VisibleViewsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.alice.following.add(cls.bob)
+        cls.bob.following.add(cls.alice)
+        cls.posts = create_posts(cls.alice)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_post_api(self):
+        def status_of(title):
+            post = self.posts[title]
+            url = reverse("project:update_post_api", args=[self.alice.id, post.id])
+            return self.client.get(url).status_code
+
+        self.assertEqual(status_of("public"), 201)
+        self.assertEqual(status_of("unlisted"), 201)
+        self.assertEqual(status_of("friends"), 404)
+        self.assertEqual(status_of("private"), 404)
+
+        self.client.force_authenticate(self.bob.user)
+        self.assertEqual(status_of("friends"), 201)
+        self.assertEqual(status_of("private"), 404)
+
+        self.client.force_authenticate(self.alice.user)
+        self.assertEqual(status_of("private"), 201)
+
+    def test_author_posts_api(self):
+        url = reverse("project:new_post_api", args=[self.alice.id])
+        self.assertEqual(
+            sorted(post["title"] for post in self.client.get(url).data), ["public"]
+        )
+
+        self.client.force_authenticate(self.bob.user)
+        self.assertEqual(
+            sorted(post["title"] for post in self.client.get(url).data),
+            ["friends", "public"],
+        )
+
+    def test_profile(self):
+        url = reverse("project:profile", args=[self.alice.id])
+        self.client.force_login(self.bob.user)
+        self.assertEqual(
+            titles(self.client.get(url).context["posts"]), ["friends", "public"]
+        )
+
+        self.client.force_login(self.alice.user)
+        self.assertEqual(len(self.client.get(url).context["posts"]), 4)
+
+
+class OthersStreamTest(APITestCase):
+    """
+    Carl reads the stream and inbox of Alice, whose friend Bob posted
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = create_author("Alice")
+        cls.bob = create_author("Bob")
+        cls.carl = create_author("Carl")
+        cls.alice.following.add(cls.bob)
+        cls.bob.following.add(cls.alice)
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_posts(self.bob)
+
+    def stream_titles(self):
+        url = reverse("project:stream", args=[self.alice.displayName])
+        return titles(self.client.get(url).context["latest_posts"])
+
+    def inbox_titles(self):
+        url = reverse("project:inbox_api", args=[self.alice.id])
+        return sorted(post["title"] for post in self.client.get(url).data["items"])
+
+    def test_stream(self):
+        self.client.force_login(self.alice.user)
+        self.assertEqual(self.stream_titles(), ["friends", "public"])
+
+        self.client.force_login(self.carl.user)
+        self.assertEqual(self.stream_titles(), ["public"])
+
+    def test_inbox(self):
+        self.assertEqual(self.inbox_titles(), ["public"])
+
+        self.client.force_authenticate(self.carl.user)
+        self.assertEqual(self.inbox_titles(), ["public"])
+
+        self.client.force_authenticate(self.alice.user)
+        self.assertEqual(self.inbox_titles(), ["friends", "public"])
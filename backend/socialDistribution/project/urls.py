@@ -21,6 +21,7 @@ urlpatterns = [
     path("signup/", views.SignupView.as_view(), name="signup"),
     # API
     path("api/authors/", views.AuthorAPIView.as_view(), name="get_authors"),
+    path("api/authors/search/", views.search_authors_api, name="search_authors_api"),
     path("api/authors/<str:pk>/", views.update_author, name="author_api"),
     path("api/authors/<str:pk>/posts/", views.new_post_api, name="new_post_api"),
     path(
@@ -28,8 +29,41 @@ urlpatterns = [
         views.update_post_api,
         name="update_post_api",
     ),
+    path(
+        "api/authors/<str:pk>/posts/<str:post_id>/comments",
+        views.post_comments_api,
+        name="post_comments_api",
+    ),
+    path(
+        "api/authors/<str:pk>/posts/<str:post_id>/likes",
+        views.post_likes_api,
+        name="post_likes_api",
+    ),
     path("api/authors/<str:pk>/inbox", views.update_inbox, name="inbox_api"),
+    path(
+        "api/authors/<str:pk>/inbox/batch",
+        views.inbox_batch_api,
+        name="inbox_batch_api",
+    ),
+    path("api/posts/search/", views.search_posts_api, name="search_posts_api"),
+    path("api/posts/<str:pk>/like/", views.post_like_api, name="post_like_api"),
+    path(
+        "api/comments/<str:pk>/like/",
+        views.comment_like_api,
+        name="comment_like_api",
+    ),
+    path(
+        "api/authors/<str:pk>/suggestions/",
+        views.suggestions_api,
+        name="suggestions_api",
+    ),
+    path(
+        "api/categories/<str:name>/posts/",
+        views.category_posts_api,
+        name="category_posts_api",
+    ),
     path("api/nodes/", views.NodeAPIView.as_view(), name="node_api"),
+    path("metrics/", views.metrics_view, name="metrics"),
     # Likes
     path("post/<str:pk>/like/", views.like_post, name="like_post"),
     # Comments
@@ -67,5 +101,10 @@ urlpatterns = [
         views.FollowRequestAPIView.as_view(),
         name="api_follow_request",
     ),
+    path(
+        "api/authors/<str:pk>/inbox/followrequest/batch",
+        views.follow_requests_batch_api,
+        name="api_follow_request_batch",
+    ),
     path("post/<str:pk>/delete", views.delete_post, name="post_delete"),
 ]
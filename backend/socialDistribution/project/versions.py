@@ -0,0 +1,76 @@
+import time
+import uuid
+
+from django.db import transaction
+
+from .models import Stamp
+
+
+# Stamp names
+AUTHORS = "authors"
+# Bumped when counters are rewritten in bulk without signals
+COUNTERS = "counters"
+
+
+def stamp_id(pk):
+    """
+    One spelling per id, whether it came from a model or a URL
+    """
+    try:
+        return uuid.UUID(str(pk)).hex
+    except ValueError:
+        return str(pk)
+
+
+def author_stamp(author_id):
+    return f"author:{stamp_id(author_id)}"
+
+
+def follows_stamp(author_id):
+    return f"follows:{stamp_id(author_id)}"
+
+
+def author_posts_stamp(author_id):
+    return f"posts:{stamp_id(author_id)}"
+
+
+def post_stamp(post_id):
+    return f"post:{stamp_id(post_id)}"
+
+
+def follow_requests_stamp(author_id):
+    return f"requests:{stamp_id(author_id)}"
+
+
+def get_stamps(names):
+    """
+    The current version stamp of each name, as a dict, read in one query. A
+    stamp is the time.time_ns() of the last change, or 0 for a name never
+    bumped.
+    """
+    names = set(names)
+    stamps = dict(Stamp.objects.filter(name__in=names).values_list("name", "changed"))
+    return {name: stamps.get(name, 0) for name in names}
+
+
+def bump(names):
+    """
+    Mark everything versioned under `names` as changed, with one upsert once
+    the transaction commits. Bumping after the commit means a reader can
+    never pair the new stamp with the old rows; at worst it briefly pairs
+    the new rows with the old stamp, which the bump then retires.
+    """
+    names = sorted(set(names))
+    if not names:
+        return
+
+    def write():
+        now = time.time_ns()
+        Stamp.objects.bulk_create(
+            [Stamp(name=name, changed=now) for name in names],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["changed"],
+        )
+
+    transaction.on_commit(write)
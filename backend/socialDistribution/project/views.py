@@ -1,28 +1,78 @@
-from datetime import datetime
+import hashlib
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpResponseRedirect
+from django.db import router, transaction
+from django.db.models import F
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+)
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from django.urls import reverse
 from django.urls import reverse_lazy
 from django.views import generic
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.views.generic import CreateView, UpdateView
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .forms import AuthorCreationForm, EditProfileForm, CreatePostForm, EditPostForm
-from .models import Author, Post, Comment, PostLike, FollowRequest, Node
+from . import metrics
+from .authentication import IsNode, sending_node
+from .cache import author_payloads, post_payloads
+from .categories import get_category_feed_page
+from .conditional import conditional_get
+from .inbox import MAX_INBOX_BATCH, ingest_items
+from .likes import set_comment_like, set_post_like
+from .models import Author, Category, Post, Comment, PostLike, FollowRequest, Node
 from .serializers import (
     PostSerializer,
     AuthorSerializer,
+    CommentSerializer,
+    LikeSerializer,
     NodeSerializer,
+    FollowRequestBatchSerializer,
     FollowRequestSerializer,
 )
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import (
+    author_search_paginator,
+    post_search_paginator,
+    search_authors,
+    search_posts,
+)
+from .stream import (
+    get_stream_rows,
+    get_stream_version,
+    load_stream_page,
+    stream_page_stamps,
+)
+from .streaming import stream_list, wants_stream
+from .suggestions import get_suggestions
+from .versions import (
+    AUTHORS,
+    COUNTERS,
+    author_posts_stamp,
+    bump,
+    follow_requests_stamp,
+    follows_stamp,
+    get_stamps,
+    post_stamp,
+)
+from .visibility import can_view_post, get_viewer, visible_posts
 
 
 class AuthorView(generic.DetailView):
@@ -30,34 +80,100 @@ class AuthorView(generic.DetailView):
     model = Author
 
 
+# Comments and likes are listed oldest first
+comment_paginator = KeysetPaginator(keys=("published", "id"))
+like_paginator = KeysetPaginator(keys=("published", "id"))
+
+
 class PostView(generic.DetailView):
     template_name = "project/post.html"
     model = Post
+    comment_paginator = comment_paginator
+
+    def get_queryset(self):
+        return Post.objects.select_related("author")
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        if not can_view_post(get_viewer(self.request), post):
+            raise Http404("No post found matching the query")
+        return post
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        post = self.object
+
+        comments = post.comment_set.select_related("author")
+        try:
+            page = self.comment_paginator.paginate_request(self.request, comments)
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        context["comments"] = page.items
+        context["next_cursor"] = page.next_cursor
+
+        user = self.request.user
+        context["liked"] = (
+            user.is_authenticated
+            and PostLike.objects.filter(author__user=user, post=post).exists()
+        )
+        return context
 
 
-class StreamView(generic.ListView):
+def get_stream_context(request, author):
+    """
+    Context for the stream page. The page's rows and their post stamps key
+    the cached fragment, so a repeat visit served from it doesn't load the
+    posts.
+    """
+    cursor, size = request.GET.get("cursor"), request.GET.get("size")
+    viewer = get_viewer(request)
+    try:
+        rows, next_cursor = get_stream_rows(author, cursor, size, viewer)
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+    page = SimpleLazyObject(lambda: load_stream_page(rows, next_cursor))
+
+    # Only the author may see and answer their follow requests
+    is_author = viewer == author
+    names = stream_page_stamps(rows)
+    if is_author:
+        names.append(follow_requests_stamp(author.pk))
+    stamps = get_stamps(names)
+    version = get_stream_version(rows, next_cursor, stamps)
+    context = {
+        "latest_posts": SimpleLazyObject(lambda: page.items),
+        "next_cursor": next_cursor,
+        "stream_cache_timeout": settings.STREAM_FRAGMENT_CACHE_TIMEOUT,
+        "stream_posts_key": f"{author.pk}:{version}",
+    }
+    if is_author:
+        # The request forms embed a CSRF token, which is only valid for the
+        # current CSRF secret
+        get_token(request)
+        csrf_secret = hashlib.sha1(request.META["CSRF_COOKIE"].encode()).hexdigest()
+        requests_version = stamps[follow_requests_stamp(author.pk)]
+        context["friend_requests"] = FollowRequest.objects.filter(
+            following=author
+        ).select_related("follower")
+        context["stream_requests_key"] = f"{author.pk}:{requests_version}:{csrf_secret}"
+    return context
+
+
+class StreamView(generic.TemplateView):
     template_name = "project/stream.html"
-    context_object_name = "latest_posts"
 
-    def get_queryset(self):
-        self.author = get_object_or_404(Author, displayName=self.kwargs["username"])
-        return self.author.streamPosts.order_by("-published")
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        author = get_object_or_404(Author, displayName=self.kwargs["username"])
+        context.update(get_stream_context(self.request, author))
+        return context
 
 
 def stream_view(request):
     if not request.user.is_authenticated:
         return redirect(reverse_lazy("login"))
 
-    author = request.user.author
-    latest_posts = author.streamPosts.order_by("-published")
-
-    # Fetch friend requests
-    friend_requests = FollowRequest.objects.filter(following=author)
-
-    context = {
-        "latest_posts": latest_posts,
-        "friend_requests": friend_requests,
-    }
+    context = get_stream_context(request, request.user.author)
     return render(request, "project/stream.html", context)
 
 
@@ -65,6 +181,12 @@ class ProfileView(generic.DetailView):
     template_name = "project/profile.html"
     model = Author
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        posts = visible_posts(get_viewer(self.request), self.object.post_set)
+        context["posts"] = posts.order_by("-published", "-id")
+        return context
+
 
 @login_required
 def profile_edit(request):
@@ -110,8 +232,7 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         form.instance.contentType = (
             "text/plain"  # TODO Change when implementing Markdown
         )
-        form.instance.count = 0
-        form.instance.published = datetime.now()
+        form.instance.published = timezone.now()
 
         return super(CreatePostView, self).form_valid(form)
 
@@ -142,15 +263,22 @@ class SignupView(generic.CreateView):
         return HttpResponseRedirect(reverse("login"))
 
 
+def authors_state(request, *args, **kwargs):
+    return [AUTHORS], None
+
+
+@method_decorator(conditional_get(authors_state), name="get")
 class AuthorAPIView(APIView):
     """
     Get the list of authors on our website
     """
 
     def get(self, request, *args, **kwargs):
-        authors = Author.objects.all()
-        serializer = AuthorSerializer(authors, many=True)
-        full_response = {"type": "authors", "items": serializer.data}
+        # Remote authors' shadow rows belong to their own nodes
+        authors = Author.objects.filter(node__isnull=True)
+        if wants_stream(request):
+            return stream_list(authors, AuthorSerializer, "authors")
+        full_response = {"type": "authors", "items": author_payloads.get_many(authors)}
         return Response(full_response)
 
 
@@ -162,10 +290,7 @@ def update_author(request, pk):
     author = get_object_or_404(Author, id=pk)
 
     if request.method == "GET":
-        serializer = AuthorSerializer(author, data=request.data, partial=True)
-        if serializer.is_valid():
-            return Response(serializer.data, status=201)
-        return Response(status=400, data=serializer.errors)
+        return Response(author_payloads.get(author), status=201)
     if request.method == "POST":
         serializer = AuthorSerializer(author, data=request.data, partial=True)
         if serializer.is_valid():
@@ -174,13 +299,24 @@ def update_author(request, pk):
         return Response(status=400, data=serializer.errors)
 
 
+def author_posts_state(request, pk):
+    # The viewer is part of the ETag, and their friendship with the author
+    # changes with the author's follows
+    return [author_posts_stamp(pk), follows_stamp(pk), COUNTERS], None
+
+
 @api_view(["GET", "POST"])
+@conditional_get(author_posts_state)
 def new_post_api(request, pk):
     posts = Post.objects.filter(author=pk)
 
     if request.method == "GET":
-        serializer = PostSerializer(posts, many=True)
-        return Response(serializer.data)
+        visible = visible_posts(get_viewer(request), posts).order_by(
+            "-published", "-id"
+        )
+        if wants_stream(request):
+            return stream_list(visible, PostSerializer)
+        return Response(post_payloads.get_many(visible))
 
     if request.method == "POST":
         serializer = PostSerializer(posts, data=request.data, partial=True)
@@ -202,10 +338,9 @@ def update_post_api(request, pk, post_id):
     post = get_object_or_404(Post, id=post_id)
 
     if request.method == "GET":
-        serializer = PostSerializer(post, data=request.data, partial=True)
-        if serializer.is_valid():
-            return Response(serializer.data, status=201)
-        return Response(status=400, data=serializer.errors)
+        if not can_view_post(get_viewer(request), post):
+            raise Http404
+        return Response(post_payloads.get(post), status=201)
     if request.method == "POST":
         serializer = PostSerializer(post, data=request.data, partial=True)
         if serializer.is_valid():
@@ -217,21 +352,109 @@ def update_post_api(request, pk, post_id):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def post_reactions_state(request, pk, post_id):
+    # Reactions bump the post's stamp; follows decide who sees FRIENDS_ONLY
+    # posts and authors' profiles are embedded
+    return [post_stamp(post_id), follows_stamp(pk), AUTHORS], None
+
+
+# For each list of reactions: the post's related manager, its counter, and
+# how the list is paged and serialized
+REACTIONS = {
+    "comments": ("comment_set", "comment_count", comment_paginator, CommentSerializer),
+    "likes": ("postlike_set", "like_count", like_paginator, LikeSerializer),
+}
+
+
+def reactions_response(request, pk, post_id, kind):
+    """
+    A page of a post's comments or likes with the total from the post's
+    counter, so clients never need to count them
+    """
+    related, counter, paginator, serializer_class = REACTIONS[kind]
+    post = get_object_or_404(Post, id=post_id, author_id=pk)
+    if not can_view_post(get_viewer(request), post):
+        raise Http404
+    try:
+        page = paginator.paginate(
+            getattr(post, related).select_related("author"),
+            request.query_params.get("cursor"),
+            request.query_params.get("size"),
+        )
+    except InvalidCursor:
+        return Response(status=400, data={"cursor": "Invalid cursor"})
+    return Response(
+        {
+            "type": kind,
+            "post": str(post.id),
+            "count": getattr(post, counter),
+            "items": serializer_class(page.items, many=True).data,
+            "next": page.next_cursor,
+        }
+    )
+
+
+@api_view(["GET"])
+@conditional_get(post_reactions_state)
+def post_comments_api(request, pk, post_id):
+    """
+    A post's comments, oldest first
+    """
+    return reactions_response(request, pk, post_id, "comments")
+
+
+@api_view(["GET"])
+@conditional_get(post_reactions_state)
+def post_likes_api(request, pk, post_id):
+    """
+    A post's likes, oldest first
+    """
+    return reactions_response(request, pk, post_id, "likes")
+
+
+def inbox_state(request, pk):
+    # Reading the page's rows is one index range scan; it catches new,
+    # removed and newly hidden posts, and the post stamps catch edits
+    author = get_object_or_404(Author, id=pk)
+    try:
+        rows, next_cursor = get_stream_rows(
+            author,
+            request.query_params.get("cursor"),
+            request.query_params.get("size"),
+            get_viewer(request),
+        )
+    except InvalidCursor:
+        return [], "invalid cursor"
+    # Kept for the view, so a changed page isn't read twice
+    request.stream_rows = (rows, next_cursor)
+    return stream_page_stamps(rows), rows
+
+
 @api_view(["GET", "POST", "DELETE"])
+@conditional_get(inbox_state, last_modified=False)
 def update_inbox(request, pk):
     """
     Update an inbox
     """
     author = get_object_or_404(Author, id=pk)
-    inbox = author.streamPosts.all()
 
     if request.method == "GET":
-        serializer = PostSerializer(inbox, many=True)
+        try:
+            rows = getattr(request, "stream_rows", None) or get_stream_rows(
+                author,
+                request.query_params.get("cursor"),
+                request.query_params.get("size"),
+                get_viewer(request),
+            )
+        except InvalidCursor:
+            return Response(status=400, data={"cursor": "Invalid cursor"})
+        page = load_stream_page(*rows)
         author_str = "http://" + str(author.host) + "/authors/" + str(author.id)
         full_response = {
             "type": "inbox",
             "author": author_str,
-            "items": serializer.data,
+            "items": post_payloads.get_many(page.items),
+            "next": page.next_cursor,
         }
         return Response(full_response, status=201)
 
@@ -247,6 +470,43 @@ def update_inbox(request, pk):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(["POST"])
+@permission_classes([IsNode])
+def inbox_batch_api(request, pk):
+    """
+    Take a batch of typed items (post, like, comment, follow) from an
+    authenticated peer node, as a list or as an inbox object, and report a
+    result per item
+    """
+    author = get_object_or_404(Author, id=pk, node__isnull=True)
+    items = request.data
+    if isinstance(items, dict):
+        items = items.get("items")
+    if not isinstance(items, list):
+        return Response(status=400, data={"items": "Expected a list of items"})
+    if len(items) > MAX_INBOX_BATCH:
+        return Response(
+            status=400, data={"items": f"At most {MAX_INBOX_BATCH} items at once"}
+        )
+    return Response(
+        {"type": "inbox", "items": ingest_items(author, items, sending_node(request))}
+    )
+
+
+def metrics_view(request):
+    """
+    Process counters in the Prometheus text format, for staff or for a
+    scraper sending the METRICS_TOKEN bearer token
+    """
+    token = settings.METRICS_TOKEN
+    sent = request.headers.get("Authorization", "")
+    if not request.user.is_staff and not (
+        token and constant_time_compare(sent, f"Bearer {token}")
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4")
+
+
 class NodeAPIView(APIView):
     """
     Get the list of nodes
@@ -263,32 +523,57 @@ def add_comment(request, pk):
     post = get_object_or_404(Post, pk=pk)
     if request.method == "POST":
         content = request.POST.get("content")
-        Comment.objects.create(
-            author=request.user.author,
-            post=post,
-            comment=content,
-            contentType="text/plain",
-        )  # Assuming contentType is plain text for this example
+        with transaction.atomic():
+            Comment.objects.create(
+                author=request.user.author,
+                post=post,
+                comment=content,
+                contentType="text/plain",
+            )  # Assuming contentType is plain text for this example
+            Post.objects.filter(pk=post.pk).update(comment_count=F("comment_count") + 1)
     return HttpResponseRedirect(reverse("project:post", args=[pk]))
 
 
 @login_required
 def like_post(request, pk):
     post = get_object_or_404(Post, pk=pk)
-    # Check if the user already liked the post
-    liked = PostLike.objects.filter(author=request.user.author, post=post).exists()
-    if not liked:
-        PostLike.objects.create(
-            author=request.user.author,
-            post=post,
-            summary=f"{request.user.username} likes this",
-            context=post.source,
-        )
-    else:
-        PostLike.objects.filter(author=request.user.author, post=post).delete()
+    set_post_like(request.user.author, post)
     return HttpResponseRedirect(reverse("project:post", args=[pk]))
 
 
+def like_api_response(request, like, target):
+    """
+    PUT likes `target`, DELETE unlikes it and POST toggles the like
+    """
+    liked = {"PUT": True, "DELETE": False, "POST": None}[request.method]
+    liked = like(request.user.author, target, liked)
+    return Response({"type": "like", "liked": liked})
+
+
+@api_view(["PUT", "DELETE", "POST"])
+@permission_classes([IsAuthenticated])
+def post_like_api(request, pk):
+    """
+    Like or unlike a post. PUT and DELETE can be repeated safely.
+    """
+    post = get_object_or_404(Post, pk=pk)
+    if not can_view_post(request.user.author, post):
+        raise Http404
+    return like_api_response(request, set_post_like, post)
+
+
+@api_view(["PUT", "DELETE", "POST"])
+@permission_classes([IsAuthenticated])
+def comment_like_api(request, pk):
+    """
+    Like or unlike a comment. PUT and DELETE can be repeated safely.
+    """
+    comment = get_object_or_404(Comment.objects.select_related("post"), pk=pk)
+    if not can_view_post(request.user.author, comment.post):
+        raise Http404
+    return like_api_response(request, set_comment_like, comment)
+
+
 # TODO none of these login decerators check who is logged in. anybody can accept requests on other people's behalfs right now.
 
 
@@ -339,16 +624,111 @@ class SearchAuthors(generic.ListView):
 
     def get_queryset(self):
         query = self.request.GET.get("username")
-        if query is None:
-            userlist = Author.objects.all().order_by("displayName")
-            return userlist
-        else:
-            userlist = Author.objects.filter(displayName__icontains=query).order_by(
-                "displayName"
+        try:
+            self.page = author_search_paginator.paginate_request(
+                self.request, search_authors(query)
             )
-            return userlist
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return self.page.items
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.request.GET.get("username", "")
+        context["next_cursor"] = self.page.next_cursor
+        return context
+
+
+@api_view(["GET"])
+def search_authors_api(request):
+    """
+    Search authors by display name
+    """
+    try:
+        page = author_search_paginator.paginate_request(
+            request, search_authors(request.query_params.get("q"))
+        )
+    except InvalidCursor:
+        return Response(status=400, data={"cursor": "Invalid cursor"})
+    return Response(
+        {
+            "type": "authors",
+            "items": author_payloads.get_many(page.items),
+            "next": page.next_cursor,
+        }
+    )
+
+
+@api_view(["GET"])
+def search_posts_api(request):
+    """
+    Full-text search over public posts
+    """
+    try:
+        page = post_search_paginator.paginate_request(
+            request, search_posts(request.query_params.get("q"))
+        )
+    except InvalidCursor:
+        return Response(status=400, data={"cursor": "Invalid cursor"})
+    return Response(
+        {
+            "type": "posts",
+            "items": post_payloads.get_many(page.items),
+            "next": page.next_cursor,
+        }
+    )
+
+
+@api_view(["GET"])
+def category_posts_api(request, name):
+    """
+    Public posts in a category, newest first
+    """
+    category = get_object_or_404(Category, name=name.lower())
+    try:
+        page = get_category_feed_page(
+            category,
+            request.query_params.get("cursor"),
+            request.query_params.get("size"),
+        )
+    except InvalidCursor:
+        return Response(status=400, data={"cursor": "Invalid cursor"})
+    return Response(
+        {
+            "type": "posts",
+            "category": category.name,
+            "count": category.post_count,
+            "items": post_payloads.get_many(page.items),
+            "next": page.next_cursor,
+        }
+    )
+
+
+@api_view(["GET"])
+def suggestions_api(request, pk):
+    """
+    Authors followed by the ones this author follows, most shared follows
+    first
+    """
+    author = get_object_or_404(Author, id=pk)
+    try:
+        suggestions = get_suggestions(author, request.query_params.get("size"))
+    except ValueError:
+        return Response(status=400, data={"size": "Invalid size"})
+    suggestions = list(suggestions)
+    authors = author_payloads.get_many(s.suggested for s in suggestions)
+    items = [
+        {"type": "suggestion", "score": suggestion.score, "author": author}
+        for suggestion, author in zip(suggestions, authors)
+    ]
+    return Response({"type": "suggestions", "items": items})
+
+
+def followers_state(request, pk, *args, **kwargs):
+    return [AUTHORS, follows_stamp(pk)], None
 
 
+@method_decorator(conditional_get(followers_state), name="get")
 class FollowersAPIView(APIView):
     def get_queryset(self):
         author = get_object_or_404(Author, pk=self.kwargs["pk"])
@@ -356,18 +736,19 @@ class FollowersAPIView(APIView):
 
     def get(self, request, *args, **kwargs):
         query_set = self.get_queryset()
-        serializer = AuthorSerializer(query_set, many=True)
-        results = {"type": "followers", "items": serializer.data}
+        if wants_stream(request):
+            return stream_list(query_set, AuthorSerializer, "followers")
+        results = {"type": "followers", "items": author_payloads.get_many(query_set)}
         return Response(results)
 
 
+@method_decorator(conditional_get(followers_state), name="get")
 class FollowerAPIView(APIView):
     def get(self, request, *args, **kwargs):
         # Not sure what this should return in the response
         author = get_object_or_404(Author, pk=kwargs["pk"])
         follower = get_object_or_404(author.followers, pk=kwargs["follower_id"])
-        serializer = AuthorSerializer(follower)
-        return Response(serializer.data)
+        return Response(author_payloads.get(follower))
 
     def put(self, request, *args, **kwargs):
         author = get_object_or_404(Author, pk=kwargs["pk"])
@@ -386,22 +767,71 @@ class FollowerAPIView(APIView):
 class FollowRequestAPIView(APIView):
     def get(self, request, *args, **kwargs):
         author = get_object_or_404(Author, pk=kwargs["pk"])
-        serializer = FollowRequestSerializer(
-            FollowRequest.objects.filter(following=author), many=True
+        requests = FollowRequest.objects.filter(following=author).select_related(
+            "follower", "following"
         )
+        serializer = FollowRequestSerializer(requests, many=True)
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
         # Make sure author exists?
         get_object_or_404(Author, pk=kwargs["pk"])
         # Assumes other author is in the database?
-        serializer = FollowRequestSerializer(data=request.data)
+        serializer = FollowRequestSerializer(
+            data=request.data, context={"sender": sending_node(request)}
+        )
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=201)
         return Response(status=400, data=serializer.errors)
 
 
+@api_view(["POST"])
+def follow_requests_batch_api(request, pk):
+    """
+    Accept and decline many of an author's incoming follow requests in one
+    transaction. Ids that aren't pending requests to the author are
+    reported as not found.
+    """
+    author = get_object_or_404(Author, id=pk)
+    if getattr(request.user, "author", None) != author:
+        return Response(status=status.HTTP_403_FORBIDDEN)
+
+    serializer = FollowRequestBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(status=400, data=serializer.errors)
+    accept = serializer.validated_data["accept"]
+    decline = serializer.validated_data["decline"]
+
+    with transaction.atomic():
+        followers = dict(
+            FollowRequest.objects.select_for_update()
+            .filter(following=author, pk__in=accept + decline)
+            .values_list("pk", "follower_id")
+        )
+        accepted = {followers[fr_id] for fr_id in accept if fr_id in followers}
+        if accepted:
+            # One INSERT for every new follow edge
+            author.followers.add(*accepted)
+        # One DELETE, skipping the per-row delete signals, and one stamp bump
+        # for the lot rather than one per request
+        FollowRequest.objects.filter(pk__in=followers)._raw_delete(
+            router.db_for_write(FollowRequest)
+        )
+        if followers:
+            bump([follow_requests_stamp(author.pk)])
+
+    items = [
+        {
+            "id": str(fr_id),
+            "result": result if fr_id in followers else "not found",
+        }
+        for ids, result in ((accept, "accepted"), (decline, "declined"))
+        for fr_id in ids
+    ]
+    return Response({"type": "followrequests", "items": items})
+
+
 @login_required
 def delete_post(request, pk):
     post = get_object_or_404(Post, pk=pk)
@@ -0,0 +1,70 @@
+from django.db.models import Q
+
+from .friends import are_friends, cached_friend_ids
+from .models import Author, Post
+
+
+def get_viewer(request):
+    """
+    The author making the request, or None for anonymous users and accounts
+    without an author profile
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.author
+    except Author.DoesNotExist:
+        return None
+
+
+def can_view_post(viewer, post):
+    """
+    Whether `viewer` (an Author or None) may read `post`. Unlisted posts are
+    readable by anyone with the link, FRIENDS_ONLY posts by the author's
+    friends and PRIVATE posts by the author alone.
+    """
+    if post.visibility == Post.VisibilityChoice.PUBLIC:
+        return True
+    if viewer is None:
+        return False
+    if viewer.pk == post.author_id:
+        return True
+    if post.visibility == Post.VisibilityChoice.FRIENDS_ONLY:
+        return are_friends(post.author_id, viewer.pk)
+    return False
+
+
+def visible_posts_q(viewer, listed=True, prefix=""):
+    """
+    A filter for the posts `viewer` (an Author or None) may see, for use in
+    the same query that reads them. With `listed`, unlisted posts are left
+    out too, except the viewer's own. `prefix` points the filter at a
+    related post, e.g. "post__".
+    """
+    Visibility = Post.VisibilityChoice
+
+    def q(**kwargs):
+        return Q(**{prefix + key: value for key, value in kwargs.items()})
+
+    shown = q(visibility=Visibility.PUBLIC)
+    if viewer is not None:
+        friend_ids = cached_friend_ids(viewer.pk)
+        # A queryset is embedded as a subquery; an empty cached set needs no
+        # clause at all
+        if not isinstance(friend_ids, frozenset) or friend_ids:
+            shown |= q(visibility=Visibility.FRIENDS_ONLY, author_id__in=friend_ids)
+    if listed:
+        shown &= q(unlisted=False)
+    if viewer is not None:
+        shown |= q(author_id=viewer.pk)
+    return shown
+
+
+def visible_posts(viewer, queryset=None, listed=True):
+    """
+    `queryset` (all posts by default) narrowed to what `viewer` may see
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.filter(visible_posts_q(viewer, listed))
@@ -108,6 +108,36 @@ if "DATABASE_URL" in os.environ:
     db_from_env = dj_database_url.config(conn_max_age=600)
     DATABASES["default"].update(db_from_env)
 
+# Local memory by default, which is per process. Point CACHE_BACKEND at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) and
+# CACHE_LOCATION at its server when running several workers.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+# Entries the local memory, file and database backends keep before culling.
+# Django's default of 300 is less than a few pages of payloads.
+if CACHES["default"]["BACKEND"] in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+    "django.core.cache.backends.db.DatabaseCache",
+):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 50_000))
+    }
+
+# Whether every process reads the same cache. Data that decides who may see
+# what, like friend sets, is only cached when they do, since a per-process
+# cache cannot be invalidated from the process that changed it.
+SHARED_CACHE = CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -157,11 +187,82 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "project.authentication.NodeAuthentication",
     )
 }
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
-]
\ No newline at end of file
+]
+
+# Authors with more followers than this have their posts merged into streams
+# at read time instead of being pushed into every follower's inbox
+STREAM_FANOUT_MAX_FOLLOWERS = int(os.getenv("STREAM_FANOUT_MAX_FOLLOWERS", 1000))
+
+# Seconds back that the posts of authors over the threshold are merged into
+# streams, so a read doesn't scan their whole history
+STREAM_PULL_MAX_AGE = int(os.getenv("STREAM_PULL_MAX_AGE", 30 * 24 * 3600))
+
+# Seconds an author's cached friend set is kept; follow changes also clear it
+FRIENDS_CACHE_TIMEOUT = int(os.getenv("FRIENDS_CACHE_TIMEOUT", 3600))
+
+# Seconds a serialized author or post is kept; entries are keyed by the
+# object's version stamp, so changes never serve a stale payload
+SERIALIZATION_CACHE_TIMEOUT = int(os.getenv("SERIALIZATION_CACHE_TIMEOUT", 3600))
+
+# Seconds the rendered stream page fragments are kept; they are keyed by the
+# page's rows and the stamps of its posts, so changes never serve a stale
+# fragment
+STREAM_FRAGMENT_CACHE_TIMEOUT = int(os.getenv("STREAM_FRAGMENT_CACHE_TIMEOUT", 600))
+
+# This node's API URL, as peers register it. Local authors are sent to peers
+# with URLs under it.
+NODE_API_URL = os.getenv("NODE_API_URL", "http://127.0.0.1:8000/project/api/")
+
+# Outbound requests to peer nodes, see project/federation.py
+FEDERATION_TIMEOUT = float(os.getenv("FEDERATION_TIMEOUT", 10))
+FEDERATION_MAX_CONNECTIONS_PER_NODE = int(
+    os.getenv("FEDERATION_MAX_CONNECTIONS_PER_NODE", 4)
+)
+FEDERATION_RETRIES = int(os.getenv("FEDERATION_RETRIES", 2))
+# Peers answering with a larger body are treated as broken
+FEDERATION_MAX_BODY_BYTES = int(
+    os.getenv("FEDERATION_MAX_BODY_BYTES", 10 * 1024 * 1024)
+)
+
+# Outbox deliveries to remote inboxes are retried with exponential backoff,
+# starting at OUTBOX_BACKOFF_SECONDS and capped at OUTBOX_BACKOFF_MAX_SECONDS,
+# and given up after OUTBOX_MAX_ATTEMPTS
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", 30))
+OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", 3600))
+
+# Seconds the registered nodes are cached for matching remote URLs to their
+# node; saving or deleting a node also clears them
+NODES_CACHE_TIMEOUT = int(os.getenv("NODES_CACHE_TIMEOUT", 60))
+
+# Seconds a remote author's profile is used without fetching it again, and
+# how much longer a stale one is served while the refresh_remote_authors worker
+# fetches it again
+REMOTE_AUTHOR_CACHE_TIMEOUT = int(os.getenv("REMOTE_AUTHOR_CACHE_TIMEOUT", 300))
+REMOTE_AUTHOR_STALE_TIMEOUT = int(os.getenv("REMOTE_AUTHOR_STALE_TIMEOUT", 3600))
+
+# Bearer token a scraper sends to read /metrics/; staff users can read it
+# without one
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "project": {
+            "handlers": ["console"],
+            "level": os.getenv("PROJECT_LOG_LEVEL", "INFO"),
+        },
+    },
+}